@@ -1,9 +1,31 @@
 import bpy
+import fnmatch
+import hashlib
 import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from functools import lru_cache
+from itertools import islice
 from bpy.props import StringProperty, IntProperty, CollectionProperty, FloatVectorProperty, PointerProperty, BoolProperty, FloatProperty, EnumProperty
-from bpy.types import PropertyGroup, Panel, Operator, UIList
+from bpy.types import PropertyGroup, Panel, Operator, UIList, AddonPreferences
 from bpy.app.handlers import persistent
 
+# Pure-Python helper modules ship next to this file
+_ADDON_DIR = os.path.dirname(os.path.abspath(__file__))
+if _ADDON_DIR not in sys.path:
+    sys.path.append(_ADDON_DIR)
+
+import animation_events_binary
+import animation_events_core as core
+
 bl_info = {
     "name": "Animation Events System",
     "author": "GitHub Copilot",
@@ -14,12 +36,144 @@ bl_info = {
     "category": "Animation",
 }
 
+# Logging
+# Summaries, warnings and errors go through `log` to the console. Per-event and
+# per-field tracing goes through `trace_log` into a capped in-memory buffer that
+# can be dumped to a file; it is off unless enabled in the add-on preferences.
+LOG_FORMAT = "[%(name)s] %(levelname)s: %(message)s"
+TRACE_OFF = logging.CRITICAL + 1
+
+log = logging.getLogger("animation_events")
+trace_log = log.getChild("trace")
+trace_log.propagate = False
+trace_log.setLevel(TRACE_OFF)
+
+class TraceBuffer(logging.Handler):
+    """Keeps the most recent trace records, formatted only when dumped"""
+
+    def __init__(self, capacity=10000):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+        self.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+
+    def emit(self, record):
+        self.records.append(record)
+
+    def resize(self, capacity):
+        if capacity != self.records.maxlen:
+            self.records = deque(self.records, maxlen=capacity)
+
+    def dump(self, filepath):
+        with open(filepath, "w", encoding='utf-8') as f:
+            for record in self.records:
+                f.write(self.format(record) + "\n")
+        return len(self.records)
+
+trace_buffer = TraceBuffer()
+trace_log.addHandler(trace_buffer)
+
+_console_handler = logging.StreamHandler()
+_console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+def get_preferences(context):
+    """Add-on preferences, or None when running outside an installed add-on"""
+    addon = context.preferences.addons.get(__name__)
+    return addon.preferences if addon else None
+
+def configure_logging(prefs):
+    """Apply verbosity settings from the add-on preferences"""
+    log.setLevel(prefs.log_level if prefs else 'WARNING')
+    if prefs and prefs.trace_enabled:
+        trace_log.setLevel(logging.DEBUG)
+        trace_buffer.resize(prefs.trace_buffer_size)
+    else:
+        trace_log.setLevel(TRACE_OFF)
+
+def trace_event_instances(events):
+    """Trace every instance with its field values"""
+    trace_log.debug("Создано событий: %d", len(events.event_instances))
+    for i, instance in enumerate(events.event_instances):
+        trace_log.debug("Итоговое событие #%d: %s @ %d, маркер %s, полей %d",
+                        i, instance.template_name, instance.frame,
+                        instance.marker_name, len(instance.field_values))
+        for field_value in instance.field_values:
+            actual_val = "НЕИЗВЕСТНО"
+            if field_value.field_type == 'BOOL':
+                actual_val = field_value.bool_value
+            elif field_value.field_type == 'STRING':
+                actual_val = f"'{field_value.string_value}'"
+            elif field_value.field_type == 'INT':
+                actual_val = field_value.int_value
+            elif field_value.field_type == 'FLOAT':
+                actual_val = field_value.float_value
+            elif field_value.field_type == 'ARRAY':
+                actual_val = f"'{field_value.array_value}'"
+            elif field_value.field_type == 'ENUM':
+                actual_val = f"'{field_value.enum_value}'"
+            trace_log.debug("  %s (%s): %s", field_value.name, field_value.field_type, actual_val)
+
+class EventSystemPreferences(AddonPreferences):
+    bl_idname = __name__
+
+    log_level: EnumProperty(
+        name="Log Level",
+        description="Minimum level of messages printed to the console",
+        items=[
+            ('ERROR', "Error", "Only errors"),
+            ('WARNING', "Warning", "Errors and warnings"),
+            ('INFO', "Info", "Import/export summaries"),
+            ('DEBUG', "Debug", "Detailed progress messages"),
+        ],
+        default='WARNING',
+        update=lambda self, context: configure_logging(self)
+    )
+    trace_enabled: BoolProperty(
+        name="Trace Import/Export",
+        description="Record every event and field processed by import/export into the trace buffer (slow on large files)",
+        default=False,
+        update=lambda self, context: configure_logging(self)
+    )
+    trace_buffer_size: IntProperty(
+        name="Trace Buffer Size",
+        description="Number of most recent trace lines kept in memory",
+        default=10000,
+        min=100,
+        update=lambda self, context: configure_logging(self)
+    )
+    palette_cache: BoolProperty(
+        name="Cache Parsed Palettes",
+        description="Keep imported palette files parsed on disk, re-importing an unchanged file skips parsing",
+        default=True
+    )
+    repair_on_load: BoolProperty(
+        name="Repair Events on Load",
+        description="Run Repair Events on every scene when a .blend file is opened",
+        default=False
+    )
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "log_level")
+        layout.prop(self, "repair_on_load")
+        layout.prop(self, "palette_cache")
+        row = layout.row(align=True)
+        row.prop(self, "trace_enabled")
+        row.prop(self, "trace_buffer_size")
+        row = layout.row(align=True)
+        row.label(text=f"Trace buffer: {len(trace_buffer.records)} lines")
+        row.operator("event.dump_trace_log", icon='TEXT')
+
 # Custom Field System
+def field_definition_update(self, context):
+    """Field edits change the defaults that sparse instances resolve"""
+    palette_changed(self.id_data)
+
 class EventField(PropertyGroup):
     name: StringProperty(
         name="Field Name",
         default="new_field",
-        description="Name of the custom field"
+        description="Name of the custom field",
+        update=field_definition_update
     )
     field_type: EnumProperty(
         name="Type",
@@ -32,69 +186,154 @@ class EventField(PropertyGroup):
             ('ENUM', "Enum", "Selection from predefined list"),
         ],
         default='STRING',
-        description="Type of the field"
+        description="Type of the field",
+        update=field_definition_update
     )
     # Default values for different types
-    default_bool: BoolProperty(name="Default", default=False)
-    default_string: StringProperty(name="Default", default="")
-    default_int: IntProperty(name="Default", default=0)
-    default_float: FloatProperty(name="Default", default=0.0)
-    default_array: StringProperty(name="Default", default="", description="Comma-separated values")
-    default_enum: StringProperty(name="Default", default="", description="Default enum value")
+    default_bool: BoolProperty(name="Default", default=False, update=field_definition_update)
+    default_string: StringProperty(name="Default", default="", update=field_definition_update)
+    default_int: IntProperty(name="Default", default=0, update=field_definition_update)
+    default_float: FloatProperty(name="Default", default=0.0, update=field_definition_update)
+    default_array: StringProperty(name="Default", default="", description="Comma-separated values",
+                                  update=field_definition_update)
+    default_enum: StringProperty(name="Default", default="", description="Default enum value",
+                                 update=field_definition_update)
     enum_options: StringProperty(
         name="Enum Options",
         default="",
-        description="Comma-separated list of possible values (e.g., 'option1,option2,option3')"
+        description="Comma-separated list of possible values (e.g., 'option1,option2,option3')",
+        update=field_definition_update
     )
     description: StringProperty(name="Description", default="")
 
+def mark_events_changed(events):
+    """Give the scene's events a new revision token (see export_scene_events)"""
+    events.revision = uuid.uuid4().hex
+
+def field_value_update(self, context):
+    """Edits of a field value in the UI change the events revision"""
+    mark_events_changed(self.id_data.event_system)
+
+# Draw-time caches
+# The panel redraws constantly during playback, so what it derives from the
+# palette is computed once: parsed ENUM options per options string, enum
+# items per field, a template name -> index lookup and the template defaults
+# per scene (dropped on palette edits, load and undo).
+
+@lru_cache(maxsize=4096)
+def enum_options(text):
+    """Parsed ENUM options string, blanks dropped"""
+    return tuple(opt.strip() for opt in text.split(',') if opt.strip())
+
+# Fallback when a value has no ENUM field (or the field has no options)
+NO_ENUM_ITEMS = [('none', 'No Options', 'No enum options defined')]
+
+# (template name, field name, enum_options) -> enum items. Blender does not
+# copy the strings of dynamic enum items, the lists must stay referenced.
+_enum_items = {}
+
+def enum_items(template_name, field_name, options):
+    key = (template_name, field_name, options)
+    items = _enum_items.get(key)
+    if items is None:
+        items = [(opt, opt, f"Select {opt}") for opt in enum_options(options)] or NO_ENUM_ITEMS
+        _enum_items[key] = items
+    return items
+
+_template_lookups = {}
+_template_defaults = {}  # scene pointer -> {template name: [core.FieldValue]}
+
+def palette_changed(scene):
+    """Drop the caches built from the scene's templates"""
+    _template_lookups.pop(scene.as_pointer(), None)
+    _template_defaults.pop(scene.as_pointer(), None)
+    _enum_items.clear()
+
+def template_name_update(self, context):
+    palette_changed(self.id_data)
+
+def find_template(scene, name):
+    """First template called `name`, None if the palette has none"""
+    templates = scene.event_system.event_templates
+    lookup = _template_lookups.get(scene.as_pointer())
+    if lookup is None or lookup[0] != len(templates):
+        names = {}
+        for i, template in enumerate(templates):
+            names.setdefault(template.name, i)
+        lookup = (len(templates), names)
+        _template_lookups[scene.as_pointer()] = lookup
+    i = lookup[1].get(name)
+    if i is None:
+        return None
+    template = templates[i]
+    if template.name != name:
+        # Templates were reordered or removed and re-added since the lookup was built
+        palette_changed(scene)
+        return find_template(scene, name)
+    return template
+
+def template_defaults(scene, name):
+    """Default field values of the template called `name`, [] if there is none"""
+    defaults = _template_defaults.setdefault(scene.as_pointer(), {})
+    values = defaults.get(name)
+    if values is None:
+        template = find_template(scene, name)
+        values = defaults[name] = read_template(template).default_values() if template else []
+    return values
+
 class EventFieldValue(PropertyGroup):
     name: StringProperty(name="Field Name")
     field_type: StringProperty(name="Type")
     # Actual values
-    bool_value: BoolProperty(name="Value")
-    string_value: StringProperty(name="Value")
-    int_value: IntProperty(name="Value")
-    float_value: FloatProperty(name="Value")
-    array_value: StringProperty(name="Value", description="Comma-separated values")
-    enum_value: StringProperty(name="Value", description="Selected enum value")
+    bool_value: BoolProperty(name="Value", update=field_value_update)
+    string_value: StringProperty(name="Value", update=field_value_update)
+    int_value: IntProperty(name="Value", update=field_value_update)
+    float_value: FloatProperty(name="Value", update=field_value_update)
+    array_value: StringProperty(name="Value", description="Comma-separated values", update=field_value_update)
+    enum_value: StringProperty(name="Value", description="Selected enum value", update=field_value_update)
 
     # Dynamic enum property for UI
     def get_enum_items(self, context):
-        """Generate enum items from field definition"""
-        events = context.scene.event_system
-
-        # Find the template and field definition
-        for instance in events.event_instances:
-            for field_val in instance.field_values:
-                if field_val == self:
-                    # Found our field value, now find the template
-                    for template in events.event_templates:
-                        if template.name == instance.template_name:
-                            for field in template.custom_fields:
-                                if field.name == self.name and field.field_type == 'ENUM':
-                                    if field.enum_options:
-                                        options = [opt.strip() for opt in field.enum_options.split(',') if opt.strip()]
-                                        return [(opt, opt, f"Select {opt}") for opt in options]
-                                    break
-                            break
-                    break
-
-        # Fallback if no options found
-        return [('none', 'No Options', 'No enum options defined')]
+        """Enum items from the field definition of this value's template"""
+        scene = self.id_data
+        path = self.path_from_id()  # "event_system.event_instances[12].field_values[3]"
+        start = path.index('[') + 1
+        instance = scene.event_system.event_instances[int(path[start:path.index(']', start)])]
+        template = find_template(scene, instance.template_name)
+        if template:
+            for field in template.custom_fields:
+                if field.name == self.name and field.field_type == 'ENUM':
+                    return enum_items(template.name, field.name, field.enum_options)
+        return NO_ENUM_ITEMS
+
+    # enum_value is the stored value, the dropdown reads and writes it through
+    # get/set, so drawing never has to sync a separate selection
+    def get_enum_selection(self):
+        items = self.get_enum_items(bpy.context)
+        for i, item in enumerate(items):
+            if item[0] == self.enum_value:
+                return i
+        return 0
+
+    def set_enum_selection(self, value):
+        items = self.get_enum_items(bpy.context)
+        if 0 <= value < len(items) and items[value][0] != 'none':
+            self.enum_value = items[value][0]
 
     enum_selection: EnumProperty(
         name="Value",
         description="Select enum value",
         items=get_enum_items,
-        update=lambda self, context: setattr(self, 'enum_value', self.enum_selection)
+        get=get_enum_selection,
+        set=set_enum_selection
     )
 
 class EventTemplate(PropertyGroup):
     name: StringProperty(
         name="Event Name",
         default="New Event",
-        description="Name of the event template"
+        description="Name of the event template",
+        update=template_name_update
     )
     color: FloatVectorProperty(
         name="Color",
@@ -127,6 +366,69 @@ class EventInstance(PropertyGroup):
     )
     field_values: CollectionProperty(type=EventFieldValue)
 
+# Palette hot reload
+# Scenes with palette_watch poll their palette file from a bpy.app.timers
+# callback, one os.stat per scene and interval. When mtime or size change the
+# templates are synced: only changed templates and fields are written.
+PALETTE_WATCH_INTERVAL = 1.0
+
+_palette_watch_keys = {}  # (scene pointer, palette path) -> (mtime_ns, size) of the last sync
+
+def poll_palette(scene, force=False):
+    """Sync the watched palette file into the scene if it changed since the last sync
+
+    Returns sync_palette's (added, updated), None when the file is unchanged.
+    Raises OSError for a missing file and ValueError for an invalid one.
+    """
+    filepath = bpy.path.abspath(scene.event_system.palette_watch_path)
+    stat = os.stat(filepath)
+    key = (stat.st_mtime_ns, stat.st_size)
+    watch_key = (scene.as_pointer(), filepath)
+    if not force and _palette_watch_keys.get(watch_key) == key:
+        return None
+    # Recorded before parsing: a half-written file is reported once, finishing
+    # the write changes the key again
+    _palette_watch_keys[watch_key] = key
+    return sync_palette(scene, core.load_palette_file(filepath, palette_cache_dir(bpy.context)))
+
+def palette_watch_timer():
+    """bpy.app.timers callback, stops itself when no scene watches a palette"""
+    watching = changed = False
+    for scene in bpy.data.scenes:
+        events = getattr(scene, 'event_system', None)
+        if not events or not events.palette_watch or not events.palette_watch_path:
+            continue
+        watching = True
+        try:
+            counts = poll_palette(scene)
+        except FileNotFoundError:
+            # Tools often replace the file, the next poll sees the new one
+            continue
+        except (OSError, ValueError) as e:
+            log.warning("Палетка %s не прочитана: %s", events.palette_watch_path, e)
+            continue
+        if counts and any(counts):
+            changed = True
+            log.info("Палетка %s обновлена: добавлено шаблонов %d, изменено %d",
+                     events.palette_watch_path, *counts)
+    if changed:
+        redraw_areas()
+    return PALETTE_WATCH_INTERVAL if watching else None
+
+def redraw_areas():
+    """Timers run outside any area, tag them all so panels show the change"""
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            area.tag_redraw()
+
+def start_palette_watch():
+    if not bpy.app.timers.is_registered(palette_watch_timer):
+        bpy.app.timers.register(palette_watch_timer, first_interval=PALETTE_WATCH_INTERVAL, persistent=True)
+
+def palette_watch_update(self, context):
+    if self.palette_watch and self.palette_watch_path:
+        start_palette_watch()
+
 class EventSystemProperties(PropertyGroup):
     event_templates: CollectionProperty(type=EventTemplate)
     event_instances: CollectionProperty(type=EventInstance)
@@ -144,6 +446,427 @@ class EventSystemProperties(PropertyGroup):
         description="Show/hide template tools panel",
         default=False
     )
+    show_range_events: BoolProperty(
+        name="Show Events in Range",
+        description="List the events inside the preview range (or the scene range)",
+        default=False
+    )
+    sparse_field_values: BoolProperty(
+        name="Sparse Field Values",
+        description="New and imported events store only the fields that differ from "
+                    "their template defaults, the rest is read from the template",
+        default=False
+    )
+    # Random token replaced on every change to the events, undo restores it
+    # together with the events it describes
+    revision: StringProperty(
+        name="Revision",
+        description="Changes whenever the events change, used to skip unchanged exports",
+        default=""
+    )
+    auto_export: BoolProperty(
+        name="Export on Save",
+        description="Export events when the .blend file is saved (skipped when unchanged)",
+        default=False
+    )
+    auto_export_path: StringProperty(
+        name="Export Path",
+        description="Events file written on save, format taken from the extension (.json, .jsonl, .evb)",
+        default="//animation_events.json",
+        subtype='FILE_PATH'
+    )
+    palette_watch: BoolProperty(
+        name="Watch Palette",
+        description="Update the templates when the palette file changes on disk, "
+                    "only changed templates and fields are rewritten",
+        default=False,
+        update=palette_watch_update
+    )
+    palette_watch_path: StringProperty(
+        name="Palette File",
+        description="Palette file to watch",
+        default="",
+        subtype='FILE_PATH',
+        update=palette_watch_update
+    )
+    storage_version: IntProperty(
+        name="Storage Version",
+        description="Layout of the stored field values, older files are converted on load",
+        default=0
+    )
+
+# Field value storage
+# Blender only saves the properties that were written, so an EventFieldValue
+# costs its name, its type and the one slot of that type. Files from older
+# versions also hold the other slots and a stored enum_selection; the load
+# handler drops them once and records STORAGE_VERSION in the scene.
+STORAGE_VERSION = 1
+VALUE_SLOTS = ('bool_value', 'string_value', 'int_value', 'float_value',
+               'array_value', 'enum_value', 'enum_selection')
+
+def compact_field_values(events):
+    """Remove stored slots that do not match each value's type, return how many"""
+    removed = 0
+    for instance in events.event_instances:
+        for field_value in instance.field_values:
+            keep = core.VALUE_ATTRS.get(field_value.field_type)
+            for slot in VALUE_SLOTS:
+                if slot != keep and slot in field_value:
+                    del field_value[slot]
+                    removed += 1
+    return removed
+
+def migrate_storage(scene):
+    events = scene.event_system
+    if events.storage_version >= STORAGE_VERSION:
+        return
+    removed = compact_field_values(events)
+    events.storage_version = STORAGE_VERSION
+    if removed:
+        log.info("Сцена %s: удалено неиспользуемых слотов значений: %d", scene.name, removed)
+
+def is_event_marker_name(name, template_names):
+    """True for names the add-on gives its markers: '<template>_<frame>'"""
+    template_name, sep, frame = name.rpartition('_')
+    if not sep or template_name not in template_names:
+        return False
+    try:
+        int(frame)
+    except ValueError:
+        return False
+    return True
+
+def repair_events(scene):
+    """Fix what older versions and interrupted operations left behind, in one pass
+
+    - duplicate field values of an instance: the first one of each name is kept
+    - markers named like event markers that no instance owns are removed,
+      as are extra markers sharing an instance's marker name
+    - instances whose marker is missing get one, an unowned marker with the
+      expected name is reused
+    Returns (duplicate values, orphaned markers, re-linked instances).
+    """
+    events = scene.event_system
+    instances = events.event_instances
+
+    duplicates = 0
+    for instance in instances:
+        field_values = instance.field_values
+        if len(field_values) < 2:
+            continue
+        names = set()
+        doomed = []
+        for i, field_value in enumerate(field_values):
+            if field_value.name in names:
+                doomed.append(i)
+            names.add(field_value.name)
+        for i in reversed(doomed):
+            field_values.remove(i)
+        duplicates += len(doomed)
+
+    # One marker per owned name, the first one; the rest are candidates for removal
+    markers = scene.timeline_markers
+    owned = {instance.marker_name for instance in instances}
+    by_name = {}
+    extra = []
+    for marker in markers:
+        if marker.name in by_name:
+            extra.append(marker)
+        else:
+            by_name[marker.name] = marker
+
+    relinked = 0
+    for instance in instances:
+        if instance.marker_name and instance.marker_name in by_name:
+            continue
+        name = f"{instance.template_name}_{instance.frame}"
+        marker = by_name.get(name)
+        if marker is None or name in owned:
+            marker = by_name[name] = markers.new(name, frame=instance.frame)
+        marker.frame = instance.frame
+        instance.marker_name = name
+        owned.add(name)
+        relinked += 1
+
+    template_names = {template.name for template in events.event_templates}
+    template_names.update(instance.template_name for instance in instances)
+    orphans = [marker for marker in extra if marker.name in owned or is_event_marker_name(marker.name, template_names)]
+    orphans.extend(marker for name, marker in by_name.items()
+                   if name not in owned and is_event_marker_name(name, template_names))
+    remove_marker_list(scene, orphans)
+
+    if relinked:
+        get_event_index(scene).rebuild(instances)
+    if duplicates or relinked:
+        mark_events_changed(events)
+    return duplicates, len(orphans), relinked
+
+# Runtime event index
+# Lookup tables derived from event_instances. They live only in memory (not in
+# the .blend), are kept in sync by the operators and rebuilt on load/undo.
+class EventIndex:
+    """Frame and (template, frame) lookups for one scene's event instances
+
+    sorted_frames and template_frames keep the occupied frames in order, so
+    next/previous/range queries are bisections instead of scans;
+    event_frames keeps every instance's frame in order for range counts.
+    """
+
+    def __init__(self):
+        self.frames = []           # instance index -> frame
+        self.templates = []        # instance index -> template name
+        self.by_frame = {}         # frame -> sorted instance indices
+        self.by_key = {}           # (template name, frame) -> instance index
+        self.sorted_frames = []    # frames holding any event, ascending
+        self.event_frames = []     # frame of every instance, ascending
+        self.template_frames = {}  # template name -> frames holding it, ascending
+
+    def rebuild(self, instances):
+        frames = array('i', [0]) * len(instances)
+        instances.foreach_get("frame", frames)
+        self.frames = list(frames)
+        self.templates = [instance.template_name for instance in instances]
+        self.by_frame = {}
+        for i, frame in enumerate(self.frames):
+            self.by_frame.setdefault(frame, []).append(i)
+        # setdefault keeps the first instance if a file already holds duplicates
+        self.by_key = {}
+        for i, key in enumerate(zip(self.templates, self.frames)):
+            self.by_key.setdefault(key, i)
+        self.sorted_frames = sorted(self.by_frame)
+        self.event_frames = sorted(self.frames)
+        self.template_frames = {}
+        for template_name, frame in sorted(self.by_key, key=lambda key: key[1]):
+            self.template_frames.setdefault(template_name, []).append(frame)
+
+    def add(self, template_name, frame):
+        i = len(self.frames)
+        self.frames.append(frame)
+        self.templates.append(template_name)
+        self._link(i, frame)
+        return i
+
+    def find(self, template_name, frame):
+        """Instance holding template_name on frame, None if the slot is free"""
+        return self.by_key.get((template_name, frame))
+
+    def move(self, i, frame):
+        old_frame = self.frames[i]
+        if old_frame == frame:
+            return
+        self._unlink(i, old_frame)
+        self.frames[i] = frame
+        self._link(i, frame)
+
+    def remove(self, i):
+        self._unlink(i, self.frames.pop(i))
+        self.templates.pop(i)
+        # Collection removal shifts every later instance down by one
+        for indices in self.by_frame.values():
+            for k, j in enumerate(indices):
+                if j > i:
+                    indices[k] = j - 1
+        for key, j in self.by_key.items():
+            if j > i:
+                self.by_key[key] = j - 1
+
+    def first_at(self, frame):
+        indices = self.by_frame.get(frame)
+        return indices[0] if indices else None
+
+    def next_frame(self, frame, template_name=None):
+        """First occupied frame after `frame`, None at the end"""
+        frames = self._sorted(template_name)
+        k = bisect_right(frames, frame)
+        return frames[k] if k < len(frames) else None
+
+    def previous_frame(self, frame, template_name=None):
+        """Last occupied frame before `frame`, None at the start"""
+        frames = self._sorted(template_name)
+        k = bisect_left(frames, frame)
+        return frames[k - 1] if k else None
+
+    def frames_in_range(self, start, end, template_name=None):
+        """Occupied frames in [start, end], ascending"""
+        frames = self._sorted(template_name)
+        return frames[bisect_left(frames, start):bisect_right(frames, end)]
+
+    def in_range(self, start, end, template_name=None):
+        """Instance indices with a frame in [start, end], ordered by frame"""
+        return list(self.iter_range(start, end, template_name))
+
+    def iter_range(self, start, end, template_name=None):
+        """Lazy in_range, for callers that only take the first few indices"""
+        frames = self._sorted(template_name)
+        for k in range(bisect_left(frames, start), len(frames)):
+            frame = frames[k]
+            if frame > end:
+                return
+            if template_name:
+                yield self.by_key[(template_name, frame)]
+            else:
+                yield from self.by_frame[frame]
+
+    def count_in_range(self, start, end, template_name=None):
+        """len(in_range(...)) in two bisections"""
+        frames = self.template_frames.get(template_name, []) if template_name else self.event_frames
+        return max(0, bisect_right(frames, end) - bisect_left(frames, start))
+
+    def _sorted(self, template_name):
+        if template_name:
+            return self.template_frames.get(template_name, [])
+        return self.sorted_frames
+
+    def _link(self, i, frame):
+        indices = self.by_frame.get(frame)
+        if indices is None:
+            self.by_frame[frame] = [i]
+            insort(self.sorted_frames, frame)
+        else:
+            insort(indices, i)
+        insort(self.event_frames, frame)
+        key = (self.templates[i], frame)
+        if key not in self.by_key:
+            self.by_key[key] = i
+            insort(self.template_frames.setdefault(key[0], []), frame)
+
+    def _unlink(self, i, frame):
+        indices = self.by_frame[frame]
+        indices.remove(i)
+        if not indices:
+            del self.by_frame[frame]
+            del self.sorted_frames[bisect_left(self.sorted_frames, frame)]
+        del self.event_frames[bisect_left(self.event_frames, frame)]
+        key = (self.templates[i], frame)
+        if self.by_key.get(key) == i:
+            del self.by_key[key]
+            frames = self.template_frames[key[0]]
+            del frames[bisect_left(frames, frame)]
+            if not frames:
+                del self.template_frames[key[0]]
+
+_event_indexes = {}
+
+def get_event_index(scene):
+    """Return the scene's EventIndex, rebuilding it if it went stale"""
+    instances = scene.event_system.event_instances
+    index = _event_indexes.get(scene.as_pointer())
+    # Length mismatch means instances changed behind our back (undo, scripts)
+    if index is None or len(index.frames) != len(instances):
+        index = EventIndex()
+        index.rebuild(instances)
+        _event_indexes[scene.as_pointer()] = index
+    return index
+
+def instance_index(instance):
+    """Collection index of an EventInstance, read from its RNA path"""
+    path = instance.path_from_id()  # "event_system.event_instances[12]"
+    return int(path[path.rindex('[') + 1:-1])
+
+def add_event_instances(scene, keys):
+    """Create markers and instances for (template_name, frame) pairs in bulk
+
+    Markers are created in one pass and no update callbacks fire, callers
+    are responsible for conflict checks. Returns the new collection indices.
+    """
+    index = get_event_index(scene)
+    keys = [(template_name, int(frame)) for template_name, frame in keys]
+
+    markers = scene.timeline_markers
+    for template_name, frame in keys:
+        markers.new(f"{template_name}_{frame}", frame=frame)
+
+    instances = scene.event_system.event_instances
+    start = len(instances)
+    for template_name, frame in keys:
+        instance = instances.add()
+        instance.template_name = template_name
+        # Raw write skips update_event_frame - a new instance has nothing to sync
+        instance["frame"] = frame
+        instance.marker_name = f"{template_name}_{frame}"
+        index.add(template_name, frame)
+    if keys:
+        mark_events_changed(scene.event_system)
+    return range(start, len(instances))
+
+def add_event_instance(scene, template_name, frame):
+    """Create marker and instance for a single event"""
+    i = add_event_instances(scene, [(template_name, frame)])[0]
+    return scene.event_system.event_instances[i]
+
+# Past this many markers, remove_markers() rebuilds the marker list instead
+MARKER_REMOVE_LIMIT = 64
+
+def remove_markers(scene, names):
+    """Remove timeline markers whose name is in `names`, returns the count
+
+    TimelineMarkers.remove() searches the marker list for its argument, so
+    removing many markers one by one is quadratic. Past MARKER_REMOVE_LIMIT
+    the list is cleared and the markers that are kept are re-created, see
+    remove_marker_list.
+    """
+    return remove_marker_list(scene, [marker for marker in scene.timeline_markers if marker.name in names])
+
+def remove_marker_list(scene, doomed):
+    """Remove the given TimelineMarker objects, see remove_markers
+
+    The bulk path takes off every event marker of this add-on and re-creates
+    the ones that stay with their name, frame, selection and camera; anything
+    else attached to them (Python references, the marker's identity) is
+    dropped. User and camera markers the add-on does not own are left alone.
+    """
+    markers = scene.timeline_markers
+    if len(doomed) <= MARKER_REMOVE_LIMIT:
+        for marker in doomed:
+            markers.remove(marker)
+        return len(doomed)
+
+    pointers = {marker.as_pointer() for marker in doomed}
+    owned = {instance.marker_name for instance in scene.event_system.event_instances}
+    own = [marker for marker in markers if marker.as_pointer() in pointers or marker.name in owned]
+    kept = [(marker.name, marker.frame, marker.select, marker.camera)
+            for marker in own if marker.as_pointer() not in pointers]
+    if len(own) == len(markers):
+        markers.clear()
+    else:
+        # remove() searches from the list head: taking every own marker off in
+        # list order leaves only the foreign markers in front of the next one
+        for marker in own:
+            markers.remove(marker)
+    for name, frame, select, camera in kept:
+        marker = markers.new(name, frame=frame)
+        marker.select = select
+        if camera is not None:
+            marker.camera = camera
+    return len(doomed)
+
+def remove_event_instances(scene, indices):
+    """Remove instances at the given collection indices and their markers
+
+    One pass over the markers, instances removed from the back so earlier
+    indices stay valid, then the runtime index is rebuilt once.
+    """
+    events = scene.event_system
+    instances = events.event_instances
+    index = get_event_index(scene)
+    indices = sorted(set(indices), reverse=True)
+    if not indices:
+        return 0
+
+    names = {instances[i].marker_name for i in indices}
+    remove_markers(scene, names)
+
+    if len(indices) == len(instances):
+        instances.clear()
+    else:
+        for i in indices:
+            instances.remove(i)
+    index.rebuild(instances)
+    mark_events_changed(events)
+
+    if events.active_instance_index >= len(instances):
+        events.active_instance_index = max(len(instances) - 1, 0)
+    return len(indices)
 
 # UI Lists for custom fields
 class EVENT_UL_fields(UIList):
@@ -166,7 +889,26 @@ class EVENT_UL_templates(UIList):
             layout.alignment = 'CENTER'
             layout.label(text="", icon='EVENT')
 
+# Filter/sort results of EVENT_UL_instances per scene: (key, flags, order).
+# The key holds the events revision, so the arrays are recomputed only after
+# the collection or the filter settings change, not on every redraw/scroll.
+_instance_list_cache = {}
+
 class EVENT_UL_instances(UIList):
+    filter_field_name: StringProperty(
+        name="Field",
+        description="Only show events with this field"
+    )
+    filter_field_value: StringProperty(
+        name="Value",
+        description="Only show events whose field value contains this text"
+    )
+    sort_by_frame: BoolProperty(
+        name="Sort by Frame",
+        description="Order events by frame instead of creation order",
+        default=True
+    )
+
     def draw_item(self, context, layout, data, item, icon, active_data, active_propname):
         if self.layout_type in {'DEFAULT', 'COMPACT'}:
             layout.label(text=f"{item.template_name} @ Frame {item.frame}")
@@ -176,6 +918,71 @@ class EVENT_UL_instances(UIList):
             layout.alignment = 'CENTER'
             layout.label(text="", icon='MARKER')
 
+    def draw_filter(self, context, layout):
+        row = layout.row(align=True)
+        row.prop(self, "filter_name", text="", icon='VIEWZOOM')
+        row.prop(self, "use_filter_invert", text="", icon='ARROW_LEFTRIGHT')
+        row = layout.row(align=True)
+        row.prop(self, "filter_field_name", text="")
+        row.prop(self, "filter_field_value", text="")
+        row = layout.row(align=True)
+        row.prop(self, "sort_by_frame", toggle=True)
+        row.prop(self, "use_filter_sort_reverse", text="", icon='SORT_DESC')
+
+    def filter_items(self, context, data, propname):
+        instances = getattr(data, propname)
+        scene = data.id_data
+        key = (data.revision, len(instances), self.filter_name, self.use_filter_invert,
+               self.filter_field_name, self.filter_field_value, self.sort_by_frame)
+        cached = _instance_list_cache.get(scene.as_pointer())
+        if cached and cached[0] == key:
+            return cached[1], cached[2]
+
+        index = get_event_index(scene)
+        flags = []
+        if self.filter_name or self.filter_field_name:
+            flags = self._filter_flags(scene, instances, index)
+        order = []
+        if self.sort_by_frame:
+            order = [0] * len(instances)
+            position = 0
+            for frame in index.sorted_frames:
+                for i in index.by_frame[frame]:
+                    order[i] = position
+                    position += 1
+
+        _instance_list_cache[scene.as_pointer()] = (key, flags, order)
+        return flags, order
+
+    def _filter_flags(self, scene, instances, index):
+        """Template name pattern and field value filter, inverted by use_filter_invert"""
+        pattern = self.filter_name.lower()
+        if pattern and '*' not in pattern:
+            pattern = f"*{pattern}*"
+        field_filter = None
+        if self.filter_field_name:
+            field_filter = core.EventFilter(field_name=self.filter_field_name, field_op='CONTAINS',
+                                            field_value=self.filter_field_value)
+
+        # Many instances share a template, match each name once
+        name_matches = {}
+        flags = []
+        for i, template_name in enumerate(index.templates):
+            shown = name_matches.get(template_name)
+            if shown is None:
+                shown = not pattern or fnmatch.fnmatchcase(template_name.lower(), pattern)
+                name_matches[template_name] = shown
+            if shown and field_filter:
+                shown = field_filter.matches_fields(read_resolved_event(scene, instances[i]).field_values)
+            if shown != self.use_filter_invert:
+                flags.append(self.bitflag_filter_item)
+            else:
+                flags.append(0)
+        return flags
+
+# Rows shown by the "Events in Range" view
+RANGE_VIEW_LIMIT = 20
+
 class EVENT_PT_panel(Panel):
     bl_label = "Animation Events"
     bl_idname = "EVENT_PT_panel"
@@ -262,7 +1069,7 @@ class EVENT_PT_panel(Panel):
                         field_box.prop(field, "default_enum", text="Default Value")
                         # Show preview of enum options
                         if field.enum_options:
-                            options = [opt.strip() for opt in field.enum_options.split(',') if opt.strip()]
+                            options = enum_options(field.enum_options)
                             preview_box = field_box.box()
                             preview_box.scale_y = 0.7
                             preview_row = preview_box.row()
@@ -308,6 +1115,14 @@ class EVENT_PT_panel(Panel):
                 export_col.enabled = False
                 export_col.operator("event.export_palette", text="Export Palette (No Templates)", icon='EXPORT')
 
+            watch_row = template_tools.row(align=True)
+            watch_row.use_property_split = False
+            watch_row.prop(events, "palette_watch", text="")
+            sub = watch_row.row(align=True)
+            sub.active = events.palette_watch
+            sub.prop(events, "palette_watch_path")
+            watch_row.operator("event.sync_palette", text="", icon='FILE_REFRESH')
+
         layout.separator()
 
         # Add to Timeline Section
@@ -319,16 +1134,25 @@ class EVENT_PT_panel(Panel):
                 op = col.operator("event.add_to_timeline",
                                 text=f"Add '{template.name}' to Frame {scene.frame_current}",
                                 icon='MARKER_HLT')
+                layout.operator("event.stamp_template", text=f"Stamp '{template.name}' on Frames...",
+                                icon='MARKER')
+        layout.operator("event.generate_footsteps", icon='ARMATURE_DATA')
+        layout.operator("event.place_audio_onsets", icon='SOUND')
 
         layout.separator()
 
-        # Timeline Events Section (remains unchanged)
-        layout.label(text="Timeline Events:", icon='MARKER')
+        # Timeline Events Section
+        row = layout.row(align=True)
+        row.label(text="Timeline Events:", icon='MARKER')
+        row.operator("event.jump_to_event", text="", icon='PREV_KEYFRAME').direction = 'PREVIOUS'
+        row.operator("event.jump_to_event", text="", icon='NEXT_KEYFRAME').direction = 'NEXT'
 
         if events.event_instances:
             layout.template_list("EVENT_UL_instances", "", events, "event_instances",
                                events, "active_instance_index")
 
+            self.draw_range_events(layout, scene, events)
+
             # Edit selected event instance
             if events.active_instance_index < len(events.event_instances):
                 instance = events.event_instances[events.active_instance_index]
@@ -340,46 +1164,38 @@ class EVENT_PT_panel(Panel):
                 row.label(text="Frame:")
                 row.prop(instance, "frame", text="")
 
-                # Custom field values for this instance
-                if instance.field_values:
+                # Custom field values for this instance. Template fields the
+                # instance does not store show their default and can be overridden
+                defaults = template_defaults(scene, instance.template_name)
+                if instance.field_values or defaults:
                     box.separator()
                     box.label(text="Field Values:", icon='PROPERTIES')
 
-                    shown_fields = set()
-
+                    stored = {}
                     for field_value in instance.field_values:
-                        if field_value.name in shown_fields:
-                            continue
-                        shown_fields.add(field_value.name)
+                        stored.setdefault(field_value.name, field_value)
 
+                    for default in defaults:
+                        field_value = stored.pop(default.name, None)
                         field_row = box.row()
-                        field_row.label(text=f"{field_value.name}:")
+                        field_row.label(text=f"{default.name}:")
+                        if field_value is None:
+                            value = f"{default.value:g}" if default.type == 'FLOAT' else str(default.value)
+                            field_row.label(text=f"{value} (default)")
+                            op = field_row.operator("event.override_field", text="", icon='GREASEPENCIL')
+                        else:
+                            self.draw_field_value(field_row, field_value)
+                            op = field_row.operator("event.reset_field", text="", icon='LOOP_BACK')
+                        op.field_name = default.name
 
-                        if field_value.field_type == 'BOOL':
-                            field_row.prop(field_value, "bool_value", text="")
-                        elif field_value.field_type == 'STRING':
-                            field_row.prop(field_value, "string_value", text="")
-                        elif field_value.field_type == 'INT':
-                            field_row.prop(field_value, "int_value", text="")
-                        elif field_value.field_type == 'FLOAT':
-                            field_row.prop(field_value, "float_value", text="")
-                        elif field_value.field_type == 'ARRAY':
-                            field_row.prop(field_value, "array_value", text="")
-                        elif field_value.field_type == 'ENUM':
-                            # Set current selection before drawing
-                            if field_value.enum_value and hasattr(field_value, 'enum_selection'):
-                                try:
-                                    field_value.enum_selection = field_value.enum_value
-                                except:
-                                    pass
-                            field_row.prop(field_value, "enum_selection", text="")
+                    # Values of fields the template does not define (any more)
+                    for field_value in stored.values():
+                        field_row = box.row()
+                        field_row.label(text=f"{field_value.name}:")
+                        self.draw_field_value(field_row, field_value)
 
                 # Show template info if valid template is selected
-                selected_template = None
-                for template in events.event_templates:
-                    if template.name == instance.template_name:
-                        selected_template = template
-                        break
+                selected_template = find_template(scene, instance.template_name)
 
                 if selected_template:
                     info_box = box.box()
@@ -410,6 +1226,68 @@ class EVENT_PT_panel(Panel):
         row.operator("event.export_events", icon='EXPORT')
         row.operator("event.import_events", icon='IMPORT')
         row.operator("event.clear_all_events", icon='TRASH')
+        if _export_threads:
+            exporting = ", ".join(os.path.basename(filepath) for filepath in _export_threads)
+            layout.label(text=f"Exporting {exporting}...", icon='SORTTIME')
+        elif _export_reports:
+            level, message = _export_reports[-1]
+            layout.label(text=message, icon='ERROR' if level == 'ERROR' else 'CHECKMARK')
+        layout.operator("event.remove_events_by_filter", icon='FILTER')
+        row = layout.row(align=True)
+        row.prop(events, "sparse_field_values")
+        row.operator("event.strip_default_values", text="", icon='BRUSH_DATA')
+        row.operator("event.repair_events", text="", icon='TOOL_SETTINGS')
+        row = layout.row(align=True)
+        row.prop(events, "auto_export", text="")
+        sub = row.row(align=True)
+        sub.active = events.auto_export
+        sub.prop(events, "auto_export_path")
+
+    def draw_field_value(self, layout, field_value):
+        if field_value.field_type == 'BOOL':
+            layout.prop(field_value, "bool_value", text="")
+        elif field_value.field_type == 'STRING':
+            layout.prop(field_value, "string_value", text="")
+        elif field_value.field_type == 'INT':
+            layout.prop(field_value, "int_value", text="")
+        elif field_value.field_type == 'FLOAT':
+            layout.prop(field_value, "float_value", text="")
+        elif field_value.field_type == 'ARRAY':
+            layout.prop(field_value, "array_value", text="")
+        elif field_value.field_type == 'ENUM':
+            # Reads enum_value through its getter, draw writes nothing
+            layout.prop(field_value, "enum_selection", text="")
+
+    def draw_range_events(self, layout, scene, events):
+        """Collapsible list of the events inside the preview (or scene) range"""
+        if scene.use_preview_range:
+            start, end, range_name = scene.frame_preview_start, scene.frame_preview_end, "Preview Range"
+        else:
+            start, end, range_name = scene.frame_start, scene.frame_end, "Scene Range"
+
+        index = get_event_index(scene)
+        # Redraws run during playback: count by bisection, build only the drawn rows
+        count = index.count_in_range(start, end)
+
+        header_row = layout.row(align=True)
+        icon = 'DOWNARROW_HLT' if events.show_range_events else 'RIGHTARROW'
+        header_row.prop(events, "show_range_events",
+                        text=f"Events in {range_name} ({start}-{end}): {count}",
+                        icon=icon,
+                        emboss=False)
+        if not events.show_range_events:
+            return
+
+        box = layout.box()
+        col = box.column(align=True)
+        for i in islice(index.iter_range(start, end), RANGE_VIEW_LIMIT):
+            op = col.operator("event.select_event",
+                              text=f"{index.templates[i]} @ Frame {index.frames[i]}",
+                              icon='MARKER_HLT' if i == events.active_instance_index else 'MARKER',
+                              emboss=False)
+            op.index = i
+        if count > RANGE_VIEW_LIMIT:
+            box.label(text=f"... and {count - RANGE_VIEW_LIMIT} more")
 
 # Field management operators
 class EVENT_OT_add_field(Operator):
@@ -437,6 +1315,7 @@ class EVENT_OT_remove_field(Operator):
             template = events.event_templates[events.active_template_index]
             if template.custom_fields and template.active_field_index < len(template.custom_fields):
                 template.custom_fields.remove(template.active_field_index)
+                palette_changed(context.scene)
                 if template.active_field_index > 0:
                     template.active_field_index -= 1
         return {'FINISHED'}
@@ -455,46 +1334,16 @@ class EVENT_OT_add_to_timeline(Operator):
             template = events.event_templates[events.active_template_index]
 
             # Check if event already exists on this frame
-            for instance in events.event_instances:
-                if instance.frame == current_frame and instance.template_name == template.name:
-                    self.report({'WARNING'}, f"Event '{template.name}' already exists on frame {current_frame}")
-                    return {'CANCELLED'}
-
-            # Create marker
-            marker_name = f"{template.name}_{current_frame}"
-            marker = scene.timeline_markers.new(marker_name, frame=current_frame)
-
-            # Store event instance
-            instance = events.event_instances.add()
-            instance.template_name = template.name
-            instance.frame = current_frame
-            instance.marker_name = marker_name
+            if get_event_index(scene).find(template.name, current_frame) is not None:
+                self.report({'WARNING'}, f"Event '{template.name}' already exists on frame {current_frame}")
+                return {'CANCELLED'}
 
-            # Copy custom field values from template
-            for field in template.custom_fields:
-                field_value = instance.field_values.add()
-                field_value.name = field.name
-                field_value.field_type = field.field_type
-
-                # Set default values
-                if field.field_type == 'BOOL':
-                    field_value.bool_value = field.default_bool
-                elif field.field_type == 'STRING':
-                    field_value.string_value = field.default_string
-                elif field.field_type == 'INT':
-                    field_value.int_value = field.default_int
-                elif field.field_type == 'FLOAT':
-                    field_value.float_value = field.default_float
-                elif field.field_type == 'ARRAY':
-                    field_value.array_value = field.default_array
-                elif field.field_type == 'ENUM':
-                    field_value.enum_value = field.default_enum
-                    # Set the selection property too
-                    if hasattr(field_value, 'enum_selection'):
-                        try:
-                            field_value.enum_selection = field.default_enum
-                        except:
-                            pass
+            # Create marker and store event instance
+            instance = add_event_instance(scene, template.name, current_frame)
+
+            # Copy custom field values from template (sparse instances read them from it)
+            if not events.sparse_field_values:
+                write_field_values(instance, read_template(template).default_values())
 
             # ИСПРАВЛЕНО: Автоматически выделяем новое событие в списке
             events.active_instance_index = len(events.event_instances) - 1
@@ -527,6 +1376,7 @@ class EVENT_OT_remove_template(Operator):
         events = context.scene.event_system
         if events.event_templates and events.active_template_index < len(events.event_templates):
             events.event_templates.remove(events.active_template_index)
+            palette_changed(context.scene)
             if events.active_template_index > 0:
                 events.active_template_index -= 1
         return {'FINISHED'}
@@ -542,25 +1392,20 @@ class EVENT_OT_remove_from_timeline(Operator):
         scene = context.scene
         events = scene.event_system
 
-        # Find and remove marker
-        marker_to_remove = None
-        for marker in scene.timeline_markers:
-            if marker.frame == self.frame:
-                marker_to_remove = marker
-                break
-
-        if marker_to_remove:
-            scene.timeline_markers.remove(marker_to_remove)
-
         # Remove event instance
-        instance_to_remove = None
-        for i, instance in enumerate(events.event_instances):
-            if instance.frame == self.frame:
-                instance_to_remove = i
-                break
+        index = get_event_index(scene)
+        instance_to_remove = index.first_at(self.frame)
 
         if instance_to_remove is not None:
+            # ИСПРАВЛЕНО: удаляем маркер этого события, а не первый маркер на кадре
+            marker_name = events.event_instances[instance_to_remove].marker_name
+            marker = scene.timeline_markers.get(marker_name)
+            if marker:
+                scene.timeline_markers.remove(marker)
+
             events.event_instances.remove(instance_to_remove)
+            index.remove(instance_to_remove)
+            mark_events_changed(events)
             self.report({'INFO'}, f"Removed event from frame {self.frame}")
 
         return {'FINISHED'}
@@ -578,6 +1423,65 @@ class EVENT_OT_go_to_event(Operator):
             self.report({'INFO'}, f"Jumped to frame {instance.frame}")
         return {'FINISHED'}
 
+class EVENT_OT_jump_to_event(Operator):
+    bl_idname = "event.jump_to_event"
+    bl_label = "Jump to Event"
+    bl_description = "Jump to the next or previous frame holding an event"
+
+    direction: EnumProperty(
+        name="Direction",
+        items=[
+            ('NEXT', "Next", "Next event after the current frame"),
+            ('PREVIOUS', "Previous", "Previous event before the current frame"),
+        ],
+        default='NEXT'
+    )
+    only_active_template: BoolProperty(
+        name="Only Active Template",
+        description="Skip events of other templates",
+        default=False
+    )
+
+    def execute(self, context):
+        scene = context.scene
+        events = scene.event_system
+        index = get_event_index(scene)
+
+        template_name = None
+        if self.only_active_template and events.active_template_index < len(events.event_templates):
+            template_name = events.event_templates[events.active_template_index].name
+
+        if self.direction == 'NEXT':
+            frame = index.next_frame(scene.frame_current, template_name)
+        else:
+            frame = index.previous_frame(scene.frame_current, template_name)
+
+        if frame is None:
+            self.report({'INFO'}, f"No {self.direction.lower()} event")
+            return {'CANCELLED'}
+
+        # frame_change_handler selects the first event on the frame
+        scene.frame_set(frame)
+        if template_name:
+            events.active_instance_index = index.find(template_name, frame)
+        return {'FINISHED'}
+
+class EVENT_OT_select_event(Operator):
+    bl_idname = "event.select_event"
+    bl_label = "Select Event"
+    bl_description = "Select the event and jump to its frame"
+
+    index: IntProperty()
+
+    def execute(self, context):
+        scene = context.scene
+        events = scene.event_system
+        if not 0 <= self.index < len(events.event_instances):
+            return {'CANCELLED'}
+        scene.frame_set(get_event_index(scene).frames[self.index])
+        events.active_instance_index = self.index
+        return {'FINISHED'}
+
 class EVENT_OT_duplicate_event(Operator):
     bl_idname = "event.duplicate_event"
     bl_label = "Duplicate Event"
@@ -592,38 +1496,17 @@ class EVENT_OT_duplicate_event(Operator):
             source_instance = events.event_instances[events.active_instance_index]
 
             # Check if event already exists on current frame
-            for instance in events.event_instances:
-                if instance.frame == current_frame and instance.template_name == source_instance.template_name:
-                    self.report({'WARNING'}, f"Event '{source_instance.template_name}' already exists on frame {current_frame}")
-                    return {'CANCELLED'}
-
-            # Create marker
-            marker_name = f"{source_instance.template_name}_{current_frame}"
-            marker = scene.timeline_markers.new(marker_name, frame=current_frame)
+            if get_event_index(scene).find(source_instance.template_name, current_frame) is not None:
+                self.report({'WARNING'}, f"Event '{source_instance.template_name}' already exists on frame {current_frame}")
+                return {'CANCELLED'}
 
-            # Create new instance
-            new_instance = events.event_instances.add()
-            new_instance.template_name = source_instance.template_name
-            new_instance.frame = current_frame
-            new_instance.marker_name = marker_name
+            # Create marker and new instance
+            new_instance = add_event_instance(scene, source_instance.template_name, current_frame)
+            # Adding may reallocate the collection, re-fetch the source
+            source_instance = events.event_instances[events.active_instance_index]
 
             # Copy field values
-            for field_value in source_instance.field_values:
-                new_field_value = new_instance.field_values.add()
-                new_field_value.name = field_value.name
-                new_field_value.field_type = field_value.field_type
-                new_field_value.bool_value = field_value.bool_value
-                new_field_value.string_value = field_value.string_value
-                new_field_value.int_value = field_value.int_value
-                new_field_value.float_value = field_value.float_value
-                new_field_value.array_value = field_value.array_value
-                new_field_value.enum_value = field_value.enum_value
-                # Set the selection property too
-                if hasattr(new_field_value, 'enum_selection'):
-                    try:
-                        new_field_value.enum_selection = field_value.enum_value
-                    except:
-                        pass
+            write_field_values(new_instance, read_event(source_instance).field_values)
 
             self.report({'INFO'}, f"Duplicated event '{source_instance.template_name}' to frame {current_frame}")
         else:
@@ -646,12 +1529,10 @@ class EVENT_OT_move_event_to_current(Operator):
             old_frame = instance.frame
 
             # Check if another event already exists on current frame with same template
-            for other_instance in events.event_instances:
-                if (other_instance != instance and
-                    other_instance.frame == current_frame and
-                    other_instance.template_name == instance.template_name):
-                    self.report({'WARNING'}, f"Event '{instance.template_name}' already exists on frame {current_frame}")
-                    return {'CANCELLED'}
+            other = get_event_index(scene).find(instance.template_name, current_frame)
+            if other is not None and other != events.active_instance_index:
+                self.report({'WARNING'}, f"Event '{instance.template_name}' already exists on frame {current_frame}")
+                return {'CANCELLED'}
 
             # Update the frame (this will trigger the update function)
             instance.frame = current_frame
@@ -662,6 +1543,92 @@ class EVENT_OT_move_event_to_current(Operator):
 
         return {'FINISHED'}
 
+class EVENT_OT_override_field(Operator):
+    bl_idname = "event.override_field"
+    bl_label = "Override Field"
+    bl_description = "Store this field on the selected event, starting from the template default"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    field_name: StringProperty(name="Field")
+
+    def execute(self, context):
+        scene = context.scene
+        events = scene.event_system
+        if not (events.event_instances and events.active_instance_index < len(events.event_instances)):
+            self.report({'ERROR'}, "No event selected")
+            return {'CANCELLED'}
+
+        instance = events.event_instances[events.active_instance_index]
+        default = next((value for value in template_defaults(scene, instance.template_name)
+                        if value.name == self.field_name), None)
+        if default is None or any(value.name == self.field_name for value in instance.field_values):
+            return {'CANCELLED'}
+
+        write_field_values(instance, [default])
+        mark_events_changed(events)
+        return {'FINISHED'}
+
+class EVENT_OT_reset_field(Operator):
+    bl_idname = "event.reset_field"
+    bl_label = "Reset Field"
+    bl_description = "Remove this field from the selected event, it uses the template default again"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    field_name: StringProperty(name="Field")
+
+    def execute(self, context):
+        events = context.scene.event_system
+        if not (events.event_instances and events.active_instance_index < len(events.event_instances)):
+            self.report({'ERROR'}, "No event selected")
+            return {'CANCELLED'}
+
+        field_values = events.event_instances[events.active_instance_index].field_values
+        for i in reversed(range(len(field_values))):
+            if field_values[i].name == self.field_name:
+                field_values.remove(i)
+        mark_events_changed(events)
+        return {'FINISHED'}
+
+class EVENT_OT_strip_default_values(Operator):
+    bl_idname = "event.strip_default_values"
+    bl_label = "Strip Default Values"
+    bl_description = "Remove stored field values that equal their template default from every event"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        scene = context.scene
+        events = scene.event_system
+        removed = 0
+        for instance in events.event_instances:
+            defaults = {value.name: value for value in template_defaults(scene, instance.template_name)}
+            if not defaults:
+                continue
+            stored = read_event(instance).field_values
+            for i in reversed(range(len(stored))):
+                if core.is_default(stored[i], defaults.get(stored[i].name)):
+                    instance.field_values.remove(i)
+                    removed += 1
+        if removed:
+            mark_events_changed(events)
+        log.info("Удалено значений по умолчанию: %d", removed)
+        self.report({'INFO'}, f"Removed {removed} default values")
+        return {'FINISHED'}
+
+class EVENT_OT_repair_events(Operator):
+    bl_idname = "event.repair_events"
+    bl_label = "Repair Events"
+    bl_description = ("Remove duplicate field values and markers no event owns, "
+                      "re-create missing event markers")
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        duplicates, orphans, relinked = repair_events(context.scene)
+        log.info("Починка: дубликатов значений %d, лишних маркеров %d, восстановлено маркеров %d",
+                 duplicates, orphans, relinked)
+        self.report({'INFO'}, f"Removed {duplicates} duplicate field values and {orphans} orphaned markers, "
+                              f"re-linked {relinked} events")
+        return {'FINISHED'}
+
 class EVENT_OT_clear_all_events(Operator):
     bl_idname = "event.clear_all_events"
     bl_label = "Clear All Events"
@@ -671,51 +1638,572 @@ class EVENT_OT_clear_all_events(Operator):
         scene = context.scene
         events = scene.event_system
 
-        # Remove all markers created by this addon
-        markers_to_remove = []
-        for marker in scene.timeline_markers:
-            for instance in events.event_instances:
-                if marker.name == instance.marker_name:
-                    markers_to_remove.append(marker)
+        # Remove all markers created by this addon and the event instances
+        remove_event_instances(scene, range(len(events.event_instances)))
+
+        self.report({'INFO'}, "All events cleared from timeline")
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_confirm(self, event)
+
+class EVENT_OT_remove_events_by_filter(Operator):
+    bl_idname = "event.remove_events_by_filter"
+    bl_label = "Remove Events by Filter"
+    bl_description = "Remove all events matching a frame range, template and field value, with their markers"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    use_frame_range: BoolProperty(
+        name="Frame Range",
+        description="Only remove events inside the frame range",
+        default=False
+    )
+    frame_start: IntProperty(name="Start", default=1)
+    frame_end: IntProperty(name="End", default=250)
+    template_name: StringProperty(
+        name="Template",
+        description="Only remove events of this template (empty for any)"
+    )
+    field_name: StringProperty(
+        name="Field",
+        description="Only remove events whose field matches (empty for any)"
+    )
+    field_op: EnumProperty(
+        name="Condition",
+        items=[
+            ('EQ', "=", "Equal"),
+            ('NE', "!=", "Not equal"),
+            ('LT', "<", "Less than"),
+            ('LE', "<=", "Less or equal"),
+            ('GT', ">", "Greater than"),
+            ('GE', ">=", "Greater or equal"),
+            ('CONTAINS', "Contains", "Array item or substring"),
+        ],
+        default='EQ'
+    )
+    field_value: StringProperty(
+        name="Value",
+        description="Value compared with the field, parsed for the field type"
+    )
+
+    def execute(self, context):
+        scene = context.scene
+        events = scene.event_system
+        index = get_event_index(scene)
+
+        event_filter = core.EventFilter(
+            self.frame_start if self.use_frame_range else None,
+            self.frame_end if self.use_frame_range else None,
+            self.template_name,
+            self.field_name,
+            self.field_op,
+            self.field_value,
+        )
+
+        # Один проход: поля читаем только у событий, подходящих по кадру и шаблону
+        matching = []
+        for i, instance in enumerate(events.event_instances):
+            if not event_filter.matches_key(instance.template_name, index.frames[i]):
+                continue
+            if event_filter.field_name and not event_filter.matches_fields(
+                    read_resolved_event(scene, instance).field_values):
+                continue
+            matching.append(i)
+
+        removed = remove_event_instances(scene, matching)
+        log.info("Удалено событий по фильтру: %d", removed)
+        self.report({'INFO'}, f"Removed {removed} events")
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        self.frame_start = context.scene.frame_start
+        self.frame_end = context.scene.frame_end
+        return context.window_manager.invoke_props_dialog(self)
+
+    def draw(self, context):
+        layout = self.layout
+        events = context.scene.event_system
+        row = layout.row(align=True)
+        row.prop(self, "use_frame_range")
+        sub = row.row(align=True)
+        sub.enabled = self.use_frame_range
+        sub.prop(self, "frame_start")
+        sub.prop(self, "frame_end")
+        layout.prop_search(self, "template_name", events, "event_templates")
+        row = layout.row(align=True)
+        row.prop(self, "field_name", text="")
+        row.prop(self, "field_op", text="")
+        row.prop(self, "field_value", text="")
+
+class EVENT_OT_stamp_template(Operator):
+    bl_idname = "event.stamp_template"
+    bl_label = "Stamp Template"
+    bl_description = "Place the selected template on many frames at once, in one undo step"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    source: EnumProperty(
+        name="Frames",
+        items=[
+            ('LIST', "Frame List", "Frames and ranges like 1, 5, 10-20, 30-60:10"),
+            ('EVERY_N', "Every N Frames", "Every Nth frame of a frame range"),
+            ('MARKERS', "Selected Markers", "Frames of the selected timeline markers"),
+            ('FCURVE', "F-Curve Keyframes", "Keyframes of an F-Curve of the active object"),
+        ],
+        default='EVERY_N'
+    )
+    frames: StringProperty(
+        name="Frames",
+        description="Comma-separated frames and ranges, a range may end with :step"
+    )
+    frame_start: IntProperty(name="Start", default=1)
+    frame_end: IntProperty(name="End", default=250)
+    step: IntProperty(name="Every", default=10, min=1)
+    data_path: StringProperty(name="Data Path", default="location")
+    array_index: IntProperty(name="Index", default=0, min=0)
+
+    def source_frames(self, context):
+        """Target frames, ascending. Raises ValueError with a message for the user"""
+        scene = context.scene
+        if self.source == 'LIST':
+            try:
+                return core.parse_frames(self.frames)
+            except ValueError as e:
+                raise ValueError(f"Invalid frame list '{self.frames}': {e}") from e
+        if self.source == 'EVERY_N':
+            return list(range(self.frame_start, self.frame_end + 1, self.step))
+        if self.source == 'MARKERS':
+            return sorted({marker.frame for marker in scene.timeline_markers if marker.select})
+
+        obj = context.active_object
+        action = obj.animation_data.action if obj and obj.animation_data else None
+        fcurve = action.fcurves.find(self.data_path, index=self.array_index) if action else None
+        if fcurve is None:
+            raise ValueError(f"Active object has no F-Curve {self.data_path}[{self.array_index}]")
+        return sorted({round(keyframe.co[0]) for keyframe in fcurve.keyframe_points})
+
+    def execute(self, context):
+        scene = context.scene
+        events = scene.event_system
+        if not (events.event_templates and events.active_template_index < len(events.event_templates)):
+            self.report({'ERROR'}, "No event template selected")
+            return {'CANCELLED'}
+        template = events.event_templates[events.active_template_index]
+
+        try:
+            frames = self.source_frames(context)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+
+        # One pass: conflicts from the index, markers and instances in bulk,
+        # field values from a table built once for the template
+        index = get_event_index(scene)
+        keys = [(template.name, frame) for frame in frames if index.find(template.name, frame) is None]
+        new_indices = add_event_instances(scene, keys)
+        if not events.sparse_field_values:
+            table = field_table(template_defaults(scene, template.name))
+            instances = events.event_instances
+            for i in new_indices:
+                write_field_table(instances[i], table)
+        if keys:
+            events.active_instance_index = new_indices[-1]
+
+        log.info("Шаблон %s размещен на %d кадрах, занято: %d", template.name, len(keys), len(frames) - len(keys))
+        self.report({'INFO'}, f"Placed '{template.name}' on {len(keys)} frames"
+                              f" ({len(frames) - len(keys)} already had it)")
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        scene = context.scene
+        if scene.use_preview_range:
+            self.frame_start, self.frame_end = scene.frame_preview_start, scene.frame_preview_end
+        else:
+            self.frame_start, self.frame_end = scene.frame_start, scene.frame_end
+        return context.window_manager.invoke_props_dialog(self)
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "source")
+        if self.source == 'LIST':
+            layout.prop(self, "frames")
+        elif self.source == 'EVERY_N':
+            row = layout.row(align=True)
+            row.prop(self, "frame_start")
+            row.prop(self, "frame_end")
+            row.prop(self, "step")
+        elif self.source == 'FCURVE':
+            row = layout.row(align=True)
+            row.prop(self, "data_path")
+            row.prop(self, "array_index")
+
+def guess_foot_bone(bones, side):
+    """Name of the first bone that looks like the left ('L') or right ('R') foot"""
+    suffixes = ('.l', '_l', '-l', 'left') if side == 'L' else ('.r', '_r', '-r', 'right')
+    for bone in bones:
+        name = bone.name.lower()
+        if 'foot' in name and (name.endswith(suffixes) or name.startswith(('left', 'right')[side == 'R'])):
+            return bone.name
+    return ""
+
+class EVENT_OT_generate_footsteps(Operator):
+    bl_idname = "event.generate_footsteps"
+    bl_label = "Generate Footsteps"
+    bl_description = ("Place footstep events where the foot bones of the active armature touch the ground, "
+                      "sampled from its action")
+    bl_options = {'REGISTER', 'UNDO'}
+
+    template_name: StringProperty(name="Template", default="Footstep")
+    left_bone: StringProperty(name="Left Foot")
+    right_bone: StringProperty(name="Right Foot")
+    foot_field: StringProperty(
+        name="Foot Field",
+        description="Template field that receives the foot value",
+        default="foot_type"
+    )
+    left_value: StringProperty(name="Left Value", default="left")
+    right_value: StringProperty(name="Right Value", default="right")
+    use_action_range: BoolProperty(
+        name="Action Range",
+        description="Sample the whole action instead of the frame range below",
+        default=True
+    )
+    frame_start: IntProperty(name="Start", default=1)
+    frame_end: IntProperty(name="End", default=250)
+    height_threshold: FloatProperty(
+        name="Height Tolerance",
+        description="How far above its lowest point a foot still counts as grounded",
+        default=0.02, min=0.0, subtype='DISTANCE'
+    )
+    speed_threshold: FloatProperty(
+        name="Speed Tolerance",
+        description="Fastest movement (units per second) of a grounded foot",
+        default=0.5, min=0.0
+    )
+    min_gap: IntProperty(
+        name="Minimum Gap",
+        description="Landings of one foot closer than this many frames are one contact",
+        default=4, min=1
+    )
+    replace_existing: BoolProperty(
+        name="Replace Existing",
+        description="Remove the template's events inside the sampled range first",
+        default=True
+    )
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.active_object
+        return (obj is not None and obj.type == 'ARMATURE'
+                and obj.animation_data is not None and obj.animation_data.action is not None)
+
+    def execute(self, context):
+        # NumPy is bundled with Blender; imported here so the add-on module
+        # itself also loads where it is missing (benchmarks on the bpy shim)
+        import numpy as np
+        import animation_events_detect as detect
+
+        scene = context.scene
+        events = scene.event_system
+        obj = context.active_object
+        action = obj.animation_data.action
+        template = find_template(scene, self.template_name)
+        if template is None:
+            self.report({'ERROR'}, f"Template '{self.template_name}' not found")
+            return {'CANCELLED'}
+        feet = [(bone, value) for bone, value in ((self.left_bone, self.left_value),
+                                                  (self.right_bone, self.right_value)) if bone]
+        if not feet:
+            self.report({'ERROR'}, "No foot bones selected")
+            return {'CANCELLED'}
+
+        if self.use_action_range:
+            start, end = (int(round(frame)) for frame in action.frame_range)
+        else:
+            start, end = self.frame_start, self.frame_end
+        frames = np.arange(start, end + 1)
+        fps = scene.render.fps / scene.render.fps_base
+
+        started = time.perf_counter()
+        landings = {}  # frame -> foot value, the first foot wins a shared frame
+        for bone_name, value in feet:
+            if bone_name not in obj.data.bones:
+                self.report({'ERROR'}, f"Bone '{bone_name}' not found in {obj.name}")
+                return {'CANCELLED'}
+            try:
+                positions = detect.bone_world_positions(obj, action, bone_name, frames)
+            except ValueError as e:
+                self.report({'ERROR'}, str(e))
+                return {'CANCELLED'}
+            contacts = detect.contact_frames(positions, fps, self.height_threshold,
+                                             self.speed_threshold, self.min_gap)
+            for frame in frames[contacts].tolist():
+                landings.setdefault(frame, value)
+
+        if self.replace_existing:
+            remove_event_instances(scene, get_event_index(scene).in_range(start, end, template.name))
+
+        index = get_event_index(scene)
+        placed = sorted(frame for frame in landings if index.find(template.name, frame) is None)
+        new_indices = add_event_instances(scene, [(template.name, frame) for frame in placed])
+
+        # One field table per foot value, foot_field replaced in the template defaults
+        defaults = template_defaults(scene, template.name)
+        tables = {}
+        for value in {landings[frame] for frame in placed}:
+            values = [core.FieldValue(d.name, d.type, value)
+                      if d.name == self.foot_field and d.type in ('ENUM', 'STRING') else d
+                      for d in defaults]
+            if events.sparse_field_values:
+                values = core.without_defaults(values, defaults)
+            tables[value] = field_table(values)
+        instances = events.event_instances
+        for i, frame in zip(new_indices, placed):
+            write_field_table(instances[i], tables[landings[frame]])
+
+        log.info("Шаги: %d кадров, %d событий за %.3f с", len(frames), len(placed), time.perf_counter() - started)
+        if not any(d.name == self.foot_field for d in defaults):
+            self.report({'WARNING'}, f"Placed {len(placed)} events, template has no '{self.foot_field}' field")
+        else:
+            self.report({'INFO'}, f"Placed {len(placed)} footstep events on frames {start}-{end}")
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        bones = context.active_object.data.bones
+        if self.left_bone not in bones:
+            self.left_bone = guess_foot_bone(bones, 'L')
+        if self.right_bone not in bones:
+            self.right_bone = guess_foot_bone(bones, 'R')
+        return context.window_manager.invoke_props_dialog(self)
+
+    def draw(self, context):
+        layout = self.layout
+        armature = context.active_object.data
+        layout.prop_search(self, "template_name", context.scene.event_system, "event_templates")
+        layout.prop_search(self, "left_bone", armature, "bones")
+        layout.prop_search(self, "right_bone", armature, "bones")
+        layout.prop(self, "foot_field")
+        row = layout.row(align=True)
+        row.prop(self, "left_value", text="")
+        row.prop(self, "right_value", text="")
+        layout.prop(self, "use_action_range")
+        row = layout.row(align=True)
+        row.enabled = not self.use_action_range
+        row.prop(self, "frame_start")
+        row.prop(self, "frame_end")
+        layout.prop(self, "height_threshold")
+        layout.prop(self, "speed_threshold")
+        layout.prop(self, "min_gap")
+        layout.prop(self, "replace_existing")
+
+class EVENT_OT_place_audio_onsets(Operator):
+    bl_idname = "event.place_audio_onsets"
+    bl_label = "Place on Audio Onsets"
+    bl_description = "Place events where sounds start in a WAV file, analyzed in the background (Esc cancels)"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    # Energy is measured per 10 ms hop; each timer tick reads blocks of audio
+    # for at most TICK_BUDGET seconds, then hands control back to the UI
+    HOP_SECONDS = 0.01
+    BLOCK_FRAMES = 1 << 16
+    TICK_BUDGET = 1 / 30
+
+    filepath: StringProperty(
+        name="File Path",
+        description="WAV file to analyze",
+        maxlen=1024,
+        subtype="FILE_PATH"
+    )
+    filter_glob: StringProperty(
+        default="*.wav",
+        options={'HIDDEN'},
+        maxlen=255
+    )
+    template_name: StringProperty(name="Template")
+    start_frame: IntProperty(
+        name="Start Frame",
+        description="Scene frame where the audio starts playing",
+        default=1
+    )
+    threshold: FloatProperty(
+        name="Threshold (dB)",
+        description="How much a sound must rise above the surrounding level to count as an onset. "
+                    "Lower finds more onsets",
+        default=6.0, min=0.0
+    )
+    min_gap: FloatProperty(
+        name="Minimum Gap",
+        description="Onsets closer than this many seconds are one event, the stronger one is kept",
+        default=0.1, min=0.01
+    )
+    silence: FloatProperty(
+        name="Silence (dB)",
+        description="Onsets quieter than this level are ignored",
+        default=-50.0, max=0.0
+    )
+    replace_existing: BoolProperty(
+        name="Replace Existing",
+        description="Remove the template's events along the audio first",
+        default=True
+    )
+
+    def execute(self, context):
+        # NumPy is bundled with Blender, imported on use like in generate_footsteps
+        import wave
+        import animation_events_detect as detect
+
+        if find_template(context.scene, self.template_name) is None:
+            self.report({'ERROR'}, f"Template '{self.template_name}' not found")
+            return {'CANCELLED'}
+        try:
+            self._wav = wave.open(self.filepath, "rb")
+        except (OSError, EOFError, wave.Error) as e:
+            self.report({'ERROR'}, f"Cannot read WAV file {self.filepath}: {e}")
+            return {'CANCELLED'}
+
+        rate = self._wav.getframerate()
+        hop = max(1, round(rate * self.HOP_SECONDS))
+        self._hop_seconds = hop / rate
+        self._duration = self._wav.getnframes() / rate
+        self._envelope = detect.EnergyEnvelope(hop)
+        self._blocks = detect.wave_blocks(self._wav, self.BLOCK_FRAMES)
+        self._read = 0
+        self._started = time.perf_counter()
+        log.info("Анализ звука: %s, %.1f с", os.path.basename(self.filepath), self._duration)
+
+        # Without a window (background mode, scripts) there is no UI to keep alive
+        if context.window is None:
+            try:
+                for block in self._blocks:
+                    self._envelope.feed(block)
+            except ValueError as e:
+                self._wav.close()
+                self.report({'ERROR'}, str(e))
+                return {'CANCELLED'}
+            self._wav.close()
+            return self.finish(context)
+
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(0.01, window=context.window)
+        wm.progress_begin(0, 100)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            self.stop(context)
+            self.report({'WARNING'}, "Audio analysis cancelled")
+            return {'CANCELLED'}
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        deadline = time.perf_counter() + self.TICK_BUDGET
+        try:
+            for block in self._blocks:
+                self._envelope.feed(block)
+                self._read += len(block)
+                if time.perf_counter() >= deadline:
                     break
+            else:
+                self.stop(context)
+                return self.finish(context)
+        except ValueError as e:
+            self.stop(context)
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
 
-        for marker in markers_to_remove:
-            scene.timeline_markers.remove(marker)
+        progress = self._read / max(1, self._wav.getnframes())
+        context.window_manager.progress_update(progress * 100)
+        context.workspace.status_text_set(f"Analyzing audio: {progress:.0%} (Esc to cancel)")
+        return {'RUNNING_MODAL'}
 
-        # Clear event instances
-        events.event_instances.clear()
+    def stop(self, context):
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        wm.progress_end()
+        context.workspace.status_text_set(None)
+        self._wav.close()
 
-        self.report({'INFO'}, "All events cleared from timeline")
+    def cancel(self, context):
+        # Blender dropped the handler itself (file load, window closed)
+        self.stop(context)
+
+    def finish(self, context):
+        """Turns the energy envelope into events, in one bulk insert"""
+        import animation_events_detect as detect
+
+        scene = context.scene
+        events = scene.event_system
+        # The template may have been removed while the audio was analyzed
+        template = find_template(scene, self.template_name)
+        if template is None:
+            self.report({'ERROR'}, f"Template '{self.template_name}' not found")
+            return {'CANCELLED'}
+
+        fps = scene.render.fps / scene.render.fps_base
+        hops = detect.onset_hops(self._envelope.energies(), self._hop_seconds,
+                                 self.threshold, self.min_gap, self.silence)
+        frames = detect.onset_frames(hops, self._hop_seconds, fps, self.start_frame).tolist()
+
+        if self.replace_existing:
+            end = self.start_frame + int(round(self._duration * fps))
+            remove_event_instances(scene, get_event_index(scene).in_range(self.start_frame, end, template.name))
+
+        index = get_event_index(scene)
+        placed = [frame for frame in frames if index.find(template.name, frame) is None]
+        new_indices = add_event_instances(scene, [(template.name, frame) for frame in placed])
+        if not events.sparse_field_values:
+            table = field_table(template_defaults(scene, template.name))
+            instances = events.event_instances
+            for i in new_indices:
+                write_field_table(instances[i], table)
+        if placed:
+            events.active_instance_index = new_indices[-1]
+
+        log.info("Звук: %d событий за %.3f с", len(placed), time.perf_counter() - self._started)
+        self.report({'INFO'}, f"Placed '{template.name}' on {len(placed)} audio onsets"
+                              f" ({len(frames) - len(placed)} frames already had it)")
         return {'FINISHED'}
 
     def invoke(self, context, event):
-        return context.window_manager.invoke_confirm(self, event)
+        events = context.scene.event_system
+        if (find_template(context.scene, self.template_name) is None and events.event_templates
+                and events.active_template_index < len(events.event_templates)):
+            self.template_name = events.event_templates[events.active_template_index].name
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop_search(self, "template_name", context.scene.event_system, "event_templates")
+        layout.prop(self, "start_frame")
+        layout.prop(self, "threshold")
+        layout.prop(self, "min_gap")
+        layout.prop(self, "silence")
+        layout.prop(self, "replace_existing")
 
 def update_event_frame(self, context):
     """Called when frame is changed"""
     scene = context.scene
-    events = scene.event_system
+    index = get_event_index(scene)
+    i = instance_index(self)
 
     # Check for conflicts with other events
-    for other_instance in events.event_instances:
-        if (other_instance != self and
-            other_instance.frame == self.frame and
-            other_instance.template_name == self.template_name):
-            # Revert the change
-            for marker in scene.timeline_markers:
-                if marker.name == self.marker_name:
-                    self.frame = marker.frame
-                    break
-            return
+    other = index.find(self.template_name, self.frame)
+    if other is not None and other != i:
+        # Revert the change (raw write, nothing else to sync)
+        self["frame"] = index.frames[i]
+        return
+
+    index.move(i, self.frame)
+    mark_events_changed(scene.event_system)
 
     # Update marker frame and name
-    for marker in scene.timeline_markers:
-        if marker.name == self.marker_name:
-            marker.frame = self.frame
-            new_name = f"{self.template_name}_{self.frame}"
-            marker.name = new_name
-            self.marker_name = new_name
-            break
+    marker = scene.timeline_markers.get(self.marker_name)
+    if marker:
+        marker.frame = self.frame
+        new_name = f"{self.template_name}_{self.frame}"
+        marker.name = new_name
+        self.marker_name = new_name
 
 @persistent
 def frame_change_handler(scene):
@@ -724,13 +2212,391 @@ def frame_change_handler(scene):
         return
 
     events = scene.event_system
-    current_frame = scene.frame_current
 
     # Find event on current frame
-    for i, instance in enumerate(events.event_instances):
-        if instance.frame == current_frame:
-            events.active_instance_index = i
+    i = get_event_index(scene).first_at(scene.frame_current)
+    if i is not None and events.active_instance_index != i:
+        events.active_instance_index = i
+
+@persistent
+def load_post_handler(dummy):
+    """Convert old field value storage and rebuild runtime indexes for the loaded file"""
+    _event_indexes.clear()
+    _template_lookups.clear()
+    _template_defaults.clear()
+    _enum_items.clear()
+    _instance_list_cache.clear()
+    _palette_watch_keys.clear()
+    prefs = get_preferences(bpy.context)
+    for scene in bpy.data.scenes:
+        if hasattr(scene, 'event_system'):
+            if scene.event_system.palette_watch:
+                start_palette_watch()
+            migrate_storage(scene)
+            if prefs and prefs.repair_on_load:
+                counts = repair_events(scene)
+                if any(counts):
+                    log.info("Сцена %s: дубликатов значений %d, лишних маркеров %d, восстановлено маркеров %d",
+                             scene.name, *counts)
+            get_event_index(scene)
+
+@persistent
+def save_post_handler(dummy):
+    """Export on save for scenes that enabled it, unchanged events are skipped"""
+    for scene in bpy.data.scenes:
+        events = getattr(scene, 'event_system', None)
+        if not events or not events.auto_export or not events.auto_export_path:
+            continue
+        filepath = bpy.path.abspath(events.auto_export_path)
+        background = use_background_export()
+        if background and filepath in _export_threads:
+            log.warning("Экспорт при сохранении пропущен, предыдущий еще идет: %s", filepath)
+            continue
+        try:
+            write = prepare_events_export(scene, filepath, export_format_for_path(filepath), snapshot=background)
+            if write and background:
+                start_background_write(filepath, "events", write)
+            elif write:
+                write()
+        except Exception as e:
+            log.error("Ошибка экспорта при сохранении (%s): %s", scene.name, e)
+
+@persistent
+def undo_post_handler(scene):
+    """Undo/redo restores data behind the indexes, rebuild lazily"""
+    _event_indexes.clear()
+    _template_lookups.clear()
+    _template_defaults.clear()
+    _enum_items.clear()
+    _instance_list_cache.clear()
+    # Undo may turn palette watching back on without its update callback
+    events = getattr(scene, 'event_system', None)
+    if events and events.palette_watch:
+        start_palette_watch()
+
+# Core model adapters
+# Copy between the PropertyGroups and the bpy-independent objects of
+# animation_events_core, which owns the type dispatch and the file layouts.
+
+def read_field(field):
+    attr = core.DEFAULT_ATTRS.get(field.field_type)
+    return core.Field(field.name, field.field_type, getattr(field, attr) if attr else None,
+                      field.enum_options, field.description)
+
+def read_template(template):
+    return core.Template(template.name, template.description, tuple(template.color),
+                         [read_field(field) for field in template.custom_fields])
+
+def write_template(template, data):
+    """Fill an EventTemplate from a core.Template, replacing its fields"""
+    template.name = data.name
+    template.description = data.description
+    template.color = data.color
+    template.custom_fields.clear()
+    for field_data in data.fields:
+        write_field(template.custom_fields.add(), field_data)
+
+def write_field(field, data):
+    """Fill an EventField from a core.Field"""
+    field.name = data.name
+    field.field_type = data.type
+    field.description = data.description
+    attr = core.DEFAULT_ATTRS.get(data.type)
+    if attr:
+        setattr(field, attr, data.default)
+    field.enum_options = data.enum_options
+
+def apply_template_diff(template, diff):
+    """Apply a core.TemplateDiff to an EventTemplate, writing only what changed"""
+    for attr, value in diff.attrs.items():
+        setattr(template, attr, value)
+    fields = template.custom_fields
+    if diff.removed:
+        removed = set(diff.removed)
+        for i in reversed(range(len(fields))):
+            if fields[i].name in removed:
+                fields.remove(i)
+    if diff.changed:
+        by_name = {field.name: field for field in fields}
+        for name, changes in diff.changed.items():
+            field = by_name[name]
+            for attr, value in changes.items():
+                if attr == "type":
+                    field.field_type = value
+                elif attr == "default":
+                    default_attr = core.DEFAULT_ATTRS.get(field.field_type)
+                    if default_attr:
+                        setattr(field, default_attr, value)
+                else:
+                    setattr(field, attr, value)
+    for field_data in diff.added:
+        write_field(fields.add(), field_data)
+    if diff.order:
+        for target, name in enumerate(diff.order):
+            current = next(i for i in range(target, len(fields)) if fields[i].name == name)
+            if current != target:
+                fields.move(current, target)
+
+def sync_palette(scene, templates):
+    """Bring the scene's templates up to date with core.Template items
+
+    Templates missing from the scene are added, changed ones get only their
+    differences applied, templates the palette does not have are kept.
+    Returns (added, updated).
+    """
+    events = scene.event_system
+    palette = events.event_templates
+    by_name = {}
+    for i, template in enumerate(palette):
+        by_name.setdefault(template.name, i)
+    added = updated = 0
+    for template_def in templates:
+        i = by_name.get(template_def.name)
+        if i is None:
+            by_name[template_def.name] = len(palette)
+            write_template(palette.add(), template_def)
+            added += 1
+            continue
+        template = palette[i]
+        diff = core.diff_template(read_template(template), template_def)
+        if diff:
+            apply_template_diff(template, diff)
+            updated += 1
+    if added or updated:
+        palette_changed(scene)
+    return added, updated
+
+def merge_templates(events, templates, replace_existing=False):
+    """Add core.Template items to the palette, returns how many were written
+
+    Templates are matched by name through an index built once; an existing
+    template is kept unless replace_existing, then its fields are replaced.
+    """
+    palette = events.event_templates
+    # Indices, not items: adding to a collection may move its items in memory
+    by_name = {}
+    for i, template in enumerate(palette):
+        by_name.setdefault(template.name, i)
+    written = 0
+    for template_def in templates:
+        i = by_name.get(template_def.name)
+        if i is None:
+            by_name[template_def.name] = len(palette)
+            write_template(palette.add(), template_def)
+        elif replace_existing:
+            write_template(palette[i], template_def)
+        else:
+            continue
+        written += 1
+    return written
+
+def palette_cache_dir(context):
+    """Directory of the parsed palette cache, None when it is turned off"""
+    prefs = get_preferences(context)
+    if prefs and not prefs.palette_cache:
+        return None
+    return bpy.utils.user_resource('DATAFILES', path=os.path.join("animation_events", "palette_cache"))
+
+def read_event(instance):
+    field_values = []
+    for field_value in instance.field_values:
+        attr = core.VALUE_ATTRS.get(field_value.field_type)
+        field_values.append(core.FieldValue(field_value.name, field_value.field_type,
+                                            getattr(field_value, attr) if attr else None))
+    return core.Event(instance.template_name, instance.frame, field_values)
+
+def field_table(field_values):
+    """(name, type, value attribute, value) rows of core.FieldValue items, see write_field_table"""
+    return [(value.name, value.type, core.VALUE_ATTRS.get(value.type), value.value) for value in field_values]
+
+def write_field_table(instance, table):
+    """Append the rows of a field_table to an EventInstance, reusable across instances"""
+    for name, field_type, attr, value in table:
+        field_value = instance.field_values.add()
+        field_value.name = name
+        field_value.field_type = field_type
+        if attr:
+            # Raw write: values are already typed by core, and the update
+            # callback would bump the revision once per field
+            field_value[attr] = value
+
+def write_field_values(instance, field_values):
+    """Append core.FieldValue items to an EventInstance"""
+    write_field_table(instance, field_table(field_values))
+
+def read_resolved_event(scene, instance):
+    """read_event with the fields the instance does not store taken from its template"""
+    event = read_event(instance)
+    event.field_values = core.with_defaults(event.field_values,
+                                            template_defaults(scene, instance.template_name))
+    return event
+
+def event_to_dict(scene, instance, fps, inline_defaults=True):
+    """Exported representation of one EventInstance
+
+    inline_defaults writes every template field, otherwise only the values
+    that differ from the template defaults (readers take the rest from the
+    palette).
+    """
+    if inline_defaults:
+        return read_resolved_event(scene, instance).to_dict(fps)
+    event = read_event(instance)
+    event.field_values = core.without_defaults(event.field_values,
+                                               template_defaults(scene, instance.template_name))
+    return event.to_dict(fps)
+
+def palette_digest(events):
+    """Hash of the templates, exports depend on their defaults"""
+    palette = core.palette_to_dict([read_template(template) for template in events.event_templates])
+    return hashlib.sha256(json.dumps(palette, sort_keys=True).encode('utf-8')).hexdigest()
+
+def export_format_for_path(filepath):
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext == '.jsonl':
+        return 'JSONL'
+    if ext == animation_events_binary.FILE_EXT:
+        return 'BINARY'
+    return 'JSON'
+
+def write_file_atomic(filepath, write, binary=False, key=None):
+    """Call write(f) on a temp file next to filepath, then move it into place with one rename
+
+    Readers never see a half-written file. With a key, output identical to
+    the current file leaves it untouched (see core.replace_if_changed).
+    Returns write's result and whether filepath was replaced. Does not touch
+    bpy, safe on a worker thread.
+    """
+    tmp_path = f"{filepath}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb" if binary else "w", encoding=None if binary else 'utf-8') as f:
+            result = write(f)
+        if key is None:
+            os.replace(tmp_path, filepath)
+            return result, True
+        return result, core.replace_if_changed(tmp_path, filepath, key)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def prepare_events_export(scene, filepath, export_format='JSON', compact=False, skip_unchanged=True,
+                          inline_defaults=True, snapshot=False):
+    """Read what exporting the scene's events needs, returns a writer or None if skipped
+
+    The writer writes filepath without touching bpy and returns the count.
+    With snapshot the events are copied into a list here, so the writer can
+    run on a worker thread; otherwise they are read while writing, one at a
+    time. With skip_unchanged, an export whose key (events revision,
+    palette, format, options, fps) matches the record next to the file is
+    skipped without serializing anything, and output identical to the
+    existing file is not written over it.
+    """
+    tracing = trace_log.isEnabledFor(logging.DEBUG)
+    events = scene.event_system
+    fps = scene.render.fps
+
+    key = None
+    if skip_unchanged:
+        key = {"revision": events.revision, "palette": palette_digest(events), "format": export_format,
+               "compact": compact, "inline_defaults": inline_defaults, "fps": fps}
+        # Files from before revisions existed have no token, never trust those
+        if events.revision and core.export_is_current(filepath, key):
+            log.info("События не изменились, экспорт пропущен: %s", filepath)
+            return None
+
+    # ИСПРАВЛЕНО: Убираем templates из экспорта событий
+    # Events are generated one at a time, no intermediate list
+    def iter_events():
+        for instance in events.event_instances:
+            event_data = event_to_dict(scene, instance, fps, inline_defaults)
+            if tracing:
+                trace_log.debug("Экспорт: %s @ %d: %s", instance.template_name,
+                                instance.frame, event_data["field_values"])
+            yield event_data
+
+    copied = list(iter_events()) if snapshot else None
+
+    def write_events(f):
+        source = copied if snapshot else iter_events()
+        if export_format == 'BINARY':
+            return animation_events_binary.write_events_binary(f, source, fps)
+        if export_format == 'JSONL':
+            return core.write_events_jsonl(f, source, compact)
+        return core.write_events_json(f, source, compact)
+
+    def write():
+        count, replaced = write_file_atomic(filepath, write_events, export_format == 'BINARY', key)
+        if replaced:
+            log.info("Экспортировано событий: %d в %s", count, filepath)
+        else:
+            log.info("Содержимое не изменилось, файл не перезаписан: %s", filepath)
+        return count
+    return write
+
+def export_scene_events(scene, filepath, export_format='JSON', compact=False, skip_unchanged=True,
+                        inline_defaults=True):
+    """Write the scene's events to filepath, returns the count or None if skipped
+
+    See prepare_events_export, this runs its writer right away.
+    """
+    write = prepare_events_export(scene, filepath, export_format, compact, skip_unchanged, inline_defaults)
+    return write() if write else None
+
+# Background export
+# Exports snapshot their data on the main thread and hand encoding and writing
+# to a worker thread, so big timelines and network shares do not block the UI.
+# Workers only touch their snapshot and the file; results come back through a
+# queue that a bpy.app.timers callback drains on the main thread.
+_export_results = queue.Queue()  # (filepath, level, message) from finished workers
+_export_threads = {}             # filepath -> running worker, main thread only
+_export_reports = deque(maxlen=1)  # last finished export, shown in the panel
+
+def use_background_export():
+    """Background mode has no event loop to run the reporting timer"""
+    return not bpy.app.background
+
+def start_background_write(filepath, what, write):
+    """Run write() on a worker thread, False if filepath is still being written
+
+    write() must not touch bpy and returns the number of `what` written.
+    """
+    if filepath in _export_threads:
+        return False
+
+    def work():
+        try:
+            count = write()
+        except Exception as e:
+            _export_results.put((filepath, 'ERROR', f"Export to {os.path.basename(filepath)} failed: {e}"))
+        else:
+            _export_results.put((filepath, 'INFO', f"Exported {count} {what} to {os.path.basename(filepath)}"))
+
+    # Not a daemon: quitting Blender waits for the file instead of dropping it
+    thread = threading.Thread(target=work, name=f"animation_events export {os.path.basename(filepath)}")
+    _export_threads[filepath] = thread
+    thread.start()
+    if not bpy.app.timers.is_registered(export_results_timer):
+        bpy.app.timers.register(export_results_timer, first_interval=0.1)
+    return True
+
+def export_results_timer():
+    """Report finished background exports, runs while workers are busy"""
+    finished = False
+    while True:
+        try:
+            filepath, level, message = _export_results.get_nowait()
+        except queue.Empty:
             break
+        _export_threads.pop(filepath, None)
+        _export_reports.append((level, message))
+        if level == 'ERROR':
+            log.error("Фоновый экспорт: %s", message)
+        else:
+            log.info("Фоновый экспорт: %s", message)
+        finished = True
+    if finished:
+        redraw_areas()
+    return 0.1 if _export_threads else None
 
 class EVENT_OT_export_events(Operator):
     bl_idname = "event.export_events"
@@ -744,62 +2610,184 @@ class EVENT_OT_export_events(Operator):
         subtype="FILE_PATH"
     )
 
-    def execute(self, context):
-        # ИСПРАВЛЕНО: Убираем templates из экспорта событий
-        events_data = {
-            "events": []
-        }
-
-        # Export event instances with field values - без templates
-        for instance in context.scene.event_system.event_instances:
-            event_data = {
-                "template_name": instance.template_name,
-                "frame": instance.frame,
-                "time": instance.frame / context.scene.render.fps,
-                "field_values": {}
-            }
-
-            # Используем множество для отслеживания уже обработанных полей
-            processed_fields = set()
-
-            for field_value in instance.field_values:
-                # Пропускаем дубликаты полей
-                if field_value.name in processed_fields:
-                    continue
-                processed_fields.add(field_value.name)
-
-                if field_value.field_type == 'BOOL':
-                    event_data["field_values"][field_value.name] = field_value.bool_value
-                elif field_value.field_type == 'STRING':
-                    event_data["field_values"][field_value.name] = field_value.string_value
-                elif field_value.field_type == 'INT':
-                    event_data["field_values"][field_value.name] = field_value.int_value
-                elif field_value.field_type == 'FLOAT':
-                    event_data["field_values"][field_value.name] = field_value.float_value
-                elif field_value.field_type == 'ARRAY':
-                    event_data["field_values"][field_value.name] = field_value.array_value.split(',') if field_value.array_value else []
-                elif field_value.field_type == 'ENUM':
-                    event_data["field_values"][field_value.name] = field_value.enum_value
-
-            events_data["events"].append(event_data)
+    export_format: EnumProperty(
+        name="Format",
+        items=[
+            ('JSON', "JSON", "Single {\"events\": [...]} document"),
+            ('JSONL', "JSON Lines", "One event per line, for streaming readers"),
+            ('BINARY', "Binary", "Compact binary file with string tables (.evb) for runtime loading"),
+        ],
+        default='JSON',
+        description="Layout of the exported file"
+    )
+
+    compact: BoolProperty(
+        name="Compact",
+        description="No indentation and no spaces after separators (smaller files)",
+        default=False
+    )
+
+    skip_unchanged: BoolProperty(
+        name="Skip Unchanged",
+        description="Do nothing when the events did not change since the last export to this file, "
+                    "and leave the file untouched when the new output is identical "
+                    "(keeps a .hash record next to the file)",
+        default=True
+    )
+
+    inline_defaults: BoolProperty(
+        name="Inline Defaults",
+        description="Write every template field of each event. Off: only the values that differ "
+                    "from the template defaults, readers take the rest from the palette",
+        default=True
+    )
 
+    background: BoolProperty(
+        name="Background",
+        description="Encode and write the file on a worker thread, Blender stays responsive. "
+                    "The result is shown under Timeline Tools",
+        default=True
+    )
+
+    def execute(self, context):
+        background = self.background and use_background_export()
+        if background and self.filepath in _export_threads:
+            self.report({'WARNING'}, f"Export to {self.filepath} is still running")
+            return {'CANCELLED'}
         try:
-            with open(self.filepath, "w") as f:
-                json.dump(events_data, f, indent=2)
-            self.report({'INFO'}, f"Events exported to {self.filepath}")
+            write = prepare_events_export(context.scene, self.filepath, self.export_format, self.compact,
+                                          self.skip_unchanged, self.inline_defaults, snapshot=background)
+            if write is None:
+                self.report({'INFO'}, f"Events unchanged, {self.filepath} is up to date")
+                return {'FINISHED'}
+            if background:
+                start_background_write(self.filepath, "events", write)
+                self.report({'INFO'}, f"Exporting events to {self.filepath} in the background")
+                return {'FINISHED'}
+            write()
         except Exception as e:
+            log.error("Ошибка экспорта: %s", e)
             self.report({'ERROR'}, f"Export failed: {str(e)}")
+            return {'FINISHED'}
 
+        self.report({'INFO'}, f"Events exported to {self.filepath}")
         return {'FINISHED'}
 
     def invoke(self, context, event):
         context.window_manager.fileselect_add(self)
         return {'RUNNING_MODAL'}
 
+def read_events_file(f, is_binary, is_jsonl, stream_json=False):
+    """(sections, events) of an open events file, events possibly lazy
+
+    JSON Lines and streamed JSON are read event by event. Raises
+    core.EventFormatError when the file has no events section and
+    json.JSONDecodeError for invalid JSON.
+    """
+    if is_binary:
+        sections = animation_events_binary.read_events_binary(f)
+        return sections, sections["events"]
+    if is_jsonl:
+        return {}, core.iter_events_jsonl(f)
+    if stream_json:
+        reader = core.EventStreamReader(f)
+        if not reader.open():
+            raise core.EventFormatError("missing 'events' section")
+        return reader.sections, iter(reader)
+
+    sections = json.load(f)
+    log.debug("Структура файла: %s", list(sections.keys()))
+    # Проверяем структуру файла
+    if "events" not in sections:
+        raise core.EventFormatError("missing 'events' section")
+    log.info("Событий в файле: %d", len(sections["events"]))
+    return sections, sections["events"]
+
+class ImportWorker:
+    """Parses an events file on a worker thread into batches for the main thread
+
+    The queue holds ("sections", sections), then ("batch", [(index, data)...])
+    items, then ("done", None) or ("error", exception). It is bounded, so a
+    streamed file is read no faster than the main thread applies it.
+
+    .json and .jsonl files are always streamed: json.load holds the GIL for
+    the whole parse and would freeze Blender. They are read through once
+    before the "sections" item, so a malformed file fails before the main
+    thread clears any events.
+    """
+    # Smaller than core.EVENTS_BATCH_SIZE: one batch must fit in a UI tick
+    # (256 events took about 45 ms, over TICK_BUDGET)
+    BATCH_SIZE = 128
+    QUEUE_SIZE = 16
+
+    def __init__(self, filepath, is_binary, is_jsonl):
+        self.filepath = filepath
+        self.is_binary, self.is_jsonl = is_binary, is_jsonl
+        self.size = max(1, os.path.getsize(filepath))
+        self.position = 0  # bytes checked so far, written by the worker only
+        # Event count, set before the first batch once the file was read
+        # (.evb) or checked (.json, .jsonl)
+        self.total = None
+        self.items = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self.stop = threading.Event()
+        # Daemon: a half-parsed import has nothing worth waiting for on quit
+        self.thread = threading.Thread(target=self.run, daemon=True,
+                                       name=f"animation_events import {os.path.basename(filepath)}")
+
+    def run(self):
+        try:
+            with open(self.filepath, "rb" if self.is_binary else "r",
+                      encoding=None if self.is_binary else 'utf-8') as f:
+                if self.is_binary:
+                    sections, events_in_file = read_events_file(f, True, False)
+                    self.total = len(events_in_file)
+                else:
+                    sections = self.check(f)
+                    if sections is None:
+                        return
+                    f.seek(0)
+                    _, events_in_file = read_events_file(f, False, self.is_jsonl, stream_json=True)
+                if not self.put(("sections", sections)):
+                    return
+                for batch in core.batched(enumerate(events_in_file), self.BATCH_SIZE):
+                    if not self.put(("batch", batch)):
+                        return
+            self.put(("done", None))
+        except Exception as e:
+            self.put(("error", e))
+
+    def check(self, f):
+        """Read a text events file through without keeping its events
+
+        Returns its sections (including those after the events array) and
+        sets total, None once the import was cancelled. Raises like
+        read_events_file on a malformed file.
+        """
+        sections, events_in_file = read_events_file(f, False, self.is_jsonl, stream_json=True)
+        count = 0
+        for count, _ in enumerate(events_in_file, 1):
+            if count % self.BATCH_SIZE == 0:
+                self.position = f.buffer.tell()
+                if self.stop.is_set():
+                    return None
+        self.total = count
+        return sections
+
+    def put(self, item):
+        """Wait for room in the queue, False once the import was cancelled"""
+        while not self.stop.is_set():
+            try:
+                self.items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+
 class EVENT_OT_import_events(Operator):
     bl_idname = "event.import_events"
     bl_label = "Import Events"
-    bl_description = "Import events from JSON file"
+    bl_description = "Import events from JSON, JSON Lines or binary events file"
 
     filepath: StringProperty(
         name="File Path",
@@ -811,11 +2799,30 @@ class EVENT_OT_import_events(Operator):
     filename_ext = ".json"
 
     filter_glob: StringProperty(
-        default="*.json",
+        default="*.json;*.jsonl;*.evb",
         options={'HIDDEN'},
         maxlen=255
     )
 
+    stream_json: BoolProperty(
+        name="Stream File",
+        description="Read .json files incrementally instead of loading them whole "
+                    "(always on in the background, which checks the file first). "
+                    "Saves memory on very large files, but a malformed file is only "
+                    "detected after the existing events were cleared",
+        default=False
+    )
+
+    background: BoolProperty(
+        name="Background",
+        description="Parse the file on a worker thread and add the events in batches, "
+                    "Blender stays responsive (Esc cancels, events added so far are kept)",
+        default=True
+    )
+
+    # Each timer tick applies batches for at most TICK_BUDGET seconds
+    TICK_BUDGET = 1 / 30
+
     def execute(self, context):
         import os
 
@@ -828,320 +2835,299 @@ class EVENT_OT_import_events(Operator):
             self.report({'ERROR'}, f"File does not exist: {self.filepath}")
             return {'CANCELLED'}
 
-        if not self.filepath.lower().endswith('.json'):
+        is_jsonl = self.filepath.lower().endswith('.jsonl')
+        is_binary = self.filepath.lower().endswith(animation_events_binary.FILE_EXT)
+        if not (is_jsonl or is_binary) and not self.filepath.lower().endswith('.json'):
             self.report({'ERROR'}, "Selected file is not a JSON file")
             return {'CANCELLED'}
 
-        try:
-            print("\n" + "="*80)
-            print("🔍 ДЕТАЛЬНЫЙ ЛОГ ИМПОРТА СОБЫТИЙ")
-            print("="*80)
-
-            with open(self.filepath, "r", encoding='utf-8') as f:
-                events_data = json.load(f)
+        self._scene = context.scene
+        self._started = False
+        log.info("Импортируем файл: %s", os.path.basename(self.filepath))
 
-            print(f"📁 Импортируем файл: {os.path.basename(self.filepath)}")
-            print(f"📊 Структура файла: {list(events_data.keys())}")
+        # Without a window (background mode, scripts) there is no UI to keep alive
+        if self.background and context.window is not None:
+            self._worker = ImportWorker(self.filepath, is_binary, is_jsonl)
+            self._worker.thread.start()
+            wm = context.window_manager
+            self._timer = wm.event_timer_add(0.01, window=context.window)
+            wm.progress_begin(0, 100)
+            wm.modal_handler_add(self)
+            return {'RUNNING_MODAL'}
 
-            # Проверяем структуру файла
-            if "events" not in events_data:
-                self.report({'ERROR'}, "Invalid events file format - missing 'events' section")
-                return {'CANCELLED'}
+        try:
+            with open(self.filepath, "rb" if is_binary else "r", encoding=None if is_binary else 'utf-8') as f:
+                sections, events_in_file = read_events_file(f, is_binary, is_jsonl, self.stream_json)
+                self._begin(sections)
+                # ИСПРАВЛЕНО: Умный импорт событий с проверкой палетки
+                # Bulk load пакетами по core.EVENTS_BATCH_SIZE событий
+                for batch in core.batched(enumerate(events_in_file), core.EVENTS_BATCH_SIZE):
+                    self._apply(batch)
+        except Exception as e:
+            return self._fail(e)
+        return self._finish()
+
+    def modal(self, context, event):
+        worker = self._worker
+        if event.type == 'ESC':
+            self._stop(context)
+            self.report({'WARNING'}, f"Import cancelled, {self._events_imported if self._started else 0} "
+                                     f"events were imported")
+            return {'CANCELLED'}
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        now = time.perf_counter()
+        deadline = now + self.TICK_BUDGET
+        # The first item always runs, then none the previous one says would overrun the tick
+        item_time = 0.0
+        while now + item_time < deadline:
+            try:
+                kind, item = worker.items.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                if kind == "sections":
+                    self._begin(item)
+                elif kind == "batch":
+                    self._apply(item)
+                elif kind == "error":
+                    raise item
+                else:
+                    self._stop(context)
+                    return self._finish()
+            except Exception as e:
+                self._stop(context)
+                return self._fail(e)
+            done = time.perf_counter()
+            item_time, now = done - now, done
+
+        if worker.total is None:
+            # The worker is still checking the file, the scene is untouched
+            progress = worker.position / worker.size
+            status = f"Checking events file ({progress:.0%}), Esc to cancel"
+        else:
+            progress = self._applied / max(1, worker.total) if self._started else 0.0
+            imported = self._events_imported if self._started else 0
+            status = f"Importing events: {imported} ({progress:.0%}), Esc to cancel"
+        context.window_manager.progress_update(progress * 100)
+        context.workspace.status_text_set(status)
+        return {'RUNNING_MODAL'}
 
-            events = context.scene.event_system
-            scene = context.scene
+    def _stop(self, context):
+        self._worker.stop.set()
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        wm.progress_end()
+        context.workspace.status_text_set(None)
+
+    def cancel(self, context):
+        # Blender dropped the handler itself (file load, window closed); this
+        # also releases the worker waiting in put() and its open file
+        self._stop(context)
+
+    def _begin(self, sections):
+        """Clear the scene's events, merge the file's templates and prepare the palette lookups"""
+        scene = self._scene
+        events = scene.event_system
 
-            print(f"\n🗑️  ОЧИСТКА ДАННЫХ:")
-            print(f"   Событий до очистки: {len(events.event_instances)}")
+        log.debug("Событий до очистки: %d", len(events.event_instances))
+
+        # ИСПРАВЛЕНО: Очищаем только события и их маркеры (маркеры - до очистки событий)
+        removed = remove_event_instances(scene, range(len(events.event_instances)))
+        log.debug("Удалено событий с маркерами: %d", removed)
+
+        # ИСПРАВЛЕНО: Импортируем шаблоны из файла если они есть
+        # (существующие шаблоны с тем же именем не трогаем)
+        templates_in_file = (core.Template.from_dict(data) for data in sections.get("templates", []))
+        self._templates_imported = merge_templates(events, [t for t in templates_in_file if t is not None])
+
+        if self._templates_imported > 0:
+            log.info("Импортированы шаблоны: %d", self._templates_imported)
+
+        # ИСПРАВЛЕНО: Типы полей из палетки, по словарю на шаблон
+        self._field_types = {}
+        for template in events.event_templates:
+            self._field_types.setdefault(
+                template.name,
+                {field.name: field.field_type for field in template.custom_fields}
+            )
+        # Sparse: значения, равные значениям по умолчанию шаблона, не сохраняем
+        self._defaults = None
+        if events.sparse_field_values:
+            self._defaults = {name: template_defaults(scene, name) for name in self._field_types}
+
+        # Per-field tracing goes to the in-memory buffer, only when enabled
+        self._tracing = trace_log.isEnabledFor(logging.DEBUG)
+        self._events_imported = 0
+        self._errors = []
+        self._seen_keys = set()
+        self._applied = 0
+        self._started = True
+
+    def _apply(self, batch):
+        self._applied = batch[-1][0] + 1
+        self._events_imported += self._import_batch(self._scene, batch, self._field_types, self._defaults,
+                                                    self._seen_keys, self._errors, self._tracing)
+
+    def _fail(self, e):
+        if isinstance(e, json.JSONDecodeError):
+            log.error("Ошибка JSON: %s", e)
+            self.report({'ERROR'}, f"Invalid JSON file: {str(e)}")
+        elif isinstance(e, core.EventFormatError) and not self._started:
+            self.report({'ERROR'}, "Invalid events file format - missing 'events' section")
+        else:
+            log.exception("Общая ошибка импорта: %s", e)
+            self.report({'ERROR'}, f"Import failed: {str(e)}")
+        return {'CANCELLED'}
+
+    def _finish(self):
+        events = self._scene.event_system
+        errors = self._errors
+
+        # ДОПОЛНИТЕЛЬНАЯ ПРОВЕРКА: полный дамп результата, только в трассировку
+        if self._tracing:
+            trace_event_instances(events)
+
+        # Сообщаем результат
+        if errors:
+            error_msg = f"Import completed with {len(errors)} errors:\n" + "\n".join(errors[:5])
+            if len(errors) > 5:
+                error_msg += f"\n... and {len(errors) - 5} more errors"
+            self.report({'WARNING'}, error_msg)
+
+        # ИСПРАВЛЕНО: Более информативное сообщение
+        report_parts = []
+        if self._events_imported > 0:
+            report_parts.append(f"{self._events_imported} events")
+        if self._templates_imported > 0:
+            report_parts.append(f"{self._templates_imported} new templates")
+
+        if report_parts:
+            self.report({'INFO'}, f"Imported {' and '.join(report_parts)} from {os.path.basename(self.filepath)}")
+        else:
+            self.report({'WARNING'}, f"No data imported from {os.path.basename(self.filepath)}")
 
-            # Очищаем только события
-            events.event_instances.clear()
+        log.info("Импорт завершен: %d событий, %d ошибок", self._events_imported, len(errors))
+        return {'FINISHED'}
 
-            # Очищаем только маркеры от событий
-            markers_to_remove = []
-            for marker in scene.timeline_markers:
-                for instance in events.event_instances:
-                    if marker.name == instance.marker_name:
-                        markers_to_remove.append(marker)
-                        break
+    def _import_batch(self, scene, batch, palette_field_types, palette_defaults, seen_keys, errors, tracing):
+        """Bulk load one batch of (event_index, event_data) pairs
 
-            for marker in markers_to_remove:
-                scene.timeline_markers.remove(marker)
+        Uniqueness of (template_name, frame) is checked against `seen_keys`,
+        markers and instances are created in one pass and no update callbacks
+        fire. With `palette_defaults` (sparse mode) values equal to their
+        template default are not stored. Returns the number of imported events.
+        """
+        events = scene.event_system
+        events_imported = 0
 
-            print(f"   Удалено маркеров: {len(markers_to_remove)}")
+        # Проход 1: проверка событий и конфликтов
+        accepted = []
+        for event_index, event_data in batch:
+            if tracing:
+                trace_log.debug("Событие #%d: данные из файла: %s", event_index, event_data)
 
-            # ИСПРАВЛЕНО: Импортируем шаблоны из файла если они есть
-            templates_imported = 0
-            for template_data in events_data.get("templates", []):
-                if "name" not in template_data:
+            try:
+                # Проверяем обязательные поля события
+                try:
+                    key = core.event_key(event_data)
+                except core.EventFormatError as e:
+                    errors.append(f"Event #{event_index}: {e}")
                     continue
 
-                # Проверяем, есть ли уже такой шаблон
-                existing_template = None
-                for template in events.event_templates:
-                    if template.name == template_data["name"]:
-                        existing_template = template
-                        break
-
-                if existing_template:
-                    # Шаблон уже существует - пропускаем
+                template_name, frame = key
+                if key in seen_keys:
+                    errors.append(f"Event #{event_index}: '{template_name}' already exists on frame {frame}")
                     continue
+                seen_keys.add(key)
+
+                accepted.append((event_index, key, event_data["field_values"]))
+
+            except Exception as e:
+                error_msg = f"Event #{event_index} (frame {event_data.get('frame', 'unknown')}): {str(e)}"
+                errors.append(error_msg)
+                log.warning(error_msg)
+
+        # Проход 2: маркеры и экземпляры одним пакетом
+        new_indices = add_event_instances(scene, [key for _, key, _ in accepted])
+        log.debug("Создано маркеров: %d", len(new_indices))
+
+        # Проход 3: значения полей
+        for instance_idx, (event_index, key, field_values_data) in zip(new_indices, accepted):
+            template_name, frame = key
+            instance = events.event_instances[instance_idx]
+            field_types = palette_field_types.get(template_name)
+            if tracing:
+                trace_log.debug("Событие #%d: %s @ %d, шаблон в палетке: %s",
+                                event_index, template_name, frame,
+                                'найден' if field_types is not None else 'НЕ найден')
+
+            try:
+                # ИСПРАВЛЕНО: Тип поля из палетки, иначе по типу JSON (core.parse_field_value)
+                field_values = [core.parse_field_value(name, value, field_types.get(name) if field_types else None)
+                                for name, value in field_values_data.items()]
+                if palette_defaults and field_types is not None:
+                    write_field_values(instance, core.without_defaults(field_values, palette_defaults[template_name]))
+                else:
+                    write_field_values(instance, field_values)
 
-                # Создаем новый шаблон только если его нет
-                template = events.event_templates.add()
-                template.name = template_data["name"]
-                template.description = template_data.get("description", "")
-                template.color = template_data.get("color", [1.0, 0.0, 0.0])
-
-                # Import custom fields
-                for field_data in template_data.get("custom_fields", []):
-                    if "name" not in field_data or "type" not in field_data:
-                        continue
-
-                    field = template.custom_fields.add()
-                    field.name = field_data["name"]
-                    field.field_type = field_data["type"]
-                    field.description = field_data.get("description", "")
-
-                    default_value = field_data.get("default_value")
-                    if field.field_type == 'BOOL' and default_value is not None:
-                        field.default_bool = bool(default_value)
-                    elif field.field_type == 'STRING' and default_value is not None:
-                        field.default_string = str(default_value)
-                    elif field.field_type == 'INT' and default_value is not None:
-                        field.default_int = int(default_value)
-                    elif field.field_type == 'FLOAT' and default_value is not None:
-                        field.default_float = float(default_value)
-                    elif field.field_type == 'ARRAY' and default_value is not None:
-                        if isinstance(default_value, list):
-                            field.default_array = ','.join(str(x) for x in default_value)
-                        else:
-                            field.default_array = str(default_value)
-                    elif field.field_type == 'ENUM':
-                        if default_value is not None:
-                            field.default_enum = str(default_value)
-                        enum_options = field_data.get("enum_options", [])
-                        if isinstance(enum_options, list):
-                            field.enum_options = ','.join(str(x) for x in enum_options)
-                        else:
-                            field.enum_options = str(enum_options)
+                if tracing:
+                    for field_value, file_field_value in zip(field_values, field_values_data.values()):
+                        trace_log.debug("  %s = %r (JSON %s) -> %s%s", field_value.name, file_field_value,
+                                        type(file_field_value).__name__, field_value.type,
+                                        "" if field_types and field_value.name in field_types else ", тип по JSON")
 
-                templates_imported += 1
+                events_imported += 1
 
-            if templates_imported > 0:
-                print(f"\n📋 ИМПОРТИРОВАНЫ ШАБЛОНЫ: {templates_imported}")
+            except Exception as e:
+                error_msg = f"Event #{event_index} (frame {frame}): {str(e)}"
+                errors.append(error_msg)
+                log.warning(error_msg)
 
-            # ИСПРАВЛЕНО: Умный импорт событий с проверкой палетки
-            events_imported = 0
-            errors = []
+        return events_imported
 
-            print(f"\n📥 ИМПОРТ СОБЫТИЙ:")
-            events_in_file = events_data.get("events", [])
-            print(f"   Событий в файле: {len(events_in_file)}")
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
 
-            for event_index, event_data in enumerate(events_in_file):
-                print(f"\n   📌 СОБЫТИЕ #{event_index}:")
-                print(f"      Данные из файла: {event_data}")
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "stream_json")
+        layout.prop(self, "background")
 
-                try:
-                    # Проверяем обязательные поля события
-                    if "frame" not in event_data:
-                        errors.append(f"Event #{event_index}: missing 'frame' field")
-                        continue
-
-                    if "template_name" not in event_data:
-                        errors.append(f"Event #{event_index}: missing 'template_name' field")
-                        continue
-
-                    if "field_values" not in event_data:
-                        errors.append(f"Event #{event_index}: missing 'field_values' field")
-                        continue
-
-                    frame = event_data["frame"]
-                    template_name = event_data["template_name"]
-                    field_values_data = event_data["field_values"]
-
-                    print(f"      ✅ Шаблон: {template_name}")
-                    print(f"      ✅ Кадр: {frame}")
-                    print(f"      ✅ Полей в файле: {len(field_values_data)}")
-
-                    # ИСПРАВЛЕНО: Ищем шаблон в палетке
-                    template_found = None
-                    for template in events.event_templates:
-                        if template.name == template_name:
-                            template_found = template
-                            break
-
-                    print(f"      🔍 Шаблон в палетке: {'найден' if template_found else 'НЕ найден'}")
-
-                    # Create marker
-                    marker_name = f"{template_name}_{frame}"
-                    marker = scene.timeline_markers.new(marker_name, frame=frame)
-                    print(f"      🏷️  Создан маркер: {marker_name}")
-
-                    # Create instance
-                    instance = events.event_instances.add()
-                    instance.template_name = template_name
-                    instance.frame = frame
-                    instance.marker_name = marker_name
-                    print(f"      📋 Создан экземпляр события")
-
-                    # ИСПРАВЛЕНО: Умное создание полей с проверкой палетки
-                    print(f"      🔧 СОЗДАНИЕ ПОЛЕЙ:")
-                    for field_name, file_field_value in field_values_data.items():
-                        print(f"         🔸 Поле '{field_name}': {file_field_value} (тип JSON: {type(file_field_value).__name__})")
-
-                        # ИСПРАВЛЕНО: Сначала ищем определение поля в палетке
-                        field_definition = None
-                        if template_found:
-                            for field in template_found.custom_fields:
-                                if field.name == field_name:
-                                    field_definition = field
-                                    break
-
-                        # Создаем поле
-                        field_val = instance.field_values.add()
-                        field_val.name = field_name
-
-                        if field_definition:
-                            # ЕСТЬ определение в палетке - используем тип из палетки
-                            field_val.field_type = field_definition.field_type
-                            print(f"            🎨 Тип из палетки: {field_definition.field_type}")
-
-                            # Устанавливаем значение с учетом типа палетки
-                            try:
-                                if field_definition.field_type == 'BOOL':
-                                    field_val.bool_value = bool(file_field_value)
-                                    print(f"            ➡️  Установлено: BOOL = {field_val.bool_value}")
-                                elif field_definition.field_type == 'STRING':
-                                    field_val.string_value = str(file_field_value)
-                                    print(f"            ➡️  Установлено: STRING = '{field_val.string_value}'")
-                                elif field_definition.field_type == 'INT':
-                                    field_val.int_value = int(file_field_value)
-                                    print(f"            ➡️  Установлено: INT = {field_val.int_value}")
-                                elif field_definition.field_type == 'FLOAT':
-                                    field_val.float_value = float(file_field_value)
-                                    print(f"            ➡️  Установлено: FLOAT = {field_val.float_value}")
-                                elif field_definition.field_type == 'ARRAY':
-                                    if isinstance(file_field_value, list):
-                                        field_val.array_value = ','.join(str(x) for x in file_field_value)
-                                    else:
-                                        field_val.array_value = str(file_field_value)
-                                    print(f"            ➡️  Установлено: ARRAY = '{field_val.array_value}'")
-                                elif field_definition.field_type == 'ENUM':
-                                    field_val.enum_value = str(file_field_value)
-                                    print(f"            ➡️  Установлено: ENUM = '{field_val.enum_value}'")
-                                    # Set the selection property too
-                                    if hasattr(field_val, 'enum_selection'):
-                                        try:
-                                            field_val.enum_selection = str(file_field_value)
-                                        except:
-                                            pass
-                            except (ValueError, TypeError) as e:
-                                print(f"            ⚠️  Ошибка конвертации: {e}, используем строку")
-                                field_val.field_type = 'STRING'
-                                field_val.string_value = str(file_field_value)
-                        else:
-                            # НЕТ определения в палетке - определяем тип по JSON
-                            print(f"            🔍 Поле НЕ найдено в палетке, определяем тип по JSON")
-
-                            if isinstance(file_field_value, bool):
-                                field_val.field_type = 'BOOL'
-                                field_val.bool_value = file_field_value
-                                print(f"            ➡️  Установлено: BOOL = {field_val.bool_value}")
-                            elif isinstance(file_field_value, str):
-                                field_val.field_type = 'STRING'
-                                field_val.string_value = file_field_value
-                                print(f"            ➡️  Установлено: STRING = '{field_val.string_value}'")
-                            elif isinstance(file_field_value, int):
-                                field_val.field_type = 'INT'
-                                field_val.int_value = file_field_value
-                                print(f"            ➡️  Установлено: INT = {field_val.int_value}")
-                            elif isinstance(file_field_value, float):
-                                field_val.field_type = 'FLOAT'
-                                field_val.float_value = file_field_value
-                                print(f"            ➡️  Установлено: FLOAT = {field_val.float_value}")
-                            elif isinstance(file_field_value, list):
-                                field_val.field_type = 'ARRAY'
-                                field_val.array_value = ','.join(str(x) for x in file_field_value)
-                                print(f"            ➡️  Установлено: ARRAY = '{field_val.array_value}'")
-                            else:
-                                # Неизвестный тип - сохраняем как строку
-                                field_val.field_type = 'STRING'
-                                field_val.string_value = str(file_field_value)
-                                print(f"            ➡️  Установлено: STRING (fallback) = '{field_val.string_value}'")
-
-                    events_imported += 1
-                    print(f"      ✅ Событие успешно создано!")
-
-                except Exception as e:
-                    error_msg = f"Event #{event_index} (frame {event_data.get('frame', 'unknown')}): {str(e)}"
-                    errors.append(error_msg)
-                    print(f"      ❌ ОШИБКА: {error_msg}")
-
-            # ДОПОЛНИТЕЛЬНАЯ ПРОВЕРКА: Выводим что получилось в итоге
-            print(f"\n🔍 ПРОВЕРКА РЕЗУЛЬТАТА:")
-            print(f"   Создано событий: {len(events.event_instances)}")
-
-            for i, instance in enumerate(events.event_instances):
-                print(f"\n   📌 ИТОГОВОЕ СОБЫТИЕ #{i}:")
-                print(f"      Шаблон: {instance.template_name}")
-                print(f"      Кадр: {instance.frame}")
-                print(f"      Маркер: {instance.marker_name}")
-                print(f"      Полей: {len(instance.field_values)}")
-
-                for field_value in instance.field_values:
-                    actual_val = "НЕИЗВЕСТНО"
-                    if field_value.field_type == 'BOOL':
-                        actual_val = field_value.bool_value
-                    elif field_value.field_type == 'STRING':
-                        actual_val = f"'{field_value.string_value}'"
-                    elif field_value.field_type == 'INT':
-                        actual_val = field_value.int_value
-                    elif field_value.field_type == 'FLOAT':
-                        actual_val = field_value.float_value
-                    elif field_value.field_type == 'ARRAY':
-                        actual_val = f"'{field_value.array_value}'"
-                    elif field_value.field_type == 'ENUM':
-                        actual_val = f"'{field_value.enum_value}'"
-
-                    print(f"         🔸 {field_value.name} ({field_value.field_type}): {actual_val}")
-
-            # Сообщаем результат
-            if errors:
-                error_msg = f"Import completed with {len(errors)} errors:\n" + "\n".join(errors[:5])
-                if len(errors) > 5:
-                    error_msg += f"\n... and {len(errors) - 5} more errors"
-                self.report({'WARNING'}, error_msg)
-
-            # ИСПРАВЛЕНО: Более информативное сообщение
-            report_parts = []
-            if events_imported > 0:
-                report_parts.append(f"{events_imported} events")
-            if templates_imported > 0:
-                report_parts.append(f"{templates_imported} new templates")
-
-            if report_parts:
-                self.report({'INFO'}, f"Imported {' and '.join(report_parts)} from {os.path.basename(self.filepath)}")
-            else:
-                self.report({'WARNING'}, f"No data imported from {os.path.basename(self.filepath)}")
+class EVENT_OT_dump_trace_log(Operator):
+    bl_idname = "event.dump_trace_log"
+    bl_label = "Dump Trace Log"
+    bl_description = "Write the import/export trace buffer to a text file"
 
-            print("\n" + "="*80)
-            print("✅ ИМПОРТ ЗАВЕРШЕН - проверьте консоль выше для деталей")
-            print("="*80)
+    filepath: StringProperty(
+        name="File Path",
+        description="Filepath used for the trace log",
+        maxlen=1024,
+        subtype="FILE_PATH"
+    )
 
-        except json.JSONDecodeError as e:
-            print(f"❌ ОШИБКА JSON: {str(e)}")
-            self.report({'ERROR'}, f"Invalid JSON file: {str(e)}")
-            return {'CANCELLED'}
-        except Exception as e:
-            print(f"❌ ОБЩАЯ ОШИБКА: {str(e)}")
-            self.report({'ERROR'}, f"Import failed: {str(e)}")
+    clear_after_dump: BoolProperty(
+        name="Clear Buffer",
+        description="Empty the trace buffer after writing it",
+        default=True
+    )
+
+    def execute(self, context):
+        try:
+            count = trace_buffer.dump(self.filepath)
+        except OSError as e:
+            self.report({'ERROR'}, f"Trace dump failed: {str(e)}")
             return {'CANCELLED'}
 
+        if self.clear_after_dump:
+            trace_buffer.records.clear()
+        self.report({'INFO'}, f"Wrote {count} trace lines to {self.filepath}")
         return {'FINISHED'}
 
     def invoke(self, context, event):
+        self.filepath = "event_trace.log"
         context.window_manager.fileselect_add(self)
         return {'RUNNING_MODAL'}
 
@@ -1157,50 +3143,34 @@ class EVENT_OT_export_palette(Operator):
         subtype="FILE_PATH"
     )
 
-    def execute(self, context):
-        palette_data = {
-            "templates": []
-        }
+    background: BoolProperty(
+        name="Background",
+        description="Write the file on a worker thread, the result is shown under Timeline Tools",
+        default=True
+    )
 
+    def execute(self, context):
         # Export only templates with custom fields
-        for template in context.scene.event_system.event_templates:
-            template_data = {
-                "name": template.name,
-                "description": template.description,
-                "color": list(template.color),
-                "custom_fields": []
-            }
+        palette_data = core.palette_to_dict(
+            read_template(template) for template in context.scene.event_system.event_templates)
 
-            for field in template.custom_fields:
-                field_data = {
-                    "name": field.name,
-                    "type": field.field_type,
-                    "description": field.description,
-                    "default_value": None
-                }
-
-                if field.field_type == 'BOOL':
-                    field_data["default_value"] = field.default_bool
-                elif field.field_type == 'STRING':
-                    field_data["default_value"] = field.default_string
-                elif field.field_type == 'INT':
-                    field_data["default_value"] = field.default_int
-                elif field.field_type == 'FLOAT':
-                    field_data["default_value"] = field.default_float
-                elif field.field_type == 'ARRAY':
-                    field_data["default_value"] = field.default_array.split(',') if field.default_array else []
-                elif field.field_type == 'ENUM':
-                    field_data["default_value"] = field.default_enum
-                    field_data["enum_options"] = field.enum_options.split(',') if field.enum_options else []
-
-                template_data["custom_fields"].append(field_data)
-
-            palette_data["templates"].append(template_data)
+        # The worker gets plain values, never the operator or bpy data
+        filepath = self.filepath
+
+        def write():
+            write_file_atomic(filepath, lambda f: json.dump(palette_data, f, indent=2))
+            return len(palette_data["templates"])
+
+        if self.background and use_background_export():
+            if not start_background_write(filepath, "templates", write):
+                self.report({'WARNING'}, f"Export to {filepath} is still running")
+                return {'CANCELLED'}
+            self.report({'INFO'}, f"Exporting palette to {filepath} in the background")
+            return {'FINISHED'}
 
         try:
-            with open(self.filepath, "w") as f:
-                json.dump(palette_data, f, indent=2)
-            self.report({'INFO'}, f"Palette exported to {self.filepath}")
+            write()
+            self.report({'INFO'}, f"Palette exported to {filepath}")
         except Exception as e:
             self.report({'ERROR'}, f"Palette export failed: {str(e)}")
 
@@ -1211,10 +3181,29 @@ class EVENT_OT_export_palette(Operator):
         context.window_manager.fileselect_add(self)
         return {'RUNNING_MODAL'}
 
+class EVENT_OT_sync_palette(Operator):
+    bl_idname = "event.sync_palette"
+    bl_label = "Sync Palette"
+    bl_description = "Update the templates from the watched palette file now, rewriting only what changed"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        scene = context.scene
+        if not scene.event_system.palette_watch_path:
+            self.report({'ERROR'}, "No palette file set")
+            return {'CANCELLED'}
+        try:
+            added, updated = poll_palette(scene, force=True)
+        except (OSError, ValueError) as e:
+            self.report({'ERROR'}, f"Palette sync failed: {e}")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Palette synced: {added} templates added, {updated} updated")
+        return {'FINISHED'}
+
 class EVENT_OT_import_palette(Operator):
     bl_idname = "event.import_palette"
     bl_label = "Import Event Palette"
-    bl_description = "Import event templates (palette) from JSON file"
+    bl_description = "Import event templates (palette) from one or more JSON files"
 
     filepath: StringProperty(
         name="File Path",
@@ -1222,6 +3211,15 @@ class EVENT_OT_import_palette(Operator):
         maxlen=1024,
         subtype="FILE_PATH"
     )
+    # Several files selected in the file browser, merged in order
+    files: CollectionProperty(
+        type=bpy.types.OperatorFileListElement,
+        options={'HIDDEN', 'SKIP_SAVE'}
+    )
+    directory: StringProperty(
+        subtype='DIR_PATH',
+        options={'HIDDEN', 'SKIP_SAVE'}
+    )
 
     filename_ext = ".json"
 
@@ -1240,104 +3238,55 @@ class EVENT_OT_import_palette(Operator):
     def execute(self, context):
         import os
 
-        # Проверяем, что путь не пустой и файл существует
-        if not self.filepath:
-            self.report({'ERROR'}, "No file selected")
-            return {'CANCELLED'}
+        filepaths = [os.path.join(self.directory, f.name) for f in self.files if f.name] or [self.filepath]
 
-        if not os.path.exists(self.filepath):
-            self.report({'ERROR'}, f"File does not exist: {self.filepath}")
+        # Проверяем, что путь не пустой и файлы существуют
+        if not filepaths[0]:
+            self.report({'ERROR'}, "No file selected")
             return {'CANCELLED'}
 
-        if not self.filepath.lower().endswith('.json'):
-            self.report({'ERROR'}, "Selected file is not a JSON file")
-            return {'CANCELLED'}
+        for filepath in filepaths:
+            if not os.path.exists(filepath):
+                self.report({'ERROR'}, f"File does not exist: {filepath}")
+                return {'CANCELLED'}
 
-        try:
-            with open(self.filepath, "r", encoding='utf-8') as f:
-                palette_data = json.load(f)
+            if not filepath.lower().endswith('.json'):
+                self.report({'ERROR'}, f"Selected file is not a JSON file: {os.path.basename(filepath)}")
+                return {'CANCELLED'}
 
-            # Проверяем структуру файла
-            if "templates" not in palette_data:
-                self.report({'ERROR'}, "Invalid palette file format - missing 'templates' section")
+        # Unchanged files come from the parsed palette cache; a later file's
+        # template replaces an earlier one of the same name
+        cache_dir = palette_cache_dir(context)
+        palettes = []
+        for filepath in filepaths:
+            try:
+                palettes.append(core.load_palette_file(filepath, cache_dir))
+            except json.JSONDecodeError as e:
+                self.report({'ERROR'}, f"Invalid JSON file {os.path.basename(filepath)}: {str(e)}")
+                return {'FINISHED'}
+            except core.EventFormatError:
+                self.report({'ERROR'}, f"Invalid palette file format - missing 'templates' section "
+                                       f"in {os.path.basename(filepath)}")
                 return {'CANCELLED'}
+            except Exception as e:
+                self.report({'ERROR'}, f"Palette import failed: {str(e)}")
+                return {'FINISHED'}
+        templates = core.merge_palettes(palettes)
 
+        try:
             events = context.scene.event_system
 
             # Clear existing templates if replacing
             if self.replace_existing:
                 events.event_templates.clear()
 
-            # Import templates with custom fields
-            imported_count = 0
-            for template_data in palette_data.get("templates", []):
-                # Проверяем обязательные поля
-                if "name" not in template_data:
-                    continue
-
-                # Check if template with same name already exists
-                existing_template = None
-                for template in events.event_templates:
-                    if template.name == template_data["name"]:
-                        existing_template = template
-                        break
-
-                if existing_template and not self.replace_existing:
-                    # Skip if template exists and we're not replacing
-                    continue
-
-                # Create new template or use existing
-                if existing_template:
-                    template = existing_template
-                    # Clear existing fields
-                    template.custom_fields.clear()
-                else:
-                    template = events.event_templates.add()
-
-                template.name = template_data["name"]
-                template.description = template_data.get("description", "")
-                template.color = template_data.get("color", [1.0, 0.0, 0.0])
-
-                # Import custom fields
-                for field_data in template_data.get("custom_fields", []):
-                    if "name" not in field_data or "type" not in field_data:
-                        continue
-
-                    field = template.custom_fields.add()
-                    field.name = field_data["name"]
-                    field.field_type = field_data["type"]
-                    field.description = field_data.get("description", "")
-
-                    default_value = field_data.get("default_value")
-                    if field.field_type == 'BOOL' and default_value is not None:
-                        field.default_bool = bool(default_value)
-                    elif field.field_type == 'STRING' and default_value is not None:
-                        field.default_string = str(default_value)
-                    elif field.field_type == 'INT' and default_value is not None:
-                        field.default_int = int(default_value)
-                    elif field.field_type == 'FLOAT' and default_value is not None:
-                        field.default_float = float(default_value)
-                    elif field.field_type == 'ARRAY' and default_value is not None:
-                        if isinstance(default_value, list):
-                            field.default_array = ','.join(str(x) for x in default_value)
-                        else:
-                            field.default_array = str(default_value)
-                    elif field.field_type == 'ENUM':
-                        if default_value is not None:
-                            field.default_enum = str(default_value)
-                        enum_options = field_data.get("enum_options", [])
-                        if isinstance(enum_options, list):
-                            field.enum_options = ','.join(str(x) for x in enum_options)
-                        else:
-                            field.enum_options = str(enum_options)
-
-                imported_count += 1
+            # Existing templates of the same name are skipped when merging
+            imported_count = merge_templates(events, templates)
 
             action = "replaced" if self.replace_existing else "imported"
-            self.report({'INFO'}, f"Palette {action}: {imported_count} templates from {os.path.basename(self.filepath)}")
+            source = os.path.basename(filepaths[0]) if len(filepaths) == 1 else f"{len(filepaths)} files"
+            self.report({'INFO'}, f"Palette {action}: {imported_count} templates from {source}")
 
-        except json.JSONDecodeError as e:
-            self.report({'ERROR'}, f"Invalid JSON file: {str(e)}")
         except Exception as e:
             self.report({'ERROR'}, f"Palette import failed: {str(e)}")
 
@@ -1354,6 +3303,7 @@ class EVENT_OT_import_palette(Operator):
 
 # Registration
 classes = [
+    EventSystemPreferences,
     EventField,
     EventFieldValue,
     EventTemplate,
@@ -1370,13 +3320,25 @@ classes = [
     EVENT_OT_add_to_timeline,
     EVENT_OT_remove_from_timeline,
     EVENT_OT_go_to_event,
+    EVENT_OT_jump_to_event,
+    EVENT_OT_select_event,
     EVENT_OT_duplicate_event,
     EVENT_OT_move_event_to_current,
+    EVENT_OT_override_field,
+    EVENT_OT_reset_field,
+    EVENT_OT_strip_default_values,
+    EVENT_OT_repair_events,
     EVENT_OT_export_palette,
     EVENT_OT_import_palette,
+    EVENT_OT_sync_palette,
     EVENT_OT_export_events,
     EVENT_OT_import_events,
     EVENT_OT_clear_all_events,
+    EVENT_OT_remove_events_by_filter,
+    EVENT_OT_stamp_template,
+    EVENT_OT_generate_footsteps,
+    EVENT_OT_place_audio_onsets,
+    EVENT_OT_dump_trace_log,
 ]
 
 def register():
@@ -1384,10 +3346,26 @@ def register():
         bpy.utils.register_class(cls)
     bpy.types.Scene.event_system = PointerProperty(type=EventSystemProperties)
 
+    if _console_handler not in log.handlers:
+        log.addHandler(_console_handler)
+    configure_logging(get_preferences(bpy.context))
+
     # Add frame change handler
     if frame_change_handler not in bpy.app.handlers.frame_change_post:
         bpy.app.handlers.frame_change_post.append(frame_change_handler)
 
+    # Runtime indexes are rebuilt after loading a file and after undo/redo
+    if load_post_handler not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(load_post_handler)
+    if save_post_handler not in bpy.app.handlers.save_post:
+        bpy.app.handlers.save_post.append(save_post_handler)
+    for handlers in (bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if undo_post_handler not in handlers:
+            handlers.append(undo_post_handler)
+
+    # Polls only while a scene watches its palette, see palette_watch_timer
+    start_palette_watch()
+
 def unregister():
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
@@ -1399,5 +3377,26 @@ def unregister():
     if frame_change_handler in bpy.app.handlers.frame_change_post:
         bpy.app.handlers.frame_change_post.remove(frame_change_handler)
 
+    if load_post_handler in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(load_post_handler)
+    if save_post_handler in bpy.app.handlers.save_post:
+        bpy.app.handlers.save_post.remove(save_post_handler)
+    for handlers in (bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if undo_post_handler in handlers:
+            handlers.remove(undo_post_handler)
+
+    # Running exports finish on their own, only their reports are dropped
+    for timer in (palette_watch_timer, export_results_timer):
+        if bpy.app.timers.is_registered(timer):
+            bpy.app.timers.unregister(timer)
+
+    _event_indexes.clear()
+    _template_lookups.clear()
+    _template_defaults.clear()
+    _enum_items.clear()
+    _instance_list_cache.clear()
+    _palette_watch_keys.clear()
+    log.removeHandler(_console_handler)
+
 if __name__ == "__main__":
     register()
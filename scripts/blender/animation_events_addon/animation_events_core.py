@@ -0,0 +1,753 @@
+"""Blender-independent model and serializers for animation events.
+
+Templates, fields and event instances as plain slotted dataclasses, plus
+the conversions the add-on operators used to do inline: field type
+dispatch, palette default coercion, palette-aware typing of imported
+values with the JSON-type fallback, and the exported dict layout.
+animation_events_addon.py copies between these objects and its bpy
+PropertyGroups; pipeline tools and benchmarks use them directly.
+
+Field values are kept in the add-on's storage representation: ARRAY
+values and ENUM options are comma-separated strings, exactly what the
+PropertyGroups hold. to_dict() methods produce the exported JSON layout.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import operator
+import os
+import pickle
+import sys
+from dataclasses import dataclass, field
+
+log = logging.getLogger("animation_events").getChild("core")
+
+# dataclass(slots=True) needs Python 3.10, Blender 3.0-3.2 ship 3.9
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+FIELD_TYPES = ('BOOL', 'STRING', 'INT', 'FLOAT', 'ARRAY', 'ENUM')
+
+# Field type -> EventFieldValue / EventField attribute holding the value
+VALUE_ATTRS = {
+    'BOOL': 'bool_value',
+    'STRING': 'string_value',
+    'INT': 'int_value',
+    'FLOAT': 'float_value',
+    'ARRAY': 'array_value',
+    'ENUM': 'enum_value',
+}
+DEFAULT_ATTRS = {
+    'BOOL': 'default_bool',
+    'STRING': 'default_string',
+    'INT': 'default_int',
+    'FLOAT': 'default_float',
+    'ARRAY': 'default_array',
+    'ENUM': 'default_enum',
+}
+EMPTY_VALUES = {
+    'BOOL': False,
+    'STRING': "",
+    'INT': 0,
+    'FLOAT': 0.0,
+    'ARRAY': "",
+    'ENUM': "",
+}
+
+EVENTS_BATCH_SIZE = 2048
+
+
+class EventFormatError(ValueError):
+    """An event dict is missing a required key"""
+
+
+def split_list(value):
+    """Comma-separated storage string -> list, empty string -> []"""
+    return value.split(',') if value else []
+
+
+def join_list(value):
+    """JSON list (or scalar) -> comma-separated storage string"""
+    if isinstance(value, list):
+        return ','.join(str(x) for x in value)
+    return str(value)
+
+
+def to_storage(field_type, value):
+    """Coerce a JSON value to the storage representation of `field_type`
+
+    Raises ValueError/TypeError when the value does not convert.
+    """
+    if field_type == 'BOOL':
+        return bool(value)
+    if field_type == 'INT':
+        return int(value)
+    if field_type == 'FLOAT':
+        return float(value)
+    if field_type == 'ARRAY':
+        return join_list(value)
+    return str(value)
+
+
+def from_storage(field_type, value):
+    """Storage representation -> exported JSON value"""
+    if field_type == 'ARRAY':
+        return split_list(value)
+    return value
+
+
+def infer_field_value(name, value):
+    """Type a value that has no palette definition from its JSON type"""
+    if isinstance(value, bool):
+        return FieldValue(name, 'BOOL', value)
+    if isinstance(value, str):
+        return FieldValue(name, 'STRING', value)
+    if isinstance(value, int):
+        return FieldValue(name, 'INT', value)
+    if isinstance(value, float):
+        return FieldValue(name, 'FLOAT', value)
+    if isinstance(value, list):
+        return FieldValue(name, 'ARRAY', join_list(value))
+    # Неизвестный тип - сохраняем как строку
+    return FieldValue(name, 'STRING', str(value))
+
+
+def parse_field_value(name, value, field_type=None):
+    """FieldValue for an imported value, typed by the palette when known
+
+    A value that does not convert to its palette type is kept as a string.
+    """
+    if not field_type:
+        return infer_field_value(name, value)
+    try:
+        return FieldValue(name, field_type, to_storage(field_type, value))
+    except (ValueError, TypeError) as e:
+        log.warning("Поле '%s': ошибка конвертации в %s: %s, используем строку", name, field_type, e)
+        return FieldValue(name, 'STRING', str(value))
+
+
+@dataclass(**_SLOTS)
+class Field:
+    """Custom field definition of a template"""
+    name: str
+    type: str = 'STRING'
+    default: object = ""
+    enum_options: str = ""
+    description: str = ""
+
+    def options(self):
+        """Parsed ENUM options, blanks dropped"""
+        return [opt.strip() for opt in self.enum_options.split(',') if opt.strip()]
+
+    @classmethod
+    def from_dict(cls, data):
+        """Field from a palette entry, None when name or type is missing"""
+        if "name" not in data or "type" not in data:
+            return None
+        field_type = data["type"]
+        result = cls(data["name"], field_type, EMPTY_VALUES.get(field_type), "", data.get("description", ""))
+
+        default_value = data.get("default_value")
+        if default_value is not None and field_type in EMPTY_VALUES:
+            result.default = to_storage(field_type, default_value)
+        if field_type == 'ENUM':
+            result.enum_options = join_list(data.get("enum_options", []))
+        return result
+
+    def to_dict(self):
+        data = {
+            "name": self.name,
+            "type": self.type,
+            "description": self.description,
+            "default_value": from_storage(self.type, self.default) if self.type in EMPTY_VALUES else None,
+        }
+        if self.type == 'ENUM':
+            data["enum_options"] = split_list(self.enum_options)
+        return data
+
+
+@dataclass(**_SLOTS)
+class Template:
+    """Event template (palette entry)"""
+    name: str
+    description: str = ""
+    color: tuple = (1.0, 0.0, 0.0)
+    fields: list = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Template from a palette entry, None when the name is missing"""
+        if "name" not in data:
+            return None
+        fields = [Field.from_dict(field_data) for field_data in data.get("custom_fields", [])]
+        return cls(
+            data["name"],
+            data.get("description", ""),
+            tuple(data.get("color", [1.0, 0.0, 0.0])),
+            [f for f in fields if f is not None],
+        )
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "description": self.description,
+            "color": list(self.color),
+            "custom_fields": [f.to_dict() for f in self.fields],
+        }
+
+    def field_types(self):
+        return {f.name: f.type for f in self.fields}
+
+    def default_values(self):
+        """Field values of a new instance of this template"""
+        return [FieldValue(f.name, f.type, f.default) for f in self.fields]
+
+
+@dataclass(**_SLOTS)
+class FieldValue:
+    """Value of one field on an event instance"""
+    name: str
+    type: str
+    value: object
+
+
+@dataclass(**_SLOTS)
+class Event:
+    """Event instance on the timeline"""
+    template_name: str
+    frame: int
+    field_values: list = field(default_factory=list)
+
+    @property
+    def marker_name(self):
+        return f"{self.template_name}_{self.frame}"
+
+    @classmethod
+    def from_dict(cls, data, field_types=None):
+        """Event from an exported dict, values typed by `field_types`"""
+        template_name, frame = event_key(data)
+        field_types = field_types or {}
+        return cls(template_name, frame, [
+            parse_field_value(name, value, field_types.get(name))
+            for name, value in data["field_values"].items()
+        ])
+
+    def to_dict(self, fps):
+        """Exported representation, first value wins for duplicate names"""
+        field_values = {}
+        for field_value in self.field_values:
+            if field_value.name in field_values or field_value.type not in VALUE_ATTRS:
+                continue
+            field_values[field_value.name] = from_storage(field_value.type, field_value.value)
+        return {
+            "template_name": self.template_name,
+            "frame": self.frame,
+            "time": self.frame / fps,
+            "field_values": field_values,
+        }
+
+
+def parse_frames(text):
+    """Frames of a list like "1, 5, 10-20, 30-60:10", ascending, no duplicates
+
+    Items are single frames or inclusive ranges with an optional step.
+    Raises ValueError for malformed items.
+    """
+    frames = set()
+    for item in text.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        step = 1
+        if ':' in item:
+            item, step_text = item.split(':', 1)
+            step = int(step_text)
+            if step < 1:
+                raise ValueError(f"step must be positive: {step_text}")
+        # A leading '-' is a negative frame, not a range
+        dash = item.find('-', 1)
+        if dash == -1:
+            frames.add(int(item))
+        else:
+            start, end = int(item[:dash]), int(item[dash + 1:])
+            if start > end:
+                raise ValueError(f"range ends before it starts: {item}")
+            frames.update(range(start, end + 1, step))
+    return sorted(frames)
+
+
+# Sparse field values
+# An instance may store only the fields that differ from its template's
+# defaults; readers fill in the rest from the template.
+
+def same_value(field_type, a, b):
+    """Equal values of a field type"""
+    if field_type == 'FLOAT':
+        # Stored floats are single precision, imported ones are not
+        return math.isclose(a, b, rel_tol=1e-6)
+    return a == b
+
+
+def is_default(field_value, default):
+    """True when field_value holds the template default (same name and type)"""
+    if default is None or field_value.type != default.type:
+        return False
+    return same_value(field_value.type, field_value.value, default.value)
+
+
+def with_defaults(field_values, defaults):
+    """Template defaults in template order, replaced by the stored values of
+    the same name; stored values the template does not define follow"""
+    stored = {}
+    for field_value in field_values:
+        stored.setdefault(field_value.name, field_value)
+    resolved = [stored.get(default.name, default) for default in defaults]
+    names = {default.name for default in defaults}
+    resolved.extend(v for v in field_values if v.name not in names and stored[v.name] is v)
+    return resolved
+
+
+def without_defaults(field_values, defaults):
+    """field_values minus the ones equal to their template default"""
+    by_name = {default.name: default for default in defaults}
+    return [v for v in field_values if not is_default(v, by_name.get(v.name))]
+
+
+def event_key(data):
+    """(template_name, frame) of an exported event dict
+
+    Raises EventFormatError when a required key is missing.
+    """
+    for key in ("frame", "template_name", "field_values"):
+        if key not in data:
+            raise EventFormatError(f"missing '{key}' field")
+    return data["template_name"], int(data["frame"])
+
+
+# Field predicate operators: name -> comparison of (stored value, filter value)
+FILTER_OPS = {
+    'EQ': operator.eq,
+    'NE': operator.ne,
+    'LT': operator.lt,
+    'LE': operator.le,
+    'GT': operator.gt,
+    'GE': operator.ge,
+    'CONTAINS': None,
+}
+_TRUE_STRINGS = {"1", "true", "yes", "on"}
+
+
+def parse_filter_value(field_type, text):
+    """Filter text typed like a stored value of `field_type`"""
+    if field_type == 'BOOL':
+        return text.strip().lower() in _TRUE_STRINGS
+    return to_storage(field_type, text)
+
+
+@dataclass(**_SLOTS)
+class EventFilter:
+    """Selects events by frame range, template and one field predicate
+
+    None / empty criteria match everything. The field predicate compares
+    the stored value against `field_value` parsed for the field's type;
+    CONTAINS tests ARRAY items or substrings. Events without the field, or
+    whose value does not compare, do not match.
+    """
+    frame_start: object = None
+    frame_end: object = None
+    template_name: str = ""
+    field_name: str = ""
+    field_op: str = 'EQ'
+    field_value: str = ""
+
+    def matches_key(self, template_name, frame):
+        if self.template_name and template_name != self.template_name:
+            return False
+        if self.frame_start is not None and frame < self.frame_start:
+            return False
+        if self.frame_end is not None and frame > self.frame_end:
+            return False
+        return True
+
+    def matches_fields(self, field_values):
+        if not self.field_name:
+            return True
+        for field_value in field_values:
+            if field_value.name == self.field_name:
+                return self._match_value(field_value.type, field_value.value)
+        return False
+
+    def matches(self, event):
+        return self.matches_key(event.template_name, event.frame) and self.matches_fields(event.field_values)
+
+    def _match_value(self, field_type, value):
+        if self.field_op == 'CONTAINS':
+            if field_type == 'ARRAY':
+                return self.field_value in (item.strip() for item in split_list(value))
+            return self.field_value in str(value)
+        try:
+            target = parse_filter_value(field_type, self.field_value)
+            if field_type == 'FLOAT' and self.field_op in ('EQ', 'NE'):
+                # Stored floats are single precision
+                return math.isclose(value, target, rel_tol=1e-6) == (self.field_op == 'EQ')
+            return FILTER_OPS[self.field_op](value, target)
+        except (ValueError, TypeError):
+            return False
+
+
+def read_palette(data):
+    """Templates of a palette document, invalid entries skipped"""
+    if "templates" not in data:
+        raise EventFormatError("missing 'templates' section")
+    templates = (Template.from_dict(template_data) for template_data in data["templates"])
+    return [t for t in templates if t is not None]
+
+
+def palette_to_dict(templates):
+    return {"templates": [t.to_dict() for t in templates]}
+
+
+def merge_palettes(palettes):
+    """One template list from several palettes, in order of first appearance
+
+    A template of a later palette replaces the earlier one of the same name.
+    """
+    merged = {}
+    for templates in palettes:
+        for template in templates:
+            merged[template.name] = template
+    return list(merged.values())
+
+
+@dataclass(**_SLOTS)
+class TemplateDiff:
+    """Changes that turn one version of a template into another, see diff_template"""
+    attrs: dict = field(default_factory=dict)    # template attribute -> new value
+    added: list = field(default_factory=list)    # new Field items, in palette order
+    changed: dict = field(default_factory=dict)  # field name -> {Field attribute: new value}
+    removed: list = field(default_factory=list)  # names of the fields to remove
+    order: list = None                           # field names in their new order, None if unchanged
+
+    def __bool__(self):
+        return bool(self.attrs or self.added or self.changed or self.removed or self.order)
+
+
+def diff_template(current, new):
+    """TemplateDiff from Template `current` to `new` of the same name
+
+    Field changes list the type before the default, in the order they must
+    be applied. A renamed field is a removal plus an addition.
+    """
+    diff = TemplateDiff()
+    if current.description != new.description:
+        diff.attrs["description"] = new.description
+    if (len(current.color) != len(new.color)
+            or not all(math.isclose(a, b, abs_tol=1e-6) for a, b in zip(current.color, new.color))):
+        diff.attrs["color"] = new.color
+
+    old_fields = {f.name: f for f in current.fields}
+    new_names = [f.name for f in new.fields]
+    palette_names = set(new_names)
+    diff.removed = [f.name for f in current.fields if f.name not in palette_names]
+    removed = set(diff.removed)
+    for new_field in new.fields:
+        old = old_fields.get(new_field.name)
+        if old is None:
+            diff.added.append(new_field)
+            continue
+        changes = {}
+        if old.type != new_field.type:
+            changes["type"] = new_field.type
+        if old.enum_options != new_field.enum_options:
+            changes["enum_options"] = new_field.enum_options
+        if old.type != new_field.type or not same_value(new_field.type, old.default, new_field.default):
+            changes["default"] = new_field.default
+        if old.description != new_field.description:
+            changes["description"] = new_field.description
+        if changes:
+            diff.changed[new_field.name] = changes
+
+    # Kept fields stay in place and added ones are appended; reorder only if that is not the palette order
+    kept = [f.name for f in current.fields if f.name not in removed]
+    if kept + [f.name for f in diff.added] != new_names:
+        diff.order = new_names
+    return diff
+
+
+# Parsed palette cache
+# The same studio palette is imported into many .blend files. Parsed
+# templates are kept per file version (path, mtime, size): in memory for the
+# session and, given a cache directory, pickled to disk for later sessions.
+# Cached templates are shared between callers and must not be modified.
+PALETTE_CACHE_VERSION = 1
+
+_parsed_palettes = {}  # absolute path -> ((mtime_ns, size), templates)
+
+
+def palette_cache_path(cache_dir, filepath):
+    name = hashlib.sha1(os.path.abspath(filepath).encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, name + ".pickle")
+
+
+def _read_palette_cache(cache_path, filepath, key):
+    try:
+        with open(cache_path, 'rb') as f:
+            entry = pickle.load(f)
+    except Exception:
+        # Missing, truncated or written by another version: parse the file
+        return None
+    if (not isinstance(entry, dict) or entry.get("version") != PALETTE_CACHE_VERSION
+            or entry.get("path") != filepath or entry.get("key") != key):
+        return None
+    return entry["templates"]
+
+
+def _write_palette_cache(cache_path, filepath, key, templates):
+    entry = {"version": PALETTE_CACHE_VERSION, "path": filepath, "key": key, "templates": templates}
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        log.warning("Не удалось записать кэш палетки %s: %s", cache_path, e)
+
+
+def load_palette_file(filepath, cache_dir=None):
+    """Templates of a palette file, parsed once per version of the file
+
+    Raises OSError, ValueError for invalid JSON and EventFormatError like
+    read_palette.
+    """
+    filepath = os.path.abspath(filepath)
+    stat = os.stat(filepath)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _parsed_palettes.get(filepath)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    cache_path = palette_cache_path(cache_dir, filepath) if cache_dir else None
+    templates = _read_palette_cache(cache_path, filepath, key) if cache_path else None
+    if templates is None:
+        with open(filepath, encoding='utf-8') as f:
+            templates = read_palette(json.load(f))
+        if cache_path:
+            _write_palette_cache(cache_path, filepath, key, templates)
+    _parsed_palettes[filepath] = (key, templates)
+    return templates
+
+
+# Event file serialization
+# Export writes events one at a time, import reads them one at a time and
+# applies them in batches, so neither side holds the whole timeline as dicts.
+
+def write_events_json(f, events, compact=False):
+    """Stream events into a {"events": [...]} document, returns the count
+
+    The indented layout is byte-identical to json.dump(..., indent=2).
+    """
+    count = 0
+    if compact:
+        f.write('{"events":[')
+        for event_data in events:
+            if count:
+                f.write(',')
+            f.write(json.dumps(event_data, separators=(',', ':')))
+            count += 1
+        f.write(']}')
+    else:
+        f.write('{\n  "events": [')
+        for event_data in events:
+            f.write(',\n    ' if count else '\n    ')
+            f.write(json.dumps(event_data, indent=2).replace('\n', '\n    '))
+            count += 1
+        f.write('\n  ]\n}' if count else ']\n}')
+    return count
+
+
+def write_events_jsonl(f, events, compact=False):
+    """Write one event per line (JSON Lines), returns the count"""
+    separators = (',', ':') if compact else None
+    count = 0
+    for event_data in events:
+        f.write(json.dumps(event_data, separators=separators))
+        f.write('\n')
+        count += 1
+    return count
+
+
+def iter_events_jsonl(f):
+    """Yield events from a JSON Lines file"""
+    for line in f:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+class EventStreamReader:
+    """Incremental reader for {"events": [...]} documents
+
+    The file is read in fixed-size chunks. Top-level sections other than
+    "events" are decoded whole into `sections`; events are yielded one at a
+    time, so memory stays bounded by the largest single event.
+    """
+
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, f):
+        self.f = f
+        self.sections = {}
+        self._buf = ""
+        self._pos = 0
+        self._decoder = json.JSONDecoder()
+
+    def open(self):
+        """Read up to the start of the events array, False if there is none"""
+        self._expect('{')
+        if self._peek() == '}':
+            return False
+        while True:
+            key = self._value()
+            self._expect(':')
+            if key == "events":
+                self._expect('[')
+                return True
+            self.sections[key] = self._value()
+            if self._expect(',}') == '}':
+                return False
+
+    def __iter__(self):
+        if self._peek() == ']':
+            self._pos += 1
+        else:
+            while True:
+                yield self._value()
+                if self._expect(',]') == ']':
+                    break
+        # Sections stored after the events array
+        while self._expect(',}') == ',':
+            key = self._value()
+            self._expect(':')
+            self.sections[key] = self._value()
+
+    def _fill(self):
+        chunk = self.f.read(self.CHUNK_SIZE)
+        if not chunk:
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self):
+        """Next non-whitespace character, '' at end of file"""
+        while True:
+            buf = self._buf
+            pos = self._pos
+            while pos < len(buf) and buf[pos] in ' \t\r\n':
+                pos += 1
+            self._pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, chars):
+        char = self._peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars!r}, got {char or 'end of file'!r}")
+        self._pos += 1
+        return char
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A value touching the end of the buffer may continue (e.g. a number)
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+
+# Export bookkeeping
+# "<export>.hash" next to an exported file records the key it was produced
+# from (events revision, format, fps...) and the file's sha256, size and
+# mtime. An export with the same key can skip serialization entirely, one
+# whose output hashes the same leaves the file untouched.
+RECORD_SUFFIX = ".hash"
+
+
+def file_sha256(filepath):
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_export_record(filepath):
+    """Record of the last export to filepath, None if missing or unreadable"""
+    try:
+        with open(filepath + RECORD_SUFFIX, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_export_record(filepath, key, digest):
+    stat = os.stat(filepath)
+    record = {"key": key, "sha256": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    with open(filepath + RECORD_SUFFIX, "w", encoding='utf-8') as f:
+        json.dump(record, f, indent=2)
+
+
+def file_matches_record(filepath, record):
+    """The file is still the one the record was written for"""
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return False
+    return stat.st_size == record.get("size") and stat.st_mtime_ns == record.get("mtime_ns")
+
+
+def export_is_current(filepath, key):
+    """An export with this key was written to filepath and not touched since"""
+    record = read_export_record(filepath)
+    return record is not None and record.get("key") == key and file_matches_record(filepath, record)
+
+
+def replace_if_changed(tmp_path, filepath, key):
+    """Move a freshly written export into place unless its content is unchanged
+
+    Returns True when filepath was replaced. Either way tmp_path is gone and
+    the record describes filepath with `key`.
+    """
+    digest = file_sha256(tmp_path)
+    record = read_export_record(filepath)
+    if record and record.get("sha256") == digest and file_matches_record(filepath, record):
+        os.remove(tmp_path)
+        replaced = False
+    else:
+        os.replace(tmp_path, filepath)
+        replaced = True
+    write_export_record(filepath, key, digest)
+    return replaced
+
+
+def batched(iterable, size):
+    """Yield lists of up to `size` items"""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
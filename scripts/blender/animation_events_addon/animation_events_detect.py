@@ -0,0 +1,258 @@
+"""Vectorized event detection for animation events.
+
+NumPy-only helpers that turn sampled animation and audio into event frames,
+used by the add-on's generate operators and runnable without Blender. Matrices
+follow mathutils: row-major arrays, column vectors (v' = M @ v), so
+numpy.array(matrix) of a mathutils.Matrix can be passed in directly.
+"""
+
+import numpy as np
+
+
+def quaternion_matrices(quaternions):
+    """(N, 4) w, x, y, z quaternions -> (N, 3, 3) rotation matrices"""
+    q = np.asarray(quaternions, dtype=np.float64)
+    norms = np.linalg.norm(q, axis=1, keepdims=True)
+    # Pose quaternions are normalized on use, a zero quaternion is no rotation
+    q = np.where(norms > 0.0, q / np.where(norms > 0.0, norms, 1.0), [1.0, 0.0, 0.0, 0.0])
+    w, x, y, z = q.T
+    return np.stack([
+        np.stack([1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)], axis=1),
+        np.stack([2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)], axis=1),
+        np.stack([2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)], axis=1),
+    ], axis=1)
+
+
+def _axis_matrices(axis, angles):
+    c, s = np.cos(angles), np.sin(angles)
+    one, zero = np.ones_like(angles), np.zeros_like(angles)
+    if axis == 'X':
+        rows = [[one, zero, zero], [zero, c, -s], [zero, s, c]]
+    elif axis == 'Y':
+        rows = [[c, zero, s], [zero, one, zero], [-s, zero, c]]
+    else:
+        rows = [[c, -s, zero], [s, c, zero], [zero, zero, one]]
+    return np.stack([np.stack(row, axis=1) for row in rows], axis=1)
+
+
+def euler_matrices(eulers, order='XYZ'):
+    """(N, 3) X, Y, Z angles -> (N, 3, 3) rotation matrices
+
+    `order` is a Blender rotation mode: 'XYZ' applies X first, then Y, then Z.
+    """
+    eulers = np.asarray(eulers, dtype=np.float64)
+    result = None
+    for axis in order:
+        matrices = _axis_matrices(axis, eulers[:, 'XYZ'.index(axis)])
+        result = matrices if result is None else matrices @ result
+    return result
+
+
+def basis_matrices(locations, rotations, scales):
+    """Pose basis matrices translation @ rotation @ scale, (N, 4, 4)
+
+    locations and scales are (N, 3), rotations (N, 3, 3).
+    """
+    count = len(locations)
+    matrices = np.zeros((count, 4, 4))
+    matrices[:, :3, :3] = rotations * np.asarray(scales, dtype=np.float64)[:, np.newaxis, :]
+    matrices[:, :3, 3] = locations
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+
+def chain_matrices(world, chain):
+    """World matrices of the last bone of a chain, (N, 4, 4)
+
+    `world` is the armature object's matrix, `chain` a root-first list of
+    (rest, basis) pairs: rest is the bone's matrix_local relative to its
+    parent's (armature space for the root), basis its (N, 4, 4) pose basis.
+    Matches Blender's pose evaluation for bones that inherit rotation and
+    scale, without constraints.
+    """
+    result = np.asarray(world, dtype=np.float64)
+    for rest, basis in chain:
+        result = result @ np.asarray(rest, dtype=np.float64) @ basis
+    return result
+
+
+def contact_frames(positions, fps, height_threshold=0.02, speed_threshold=0.5, min_gap=4):
+    """Indices where a foot lands, from its (N, 3) world positions per frame
+
+    A foot is grounded while it is within height_threshold of its lowest
+    point and moves slower than speed_threshold (units per second). Each
+    grounded span yields its first frame; landings closer than min_gap
+    frames to the previous one are treated as the same contact.
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    if len(positions) < 2:
+        return np.empty(0, dtype=np.int64)
+
+    heights = positions[:, 2]
+    speeds = np.linalg.norm(np.gradient(positions, axis=0), axis=1) * fps
+    grounded = (heights <= heights.min() + height_threshold) & (speeds <= speed_threshold)
+    starts = np.flatnonzero(grounded & ~np.concatenate(([False], grounded[:-1])))
+
+    # Few landings per take, a plain loop is enough for the gap rule
+    kept = []
+    for start in starts.tolist():
+        if not kept or start - kept[-1] >= min_gap:
+            kept.append(start)
+    return np.array(kept, dtype=np.int64)
+
+
+# Sampling Blender animation
+# These take bpy objects (F-Curves, pose bones, actions) but only use their
+# attributes, the module itself does not import bpy.
+
+def sample_fcurve(fcurve, frames):
+    """F-Curve values on integer `frames`, as a float array
+
+    Baked takes (mocap) have a key on every frame, their keys are read in
+    one foreach_get; sparser curves are evaluated frame by frame.
+    """
+    frames = np.asarray(frames)
+    count = len(fcurve.keyframe_points)
+    co = np.empty(count * 2, dtype=np.float32)
+    fcurve.keyframe_points.foreach_get("co", co)
+    keys, values = co[0::2], co[1::2]
+    if count >= len(frames) and np.isin(frames, keys).all():
+        return np.interp(frames, keys, values)
+    return np.fromiter((fcurve.evaluate(frame) for frame in frames.tolist()), dtype=np.float64, count=len(frames))
+
+
+def _channel(action, path, size, current, frames):
+    columns = []
+    for i in range(size):
+        fcurve = action.fcurves.find(path, index=i)
+        columns.append(sample_fcurve(fcurve, frames) if fcurve else np.full(len(frames), current[i]))
+    return np.stack(columns, axis=1)
+
+
+def bone_basis(action, pose_bone, frames):
+    """(N, 4, 4) pose basis of a pose bone on `frames`, from the action's F-Curves
+
+    Channels without an F-Curve keep the pose bone's current value.
+    """
+    path = pose_bone.path_from_id()  # 'pose.bones["foot.L"]'
+    locations = _channel(action, path + ".location", 3, pose_bone.location, frames)
+    scales = _channel(action, path + ".scale", 3, pose_bone.scale, frames)
+    mode = pose_bone.rotation_mode
+    if mode == 'QUATERNION':
+        rotations = quaternion_matrices(_channel(action, path + ".rotation_quaternion", 4,
+                                                 pose_bone.rotation_quaternion, frames))
+    elif mode == 'AXIS_ANGLE':
+        raise ValueError(f"Bone '{pose_bone.name}': axis-angle rotation is not supported")
+    else:
+        rotations = euler_matrices(_channel(action, path + ".rotation_euler", 3,
+                                            pose_bone.rotation_euler, frames), mode)
+    return basis_matrices(locations, rotations, scales)
+
+
+def bone_world_positions(obj, action, bone_name, frames):
+    """(N, 3) world-space head positions of an armature bone on `frames`"""
+    bone = obj.data.bones[bone_name]
+    chain = list(reversed(bone.parent_recursive)) + [bone]
+    links = []
+    for link in chain:
+        rest = link.matrix_local if link.parent is None else link.parent.matrix_local.inverted() @ link.matrix_local
+        links.append((np.array(rest), bone_basis(action, obj.pose.bones[link.name], frames)))
+    return chain_matrices(np.array(obj.matrix_world), links)[:, :3, 3]
+
+
+# Audio onsets
+# A WAV file is read in blocks with the stdlib wave module. Only the energy
+# envelope (one value per hop, ~100 per second) is kept, so minutes-long tracks
+# never sit in memory whole.
+
+def pcm_to_mono(data, channels, sample_width):
+    """Interleaved PCM bytes -> mono float32 samples in [-1, 1]"""
+    if sample_width == 1:
+        samples = np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128.0
+    elif sample_width == 3:
+        # 24-bit: pad each little-endian sample to 32 bits, the shift keeps the sign
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3)
+        padded = np.zeros((len(raw), 4), dtype=np.uint8)
+        padded[:, 1:] = raw
+        samples = (padded.view('<i4').ravel() >> 8).astype(np.float32)
+    elif sample_width in (2, 4):
+        samples = np.frombuffer(data, dtype=f'<i{sample_width}').astype(np.float32)
+    else:
+        raise ValueError(f"Unsupported sample width: {sample_width * 8} bit")
+    samples /= float(1 << (sample_width * 8 - 1))
+    return samples.reshape(-1, channels).mean(axis=1) if channels > 1 else samples
+
+
+def wave_blocks(wav, block_frames=1 << 16):
+    """Mono float32 blocks of an open wave.Wave_read, block_frames samples each"""
+    channels, width = wav.getnchannels(), wav.getsampwidth()
+    while True:
+        data = wav.readframes(block_frames)
+        if not data:
+            return
+        yield pcm_to_mono(data, channels, width)
+
+
+class EnergyEnvelope:
+    """Mean-square energy per hop of samples fed in blocks of any size
+
+    Samples that do not fill a hop are carried over to the next block, so
+    the envelope does not depend on how the audio was split.
+    """
+
+    def __init__(self, hop):
+        self.hop = hop
+        self._rest = np.empty(0, dtype=np.float32)
+        self._chunks = []
+
+    def feed(self, samples):
+        data = np.concatenate((self._rest, samples)) if len(self._rest) else samples
+        count = len(data) // self.hop
+        if count:
+            hops = data[:count * self.hop].reshape(count, self.hop).astype(np.float64)
+            self._chunks.append(np.einsum('ij,ij->i', hops, hops) / self.hop)
+        self._rest = data[count * self.hop:]
+
+    def energies(self):
+        """Energy of every complete hop so far"""
+        return np.concatenate(self._chunks) if self._chunks else np.empty(0)
+
+
+def onset_hops(energies, hop_seconds, threshold_db=6.0, min_gap=0.1, silence_db=-50.0, window=0.5):
+    """Indices of the hops where a sound starts, from an EnergyEnvelope
+
+    The onset strength of a hop is how much louder (dB) it is than the hop
+    before. Onsets are its local peaks that exceed the strength's moving
+    average over `window` seconds by threshold_db, in hops louder than
+    silence_db. Onsets closer than min_gap seconds keep the stronger one.
+    """
+    if len(energies) < 3:
+        return np.empty(0, dtype=np.int64)
+    levels = 10.0 * np.log10(np.maximum(energies, 1e-12))
+    strength = np.maximum(0.0, np.diff(levels, prepend=levels[0]))
+
+    # Moving average from a cumulative sum, edges average what they have
+    half = max(1, int(round(window / hop_seconds / 2)))
+    sums = np.concatenate(([0.0], np.cumsum(strength)))
+    lo = np.maximum(np.arange(len(strength)) - half, 0)
+    hi = np.minimum(np.arange(len(strength)) + half + 1, len(strength))
+    average = (sums[hi] - sums[lo]) / (hi - lo)
+
+    peak = np.zeros(len(strength), dtype=bool)
+    peak[1:-1] = (strength[1:-1] > strength[:-2]) & (strength[1:-1] >= strength[2:])
+    candidates = np.flatnonzero(peak & (strength >= average + threshold_db) & (levels > silence_db))
+
+    gap = max(1, int(round(min_gap / hop_seconds)))
+    kept = []
+    for hop in candidates.tolist():
+        if kept and hop - kept[-1] < gap:
+            if strength[hop] > strength[kept[-1]]:
+                kept[-1] = hop
+        else:
+            kept.append(hop)
+    return np.array(kept, dtype=np.int64)
+
+
+def onset_frames(hops, hop_seconds, fps, start_frame=1):
+    """Scene frames of onset hops for audio that starts on start_frame, unique and ascending"""
+    return np.unique(np.round(hops * hop_seconds * fps).astype(np.int64) + start_frame)
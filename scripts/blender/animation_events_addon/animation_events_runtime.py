@@ -0,0 +1,313 @@
+"""Playback queries for exported animation events.
+
+Pure Python (bisect/array only), no bpy, so game-side code can play
+exported clips without Blender. An EventTrack holds one export's events
+sorted by time; every playing character keeps its own Playback (mode,
+speed, position) and asks it which events the playhead crossed since the
+previous tick:
+
+    track = animation_events_runtime.load_track("timeline_events.evb")
+    playback = animation_events_runtime.Playback(track, animation_events_runtime.LOOP)
+    for event in playback.advance(1 / 60):
+        handle(event["template_name"], event["field_values"])
+
+Times are clip times in seconds as exported (frame / fps). A clip spans
+[start, end): by default from its first event to one frame after the
+last one, pass start/end for the action's real frame range. A single
+play also fires events on `end`; loops repeat [start, end) so the end of
+one cycle does not fire together with the start of the next.
+"""
+
+import json
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+
+import animation_events_binary
+
+ONCE = 'ONCE'
+LOOP = 'LOOP'
+PING_PONG = 'PING_PONG'
+PLAY_MODES = (ONCE, LOOP, PING_PONG)
+
+_NO_INDICES = range(0)
+# Seconds within which a playhead counts as on an event or a cycle start:
+# far below a frame and far above the rounding of float positions, so a
+# tick landing right on an event fires it once whichever way it rounded
+_TIME_MARGIN = 1e-9
+
+
+class EventTrack:
+    """Events of one clip sorted by time, with bisect queries
+
+    `events` are exported event dicts; events on the same time keep their
+    file order. `fps` is only used for the default end.
+    """
+
+    def __init__(self, events, fps=0.0, start=None, end=None):
+        # sorted() is stable, exports are usually sorted already
+        self.events = sorted(events, key=lambda event: event["time"])
+        self.times = array('d', (event["time"] for event in self.events))
+        self.frames = array('i', (event["frame"] for event in self.events))
+        self.fps = fps
+        if start is None:
+            start = self.times[0] if self.times else 0.0
+        if end is None:
+            end = self.times[-1] + (1.0 / fps if fps else 0.0) if self.times else start
+        if end < start:
+            raise ValueError(f"Clip end {end} is before its start {start}")
+        self.start = start
+        self.end = end
+        self.length = end - start
+        self._first = bisect_left(self.times, start - _TIME_MARGIN)
+        self._loop_last = bisect_left(self.times, end - _TIME_MARGIN)
+        self._once_last = bisect_right(self.times, end + _TIME_MARGIN)
+
+    def __len__(self):
+        return len(self.events)
+
+    def between(self, t0, t1):
+        """Events with clip time in (t0, t1]"""
+        times = self.times
+        return self.events[bisect_right(times, t0):bisect_right(times, t1)]
+
+    def clip_time(self, position, mode=ONCE):
+        """Clip time under a playhead `position` seconds into playback"""
+        length = self.length
+        if mode == ONCE or length <= 0.0:
+            return self.start + max(position, 0.0) if position < length else self.end
+        cycle, x = self._cycle(position)
+        if mode == PING_PONG and cycle % 2:
+            x = length - x
+        return self.start + x if x < length else self.end
+
+    def at(self, position, mode=ONCE):
+        """Indices of the events under the playhead"""
+        time = self.clip_time(position, mode)
+        last = self._once_last if mode == ONCE or self.length <= 0.0 else self._loop_last
+        return range(bisect_left(self.times, time - _TIME_MARGIN, self._first, last),
+                     bisect_right(self.times, time + _TIME_MARGIN, self._first, last))
+
+    def crossed(self, p0, p1, mode=ONCE):
+        """Events the playhead crosses moving from p0 to p1, in the order it meets them"""
+        events = self.events
+        return [events[i] for i in self.crossed_indices(p0, p1, mode)]
+
+    def crossed_indices(self, p0, p1, mode=ONCE):
+        """Indices of the events crossed moving from p0 to p1
+
+        Positions are seconds of playback from the clip start, already
+        scaled by speed and not wrapped: in a 2 s LOOP position 5.0 is
+        clip time start + 1.0. Moving forward the crossed interval is
+        (p0, p1], backward [p1, p0). An interval across a loop or
+        ping-pong turn is split at the clip ends and every full cycle
+        inside it plays the whole clip, so long ticks lose no events.
+        """
+        if mode not in PLAY_MODES:
+            raise ValueError(f"Unknown play mode: {mode}")
+        length = self.length
+        if mode == ONCE or length <= 0.0:
+            p0 = min(max(p0, 0.0), length)
+            p1 = min(max(p1, 0.0), length)
+            if p1 >= p0:
+                return self._span(p0, False, p1, True, self._once_last, False)
+            return self._span(p1, True, p0, False, self._once_last, True)
+
+        # Cycle k covers positions [k * length, (k + 1) * length); a
+        # ping-pong plays odd cycles backward
+        ping_pong = mode == PING_PONG
+        forward = p1 >= p0
+        c0, x0 = self._cycle(p0)
+        c1, x1 = self._cycle(p1)
+        if forward:
+            if c0 == c1 and not (ping_pong and c0 % 2):
+                # Common case: a tick within one forward pass
+                return self._span(x0, False, x1, True, self._loop_last, False)
+            pieces = [(cycle, x0 if cycle == c0 else 0.0, cycle != c0, x1 if cycle == c1 else length, cycle == c1)
+                      for cycle in range(c0, c1 + 1)]
+        else:
+            if x0 == 0.0:
+                # [p1, p0) ends where the cycle before p0's closes
+                c0, x0 = c0 - 1, length
+            pieces = [(cycle, x1 if cycle == c1 else 0.0, True, x0 if cycle == c0 else length, False)
+                      for cycle in range(c0, c1 - 1, -1)]
+
+        result = []
+        for cycle, lo, lo_closed, hi, hi_closed in pieces:
+            descending = not forward
+            if ping_pong and cycle % 2:
+                # Clip offset is length - x, the bounds swap ends
+                lo, lo_closed, hi, hi_closed = length - hi, hi_closed, length - lo, lo_closed
+                descending = not descending
+            result.extend(self._span(lo, lo_closed, hi, hi_closed, self._loop_last, descending))
+        return result
+
+    def quiet_band(self, position, mode=ONCE):
+        """Open interval (low, high) of playhead positions reachable from `position` without crossing an event
+
+        Bounds stop at the nearest event or cycle end either way, counting
+        an event right on `position`, so no event lies inside the band and
+        any move within it crosses nothing. They are pulled in by
+        _TIME_MARGIN, so a move landing on an event always goes through
+        crossed_indices.
+        """
+        times, first, start, length = self.times, self._first, self.start, self.length
+        if mode == ONCE or length <= 0.0:
+            last = self._once_last
+            time = self.clip_time(position)
+            i = bisect_left(times, time, first, last)
+            high = times[i] - start if i < last else length
+            i = bisect_right(times, time, first, last) - 1
+            low = times[i] - start if i >= first else 0.0
+            return low + _TIME_MARGIN, high - _TIME_MARGIN
+
+        last = self._loop_last
+        ping_pong = mode == PING_PONG
+        # Forward: the first event from position on, in the cycle holding it
+        cycle, x = self._cycle(position)
+        offset = cycle * length
+        if ping_pong and cycle % 2:
+            i = bisect_right(times, start + (length - x), first, last) - 1
+            high = offset + length - (times[i] - start) if i >= first else offset + length
+        else:
+            i = bisect_left(times, start + x, first, last)
+            high = offset + (times[i] - start) if i < last else offset + length
+        # Backward: the cycle that ends at or after position
+        if x == 0.0:
+            cycle, x = cycle - 1, length
+            offset = cycle * length
+        if ping_pong and cycle % 2:
+            i = bisect_left(times, start + (length - x), first, last)
+            low = offset + length - (times[i] - start) if i < last else offset
+        else:
+            i = bisect_right(times, start + x, first, last) - 1
+            low = offset + (times[i] - start) if i >= first else offset
+        return low + _TIME_MARGIN, high - _TIME_MARGIN
+
+    def _cycle(self, position):
+        """(cycle, x) of a looped playhead: position = cycle * length + x, 0 <= x < length
+
+        Positions within _TIME_MARGIN of a cycle start snap onto it, so a
+        tick ending on a loop's end is the next cycle's start however the
+        division rounded.
+        """
+        length = self.length
+        cycle = math.floor(position / length)
+        x = position - cycle * length
+        if x >= length - _TIME_MARGIN:
+            return cycle + 1, 0.0
+        if x < _TIME_MARGIN:
+            return cycle, 0.0
+        return cycle, x
+
+    def _span(self, lo, lo_closed, hi, hi_closed, last, descending):
+        """Indices with clip offset between lo and hi, bounds closed or open
+
+        Events within _TIME_MARGIN of a bound count as on it.
+        """
+        times = self.times
+        start = self.start
+        # start + length may round off the end, the clip end maps to end exactly
+        lo_time = start + lo if lo < self.length else self.end
+        hi_time = start + hi if hi < self.length else self.end
+        if lo_closed:
+            i = bisect_left(times, lo_time - _TIME_MARGIN, self._first, last)
+        else:
+            i = bisect_right(times, lo_time + _TIME_MARGIN, self._first, last)
+        if hi_closed:
+            j = bisect_right(times, hi_time + _TIME_MARGIN, self._first, last)
+        else:
+            j = bisect_left(times, hi_time - _TIME_MARGIN, self._first, last)
+        if i >= j:
+            return _NO_INDICES
+        return range(j - 1, i - 1, -1) if descending else range(i, j)
+
+
+class Playback:
+    """Playhead of one character playing a track
+
+    `speed` scales time: 2.0 plays twice as fast, a negative speed plays
+    backward, and may change between ticks. `position` is seconds of
+    playback from the clip start, wrapped to one cycle; switch clips with
+    play() and jump with seek(). Events right under the starting position
+    fire on the first advance.
+    """
+    __slots__ = ("track", "mode", "speed", "position", "_fresh", "_low", "_high")
+
+    def __init__(self, track, mode=ONCE, speed=1.0, position=0.0):
+        self.play(track, mode, speed, position)
+
+    def play(self, track, mode=ONCE, speed=1.0, position=0.0):
+        """Start playing `track` from `position`"""
+        if mode not in PLAY_MODES:
+            raise ValueError(f"Unknown play mode: {mode}")
+        self.track = track
+        self.mode = mode
+        self.speed = speed
+        self.seek(position)
+
+    def seek(self, position):
+        """Jump without firing the skipped events; events on `position` fire on the next advance"""
+        self.position = self._wrap(position)
+        self._fresh = True
+        # Empty band: the next advance takes the full query
+        self._low = self._high = self.position
+
+    @property
+    def time(self):
+        """Clip time under the playhead"""
+        return self.track.clip_time(self.position, self.mode)
+
+    @property
+    def finished(self):
+        """A ONCE playback reached the end it plays towards"""
+        if self.mode != ONCE:
+            return False
+        if self.speed > 0.0:
+            return self.position >= self.track.length
+        return self.speed < 0.0 and self.position <= 0.0
+
+    def advance(self, dt):
+        """Move the playhead by dt seconds of game time, return the events it crossed"""
+        p1 = self.position + dt * self.speed
+        if self._low < p1 < self._high:
+            # Most ticks fall between two events: nothing to look up
+            self.position = p1
+            return []
+
+        track = self.track
+        p0 = self.position
+        indices = track.crossed_indices(p0, p1, self.mode)
+        events = track.events
+        if self._fresh:
+            self._fresh = False
+            fired = [events[i] for i in track.at(p0, self.mode)]
+            fired.extend(events[i] for i in indices)
+        else:
+            fired = [events[i] for i in indices]
+        self.position = self._wrap(p1)
+        self._low, self._high = track.quiet_band(self.position, self.mode)
+        return fired
+
+    def _wrap(self, position):
+        # Wrapping by whole cycles keeps positions small without changing
+        # what later ticks cross (ping-pong keeps the cycle parity)
+        length = self.track.length
+        if self.mode == ONCE or length <= 0.0:
+            return min(max(position, 0.0), length)
+        return position % (length if self.mode == LOOP else 2.0 * length)
+
+
+def load_track(filepath, start=None, end=None):
+    """EventTrack of an exported events file: .json, .jsonl or binary .evb"""
+    if animation_events_binary.is_binary_events_file(filepath):
+        with open(filepath, 'rb') as f:
+            event_file = animation_events_binary.read_event_file(f.read())
+        return EventTrack(event_file.events(), event_file.fps, start, end)
+
+    with open(filepath, 'r', encoding='utf-8') as f:
+        if filepath.lower().endswith('.jsonl'):
+            events = [json.loads(line) for line in f if line.strip()]
+        else:
+            events = json.load(f)["events"]
+    return EventTrack(events, animation_events_binary.infer_fps(events), start, end)
@@ -0,0 +1,75 @@
+"""Benchmark for audio onset detection on long WAV files.
+
+Plain Python with NumPy, no Blender needed:
+
+    python benchmarks/bench_audio.py 60 600 1800
+
+Writes a stereo 16-bit 44.1 kHz click track of each length (seconds) with two
+hits per second over quiet noise, then times what event.place_audio_onsets
+does: reading the file in blocks into the energy envelope and picking the
+onsets. The peak memory shows the track is never held whole.
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import wave
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, os.pardir))
+
+import animation_events_detect as detect
+
+RATE = 44100
+HOP = RATE // 100
+HITS_PER_SECOND = 2
+
+
+def write_click_track(path, seconds):
+    """One second at a time, so the writer does not need the whole track either"""
+    rng = np.random.default_rng(0)
+    decay = np.arange(RATE // 10)
+    click = 0.5 * np.exp(-decay / 800.0) * np.sin(decay * 0.3)
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        for _ in range(seconds):
+            second = rng.normal(0.0, 0.001, RATE)
+            for hit in range(HITS_PER_SECOND):
+                start = hit * RATE // HITS_PER_SECOND
+                second[start:start + len(click)] += click
+            samples = (np.clip(second, -1.0, 1.0) * 32767).astype('<i2')
+            wav.writeframes(np.repeat(samples[:, np.newaxis], 2, axis=1).tobytes())
+
+
+def analyze(path):
+    with wave.open(path, "rb") as wav:
+        envelope = detect.EnergyEnvelope(HOP)
+        for block in detect.wave_blocks(wav):
+            envelope.feed(block)
+    return detect.onset_hops(envelope.energies(), HOP / RATE)
+
+
+def main(lengths):
+    print(f"{'seconds':>8} {'file MiB':>9} {'onsets':>7} {'analyze s':>10} {'peak MiB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for seconds in lengths:
+            path = os.path.join(tmp, f"clicks_{seconds}.wav")
+            write_click_track(path, seconds)
+            tracemalloc.start()
+            start = time.perf_counter()
+            hops = analyze(path)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            tracemalloc.stop()
+            print(f"{seconds:>8} {os.path.getsize(path) / 2 ** 20:>9.1f} {len(hops):>7} "
+                  f"{elapsed:>10.3f} {peak:>9.1f}", flush=True)
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [60, 600, 1800])
@@ -0,0 +1,58 @@
+"""Benchmark for the binary event format against JSON.
+
+Plain Python, no Blender needed:
+
+    python benchmarks/bench_binary_format.py 10000 100000
+
+For each size, checks that JSON -> binary -> events is lossless and prints
+file sizes and load times: json.loads of the indented and compact JSON,
+the binary reader rebuilding event dicts and the binary tables alone.
+"""
+import io
+import json
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(BENCH_DIR, os.pardir))
+
+import animation_events_binary
+import synthetic
+
+
+def best_of(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(sizes):
+    palette = synthetic.load_palette()
+    print(f"{'events':>8} {'json KB':>9} {'compact KB':>11} {'binary KB':>10} "
+          f"{'json s':>8} {'compact s':>10} {'bin dicts s':>12} {'bin tables s':>13}")
+    for size in sizes:
+        document = {"events": list(synthetic.generate_events(palette, size))}
+        indented = json.dumps(document, indent=2)
+        compact = json.dumps(document, separators=(',', ':'))
+        out = io.BytesIO()
+        animation_events_binary.write_events_binary(out, document["events"], 24)
+        binary = out.getvalue()
+
+        if animation_events_binary.read_events_binary(io.BytesIO(binary)) != document:
+            raise AssertionError("binary round trip is not lossless")
+
+        print(f"{size:>8} {len(indented) / 1024:>9.0f} {len(compact) / 1024:>11.0f} {len(binary) / 1024:>10.0f} "
+              f"{best_of(lambda: json.loads(indented)):>8.3f} "
+              f"{best_of(lambda: json.loads(compact)):>10.3f} "
+              f"{best_of(lambda: animation_events_binary.read_events_binary(io.BytesIO(binary))):>12.3f} "
+              f"{best_of(lambda: animation_events_binary.read_event_file(binary)):>13.3f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000])
@@ -0,0 +1,54 @@
+"""Benchmark for the bpy-independent event model and serializers.
+
+Plain Python, no Blender needed (runs on CI):
+
+    python benchmarks/bench_core_serialization.py 10000 100000
+
+For each size, times the import side (json.loads, then palette-typed
+core.Event objects) and the export side (Event.to_dict and the streaming
+JSON writer), and checks that the round trip reproduces the document.
+"""
+import io
+import json
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(BENCH_DIR, os.pardir))
+
+import animation_events_core as core
+import synthetic
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main(sizes):
+    palette = synthetic.load_palette()
+    field_types = {t.name: t.field_types() for t in core.read_palette(palette)}
+    fps = 24
+
+    print(f"{'events':>8} {'json.loads s':>13} {'from_dict s':>12} {'to_dict s':>10} {'write s':>8}")
+    for size in sizes:
+        text = json.dumps({"events": list(synthetic.generate_events(palette, size, fps))}, indent=2)
+
+        document, load_time = timed(lambda: json.loads(text))
+        events, parse_time = timed(lambda: [core.Event.from_dict(e, field_types.get(e["template_name"]))
+                                            for e in document["events"]])
+        dicts, dict_time = timed(lambda: [event.to_dict(fps) for event in events])
+        out = io.StringIO()
+        _, write_time = timed(lambda: core.write_events_json(out, dicts))
+
+        if out.getvalue() != text:
+            raise AssertionError("core round trip changed the document")
+
+        print(f"{size:>8} {load_time:>13.3f} {parse_time:>12.3f} {dict_time:>10.3f} {write_time:>8.3f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000])
@@ -0,0 +1,106 @@
+"""Benchmark for footstep detection on baked foot motion.
+
+Plain Python with NumPy, no Blender needed:
+
+    python benchmarks/bench_footsteps.py 1000 10000 100000
+
+Builds a stand-in armature (root, hips and two feet) whose action has a
+key on every frame, like a mocap take, and
+times what event.generate_footsteps does per foot: sampling the F-Curves
+into arrays, the vectorized forward kinematics and the contact detection.
+"""
+import math
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, os.pardir))
+
+import animation_events_detect as detect
+
+FPS = 30
+
+
+class Matrix(np.ndarray):
+    """Just enough of mathutils.Matrix for bone_world_positions"""
+
+    @classmethod
+    def translation(cls, offset):
+        matrix = np.eye(4).view(cls)
+        matrix[:3, 3] = offset
+        return matrix
+
+    def inverted(self):
+        return np.linalg.inv(self).view(Matrix)
+
+
+class KeyframePoints:
+    def __init__(self, keys, values):
+        self.co = np.stack([keys, values], axis=1).ravel().astype(np.float32)
+
+    def __len__(self):
+        return len(self.co) // 2
+
+    def foreach_get(self, attr, buffer):
+        buffer[:] = self.co
+
+
+class FCurves(dict):
+    def find(self, data_path, index=0):
+        return self.get((data_path, index))
+
+
+def pose_bone(name):
+    return SimpleNamespace(name=name, location=(0, 0, 0), scale=(1, 1, 1), rotation_mode='QUATERNION',
+                           rotation_quaternion=(1, 0, 0, 0), rotation_euler=(0, 0, 0),
+                           path_from_id=lambda: f'pose.bones["{name}"]')
+
+
+def walking_rig(frame_count):
+    """Armature whose feet take turns: one swings forward and lands while the other is planted"""
+    frames = np.arange(1, frame_count + 1, dtype=np.float64)
+    fcurves = FCurves()
+    bones = {}
+    root = bones["root"] = SimpleNamespace(name="root", parent=None, parent_recursive=[],
+                                           matrix_local=Matrix.translation((0, 0, 1)))
+    hips = bones["hips"] = SimpleNamespace(name="hips", parent=root, parent_recursive=[root],
+                                           matrix_local=Matrix.translation((0, 0, 1)))
+    for side, offset, phase in (("L", 0.1, 0.0), ("R", -0.1, math.pi)):
+        name = f"foot.{side}"
+        bones[name] = SimpleNamespace(name=name, parent=hips, parent_recursive=[hips, root],
+                                      matrix_local=Matrix.translation((offset, 0, 0.1)))
+        swing = np.sin(frames * math.pi / FPS + phase)
+        lift = np.maximum(0.0, swing) * 0.3
+        # The planted foot stays put, the lifted one moves forward
+        stride = np.cumsum(np.where(swing > 0.0, 0.04, 0.0))
+        for index, values in ((1, stride), (2, lift)):
+            fcurves[(f'pose.bones["{name}"].location', index)] = SimpleNamespace(
+                keyframe_points=KeyframePoints(frames, values))
+    return SimpleNamespace(
+        data=SimpleNamespace(bones=bones),
+        pose=SimpleNamespace(bones={name: pose_bone(name) for name in bones}),
+        matrix_world=Matrix.translation((0, 0, 0)),
+        animation_data=SimpleNamespace(action=SimpleNamespace(fcurves=fcurves)),
+    ), frames.astype(np.int64)
+
+
+def main(sizes):
+    print(f"{'frames':>8} {'contacts':>9} {'sample+fk s':>12} {'detect s':>9} {'total s':>8}")
+    for size in sizes:
+        obj, frames = walking_rig(size)
+        action = obj.animation_data.action
+        start = time.perf_counter()
+        positions = [detect.bone_world_positions(obj, action, name, frames) for name in ("foot.L", "foot.R")]
+        sampled = time.perf_counter()
+        contacts = [detect.contact_frames(p, FPS) for p in positions]
+        done = time.perf_counter()
+        print(f"{size:>8} {sum(map(len, contacts)):>9} {sampled - start:>12.3f} "
+              f"{done - sampled:>9.3f} {done - start:>8.3f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000])
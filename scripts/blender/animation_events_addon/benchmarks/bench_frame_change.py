@@ -0,0 +1,65 @@
+"""Benchmark for frame_change_handler.
+
+Run headless from the add-on directory:
+
+    blender --background --factory-startup --python benchmarks/bench_frame_change.py -- 1000 10000 100000
+
+or with the bpy shim: python benchmarks/bench_frame_change.py 1000 10000 100000
+
+Fills the scene with N events and times the indexed handler against the
+previous linear scan. The indexed handler should stay flat as N grows.
+"""
+import random
+import time
+
+import harness
+import animation_events_addon as addon
+
+bpy = harness.bpy
+
+CALLS = 2000
+
+
+def linear_scan_handler(scene):
+    """frame_change_handler as it was before the frame index"""
+    events = scene.event_system
+    current_frame = scene.frame_current
+    for i, instance in enumerate(events.event_instances):
+        if instance.frame == current_frame:
+            events.active_instance_index = i
+            break
+
+
+def fill(scene, count):
+    events = scene.event_system
+    events.event_instances.clear()
+    scene.timeline_markers.clear()
+    for frame in range(count):
+        addon.add_event_instance(scene, "Bench", frame)
+
+
+def time_handler(handler, scene, frames):
+    start = time.perf_counter()
+    for frame in frames:
+        scene.frame_current = frame
+        handler(scene)
+    return (time.perf_counter() - start) / len(frames) * 1e6
+
+
+def main(sizes):
+    harness.register_addon()
+    scene = bpy.context.scene
+    rng = random.Random(0)
+
+    print(f"{'events':>10} {'indexed us/call':>16} {'linear us/call':>16}")
+    for size in sizes:
+        fill(scene, size)
+        addon.get_event_index(scene)
+        frames = [rng.randrange(size) for _ in range(CALLS)]
+        indexed = time_handler(addon.frame_change_handler, scene, frames)
+        linear = time_handler(linear_scan_handler, scene, frames)
+        print(f"{size:>10} {indexed:>16.2f} {linear:>16.2f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in harness.script_args()] or [1000, 10000, 50000])
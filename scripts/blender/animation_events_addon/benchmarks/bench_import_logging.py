@@ -0,0 +1,51 @@
+"""Benchmark for import speed with tracing off and on.
+
+Run headless from the add-on directory:
+
+    blender --background --factory-startup --python benchmarks/bench_import_logging.py -- 1000 10000
+
+or with the bpy shim: python benchmarks/bench_import_logging.py 1000 10000
+
+Writes a synthetic events file built from event_palette_example.json, then
+imports it with the trace buffer disabled (the default) and enabled.
+"""
+import logging
+import os
+import tempfile
+import time
+
+import harness
+import synthetic
+
+bpy = harness.bpy
+
+
+def time_import(filepath):
+    start = time.perf_counter()
+    bpy.ops.event.import_events(filepath=filepath)
+    return time.perf_counter() - start
+
+
+def main(sizes):
+    addon = harness.register_addon()
+    bpy.ops.event.import_palette(filepath=synthetic.EXAMPLE_PALETTE)
+    palette = synthetic.load_palette()
+
+    print(f"{'events':>10} {'trace off s':>12} {'trace on s':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            filepath = os.path.join(tmp, f"events_{size}.json")
+            synthetic.write_events_file(filepath, palette, size)
+
+            addon.trace_log.setLevel(addon.TRACE_OFF)
+            off = time_import(filepath)
+            addon.trace_log.setLevel(logging.DEBUG)
+            on = time_import(filepath)
+            addon.trace_log.setLevel(addon.TRACE_OFF)
+            addon.trace_buffer.records.clear()
+
+            print(f"{size:>10} {off:>12.3f} {on:>12.3f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in harness.script_args()] or [1000, 10000])
@@ -0,0 +1,78 @@
+"""Benchmark for runtime event playback queries.
+
+Plain Python, no Blender needed:
+
+    python benchmarks/bench_runtime.py 1000 5000 10000
+
+Builds tracks from synthetic exported clips and simulates that many
+characters, each playing a random clip in a random mode (once, loop or
+ping-pong) at a random speed, some backward, ticking at 60 Hz; finished
+one-shot clips start over. Prints the events fired and the time per tick
+against the 16.7 ms frame.
+"""
+import os
+import random
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(BENCH_DIR, os.pardir))
+
+import animation_events_runtime as runtime
+import synthetic
+
+FPS = 30
+TICK = 1.0 / 60
+SECONDS = 10
+CLIPS = 16
+EVENTS_PER_CLIP = 12
+
+
+def clip_tracks(palette, rng):
+    """Tracks of CLIPS exported clips, 1-4 s long, events on random frames"""
+    tracks = []
+    for clip in range(CLIPS):
+        frame_count = rng.randint(1, 4) * FPS
+        events = list(synthetic.generate_events(palette, EVENTS_PER_CLIP, FPS, seed=clip))
+        for event in events:
+            event["frame"] = rng.randrange(frame_count)
+            event["time"] = event["frame"] / FPS
+        tracks.append(runtime.EventTrack(events, FPS, start=0.0, end=frame_count / FPS))
+    return tracks
+
+
+def characters(tracks, count, rng):
+    result = []
+    for _ in range(count):
+        track = rng.choice(tracks)
+        speed = rng.uniform(0.5, 2.0) * (-1.0 if rng.random() < 0.1 else 1.0)
+        result.append(runtime.Playback(track, rng.choice(runtime.PLAY_MODES), speed,
+                                       position=rng.uniform(0.0, track.length)))
+    return result
+
+
+def main(sizes):
+    palette = synthetic.load_palette()
+    rng = random.Random(0)
+    tracks = clip_tracks(palette, rng)
+    ticks = int(SECONDS / TICK)
+    print(f"{'characters':>10} {'ticks':>6} {'fired':>9} {'total s':>8} {'per tick ms':>12} {'frame %':>8}")
+    for size in sizes:
+        playbacks = characters(tracks, size, rng)
+        fired = 0
+        start = time.perf_counter()
+        for _ in range(ticks):
+            for playback in playbacks:
+                fired += len(playback.advance(TICK))
+                if playback.finished:
+                    # Stands in for the character's state machine picking its next clip
+                    playback.seek(0.0 if playback.speed > 0.0 else playback.track.length)
+        elapsed = time.perf_counter() - start
+        per_tick = elapsed / ticks
+        print(f"{size:>10} {ticks:>6} {fired:>9} {elapsed:>8.3f} {per_tick * 1000:>12.3f} "
+              f"{per_tick / TICK * 100:>8.1f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 5000, 10000])
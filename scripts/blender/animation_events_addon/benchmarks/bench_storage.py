@@ -0,0 +1,95 @@
+"""Benchmark for the field value storage layout.
+
+Run headless from the add-on directory:
+
+    blender --background --factory-startup --python benchmarks/bench_storage.py -- 10000 100000
+
+or with the bpy shim: python benchmarks/bench_storage.py 10000 100000
+
+For each size, imports a synthetic timeline, fills every value slot the way
+older versions left them ("legacy") and saves it. Opening that file runs the
+load_post migration, the result is saved again ("compact"), then once more
+after dropping the values equal to their template defaults ("sparse", see
+event.strip_default_values). Prints the
+stored slots, file size, save and load time and the load's peak Python
+memory. Under Blender the shim's pickled scenes become real .blend files and
+RNA memory is not seen by tracemalloc, compare the file sizes instead.
+"""
+import gc
+import os
+import tempfile
+import time
+
+import harness
+import synthetic
+
+bpy = harness.bpy
+
+# What the slots held in files written before the compact layout
+LEGACY_SLOTS = {
+    'bool_value': False,
+    'string_value': "",
+    'int_value': 0,
+    'float_value': 0.0,
+    'array_value': "",
+    'enum_value': "",
+    'enum_selection': 0,
+}
+
+
+def field_values():
+    for instance in bpy.context.scene.event_system.event_instances:
+        yield from instance.field_values
+
+
+def fill_legacy_slots():
+    for field_value in field_values():
+        for slot, value in LEGACY_SLOTS.items():
+            if slot not in field_value:
+                field_value[slot] = value
+    bpy.context.scene.event_system.storage_version = 0
+
+
+def stored_slots():
+    """Value slots plus the name and type every stored value carries"""
+    return sum(2 + sum(slot in field_value for slot in LEGACY_SLOTS) for field_value in field_values())
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main(sizes):
+    addon = harness.register_addon()
+    addon.log.setLevel('ERROR')
+    palette = synthetic.load_palette()
+
+    print(f"bpy: {harness.BACKEND}")
+    print(f"{'events':>8} {'layout':>8} {'slots':>9} {'file KiB':>9} {'save s':>8} {'load s':>8} {'load MiB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            events_path = os.path.join(tmp, f"events_{size}.json")
+            synthetic.write_events_file(events_path, palette, size)
+            bpy.context.scene.event_system.event_templates.clear()
+            bpy.ops.event.import_palette(filepath=synthetic.EXAMPLE_PALETTE)
+            bpy.ops.event.import_events(filepath=events_path)
+            fill_legacy_slots()
+
+            for layout in ("legacy", "compact", "sparse"):
+                if layout == "sparse":
+                    bpy.ops.event.strip_default_values()
+                filepath = os.path.join(tmp, f"{layout}_{size}.blend")
+                slots = stored_slots()
+                gc.collect()
+                save = timed(harness.save_blend, filepath)
+                # Loading the legacy file includes its one-time migration. Collect
+                # first, so the previous file's objects are not freed inside the timing
+                load, peak = harness.measure(lambda: harness.open_blend(filepath), gc.collect)
+                print(f"{size:>8} {layout:>8} {slots:>9} {os.path.getsize(filepath) / 1024:>9.0f} "
+                      f"{save:>8.3f} {load:>8.3f} {peak:>9.1f}", flush=True)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in harness.script_args()] or [10000, 100000])
@@ -0,0 +1,317 @@
+"""Benchmark suite for the add-on's timeline operations.
+
+Run headless from the add-on directory, under Blender:
+
+    blender --background --factory-startup --python benchmarks/bench_suite.py -- 1000 10000 100000
+
+or without Blender, against the bpy shim:
+
+    python benchmarks/bench_suite.py 1000 10000 100000 1000000
+
+For each timeline size it writes a synthetic palette (one template per
+1000 events, at least 10) and events file, then times every operation
+and reports its peak Python memory. --ops picks a subset, --no-memory
+skips the tracemalloc runs (halves the run time).
+"""
+import argparse
+import os
+import random
+import tempfile
+import types
+
+import harness
+import synthetic
+import animation_events_addon as addon
+
+bpy = harness.bpy
+
+CALLS = 2000
+CONFLICT_CALLS = 20
+
+OPERATIONS = {}
+
+
+def operation(name):
+    def register(func):
+        OPERATIONS[name] = func
+        return func
+    return register
+
+
+class Timeline:
+    """Files and scene state for one benchmark size"""
+
+    def __init__(self, tmp, size):
+        self.size = size
+        base = synthetic.load_palette()
+        self.palette = synthetic.generate_palette(max(len(base["templates"]), size // 1000), base)
+        self.palette_path = os.path.join(tmp, f"palette_{size}.json")
+        self.events_path = os.path.join(tmp, f"events_{size}.json")
+        self.export_path = os.path.join(tmp, f"export_{size}.json")
+        synthetic.write_palette_file(self.palette_path, self.palette)
+        synthetic.write_events_file(self.events_path, self.palette, size)
+
+    def load_palette(self):
+        bpy.context.scene.event_system.event_templates.clear()
+        bpy.ops.event.import_palette(filepath=self.palette_path)
+
+    def load_events(self):
+        bpy.ops.event.import_events(filepath=self.events_path)
+
+
+# Each operation returns (setup, run, calls); setup is not timed
+
+@operation("palette_import")
+def palette_import(timeline):
+    events = bpy.context.scene.event_system
+    return events.event_templates.clear, timeline.load_palette, 1
+
+
+@operation("import")
+def import_events(timeline):
+    return timeline.load_palette, timeline.load_events, 1
+
+
+@operation("export")
+def export_events(timeline):
+    return timeline.load_events, lambda: bpy.ops.event.export_events(filepath=timeline.export_path), 1
+
+
+@operation("export_snapshot")
+def export_snapshot(timeline):
+    """What a background export keeps on the main thread: reading the events into a snapshot"""
+    def snapshot():
+        addon.prepare_events_export(bpy.context.scene, timeline.export_path, skip_unchanged=False, snapshot=True)
+    return timeline.load_events, snapshot, 1
+
+
+@operation("conflict_check")
+def conflict_check(timeline):
+    """Adding a template on a frame it already occupies, rejected by the conflict check"""
+    scene = bpy.context.scene
+    events = scene.event_system
+    template_count = len(timeline.palette["templates"])
+    rng = random.Random(0)
+    # synthetic events: event i is template i % T on frame i // T
+    picks = [rng.randrange(timeline.size) for _ in range(CONFLICT_CALLS)]
+
+    def run():
+        for i in picks:
+            events.active_template_index = i % template_count
+            scene.frame_current = i // template_count
+            bpy.ops.event.add_to_timeline()
+
+    return timeline.load_events, run, CONFLICT_CALLS
+
+
+@operation("add_single")
+def add_single(timeline):
+    """Place a template on free frames one add_to_timeline call at a time"""
+    scene = bpy.context.scene
+    events = scene.event_system
+    first_frame = timeline.size // len(timeline.palette["templates"]) + 1
+
+    def run():
+        events.active_template_index = 0
+        for frame in range(first_frame, first_frame + CONFLICT_CALLS):
+            scene.frame_current = frame
+            bpy.ops.event.add_to_timeline()
+
+    return timeline.load_events, run, CONFLICT_CALLS
+
+
+@operation("stamp")
+def stamp(timeline):
+    """Place a template on CALLS free frames with one stamp_template call"""
+    events = bpy.context.scene.event_system
+    first_frame = timeline.size // len(timeline.palette["templates"]) + 1
+
+    def run():
+        events.active_template_index = 0
+        bpy.ops.event.stamp_template(source='EVERY_N', frame_start=first_frame,
+                                     frame_end=first_frame + CALLS - 1, step=1)
+
+    return timeline.load_events, run, CALLS
+
+
+@operation("frame_change")
+def frame_change(timeline):
+    scene = bpy.context.scene
+    rng = random.Random(0)
+    last_frame = (timeline.size - 1) // len(timeline.palette["templates"])
+    frames = [rng.randint(0, last_frame) for _ in range(CALLS)]
+
+    def run():
+        for frame in frames:
+            scene.frame_set(frame)
+
+    return timeline.load_events, run, CALLS
+
+
+@operation("jump_next")
+def jump_next(timeline):
+    """Jump to the next event (with template filter) from random frames"""
+    scene = bpy.context.scene
+    rng = random.Random(0)
+    last_frame = (timeline.size - 1) // len(timeline.palette["templates"])
+    frames = [rng.randint(0, last_frame) for _ in range(CALLS)]
+
+    def run():
+        for frame in frames:
+            scene.frame_current = frame
+            bpy.ops.event.jump_to_event(direction='NEXT', only_active_template=True)
+
+    return timeline.load_events, run, CALLS
+
+
+class InstanceList:
+    """Stand-in for the EVENT_UL_instances the panel draws
+
+    UIList instances only exist while Blender draws a region, so the
+    benchmark calls the add-on's filter_items on this settings holder.
+    """
+    bitflag_filter_item = 1 << 30
+    filter_items = addon.EVENT_UL_instances.filter_items
+    _filter_flags = addon.EVENT_UL_instances._filter_flags
+
+    def __init__(self, filter_name):
+        self.filter_name = filter_name
+        self.use_filter_invert = False
+        self.filter_field_name = ""
+        self.filter_field_value = ""
+        self.sort_by_frame = True
+
+
+@operation("list_filter")
+def list_filter(timeline):
+    """Filter and sort the instance list after its settings change (cache miss)"""
+    events = bpy.context.scene.event_system
+    ui_list = InstanceList(timeline.palette["templates"][0]["name"])
+    calls = CONFLICT_CALLS
+
+    def run():
+        for _ in range(calls):
+            ui_list.use_filter_invert = not ui_list.use_filter_invert
+            ui_list.filter_items(bpy.context, events, "event_instances")
+
+    return timeline.load_events, run, calls
+
+
+@operation("list_redraw")
+def list_redraw(timeline):
+    """Filter and sort the instance list on redraw/scroll, nothing changed (cache hit)"""
+    events = bpy.context.scene.event_system
+    ui_list = InstanceList(timeline.palette["templates"][0]["name"])
+
+    def setup():
+        timeline.load_events()
+        ui_list.filter_items(bpy.context, events, "event_instances")
+
+    def run():
+        for _ in range(CALLS):
+            ui_list.filter_items(bpy.context, events, "event_instances")
+
+    return setup, run, CALLS
+
+
+class RecordingLayout:
+    """Minimal UILayout for timing draw() outside a region: reads every drawn property"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def _child(self, *args, **kwargs):
+        self.calls += 1
+        return RecordingLayout()
+
+    row = column = box = split = _child
+
+    def prop(self, data, prop, **kwargs):
+        self.calls += 1
+        getattr(data, prop)
+
+    def operator(self, idname, **kwargs):
+        self.calls += 1
+        return types.SimpleNamespace()
+
+    def _item(self, *args, **kwargs):
+        self.calls += 1
+
+    label = separator = template_list = prop_search = _item
+
+
+class PanelDraw:
+    """Stand-in for EVENT_PT_panel, Panel instances are also region-bound"""
+    draw = addon.EVENT_PT_panel.draw
+    draw_range_events = addon.EVENT_PT_panel.draw_range_events
+    draw_field_value = addon.EVENT_PT_panel.draw_field_value
+
+    def __init__(self):
+        self.layout = RecordingLayout()
+
+
+@operation("panel_draw")
+def panel_draw(timeline):
+    """Redraw the panel with every section open and an ENUM event selected, as during playback"""
+    scene = bpy.context.scene
+    events = scene.event_system
+    panel = PanelDraw()
+
+    def setup():
+        timeline.load_events()
+        events.show_template_settings = True
+        events.show_template_tools = True
+        events.show_range_events = True
+        events.active_instance_index = next(
+            i for i, instance in enumerate(events.event_instances)
+            if any(value.field_type == 'ENUM' for value in instance.field_values))
+        template_name = events.event_instances[events.active_instance_index].template_name
+        events.active_template_index = next(
+            i for i, template in enumerate(events.event_templates) if template.name == template_name)
+
+    def run():
+        revision = events.revision
+        for _ in range(CALLS):
+            panel.draw(bpy.context)
+        if events.revision != revision:
+            raise AssertionError("panel draw changed the events")
+
+    return setup, run, CALLS
+
+
+@operation("clear_all")
+def clear_all(timeline):
+    return timeline.load_events, bpy.ops.event.clear_all_events, 1
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="bench_suite.py")
+    parser.add_argument("sizes", type=int, nargs="*", default=[1000, 10000])
+    parser.add_argument("--ops", default=",".join(OPERATIONS),
+                        help=f"comma-separated subset of: {', '.join(OPERATIONS)}")
+    parser.add_argument("--no-memory", action="store_true", help="skip peak memory measurement")
+    args = parser.parse_args(argv)
+    ops = [name.strip() for name in args.ops.split(",")]
+    unknown = set(ops) - set(OPERATIONS)
+    if unknown:
+        parser.error(f"unknown operations: {', '.join(sorted(unknown))}")
+
+    addon = harness.register_addon()
+    addon.log.setLevel('ERROR')
+
+    print(f"bpy: {harness.BACKEND}")
+    print(f"{'operation':<16} {'events':>9} {'calls':>6} {'total s':>9} {'per call ms':>12} {'peak MiB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            timeline = Timeline(tmp, size)
+            timeline.load_palette()
+            for name in ops:
+                setup, run, calls = OPERATIONS[name](timeline)
+                elapsed, peak = harness.measure(run, setup, memory=not args.no_memory)
+                peak = "-" if peak is None else f"{peak:.1f}"
+                print(f"{name:<16} {size:>9} {calls:>6} {elapsed:>9.3f} {elapsed / calls * 1000:>12.3f} {peak:>9}",
+                      flush=True)
+
+
+if __name__ == "__main__":
+    main(harness.script_args())
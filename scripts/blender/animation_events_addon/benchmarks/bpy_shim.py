@@ -0,0 +1,718 @@
+"""Minimal stand-in for the parts of ``bpy`` the events add-on touches.
+
+Lets the add-on register and its operators, handlers and panels run in a
+plain Python interpreter so benchmarks work without Blender. Semantics
+follow Blender where it matters for cost: property updates fire on
+assignment, ``obj["prop"]`` writes bypass them, FloatProperty stores
+single precision and collections are indexed lists.
+"""
+
+import os
+import pickle
+import struct
+import sys
+import tempfile
+import types
+
+
+# ---------------------------------------------------------------------------
+# Property definitions
+
+class _PropDef:
+    def __init__(self, kind, **kwargs):
+        self.kind = kind
+        self.kwargs = kwargs
+        self.name = None
+
+    def default(self):
+        kw = self.kwargs
+        if self.kind == 'bool':
+            return kw.get('default', False)
+        if self.kind == 'int':
+            return kw.get('default', 0)
+        if self.kind == 'float':
+            return _f32(kw.get('default', 0.0))
+        if self.kind == 'string':
+            return kw.get('default', "")
+        if self.kind == 'floatvec':
+            size = kw.get('size', 3)
+            return tuple(_f32(v) for v in kw.get('default', (0.0,) * size))
+        if self.kind == 'intvec':
+            size = kw.get('size', 3)
+            return tuple(kw.get('default', (0,) * size))
+        if self.kind == 'enum':
+            items = kw.get('items')
+            if 'default' in kw:
+                return kw['default']
+            if isinstance(items, (list, tuple)) and items:
+                return items[0][0]
+            return ""
+        return None
+
+    def coerce(self, value):
+        kind = self.kind
+        if kind == 'bool':
+            return bool(value)
+        if kind == 'int':
+            if isinstance(value, float):
+                raise TypeError("expected an int type, not float")
+            value = int(value)
+            if 'min' in self.kwargs:
+                value = max(self.kwargs['min'], value)
+            if 'max' in self.kwargs:
+                value = min(self.kwargs['max'], value)
+            return value
+        if kind == 'float':
+            value = float(value)
+            if 'min' in self.kwargs:
+                value = max(self.kwargs['min'], value)
+            if 'max' in self.kwargs:
+                value = min(self.kwargs['max'], value)
+            return _f32(value)
+        if kind == 'string':
+            if not isinstance(value, str):
+                raise TypeError("expected a string type")
+            return value
+        if kind == 'floatvec':
+            return tuple(_f32(v) for v in value)
+        if kind == 'intvec':
+            return tuple(int(v) for v in value)
+        return value
+
+
+def _f32(value):
+    return struct.unpack('f', struct.pack('f', float(value)))[0]
+
+
+def BoolProperty(**kw): return _PropDef('bool', **kw)
+def IntProperty(**kw): return _PropDef('int', **kw)
+def FloatProperty(**kw): return _PropDef('float', **kw)
+def StringProperty(**kw): return _PropDef('string', **kw)
+def EnumProperty(**kw): return _PropDef('enum', **kw)
+def FloatVectorProperty(**kw): return _PropDef('floatvec', **kw)
+def IntVectorProperty(**kw): return _PropDef('intvec', **kw)
+def CollectionProperty(**kw): return _PropDef('collection', **kw)
+def PointerProperty(**kw): return _PropDef('pointer', **kw)
+
+
+class _PropDescriptor:
+    """Installed on registered classes in place of the annotation."""
+
+    def __init__(self, name, pdef):
+        self.name = name
+        self.pdef = pdef
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        getter = self.pdef.kwargs.get('get')
+        if getter is not None:
+            value = getter(obj)
+            if self.pdef.kind == 'enum':
+                return next((item[0] for number, item in _enum_numbers(self.pdef, obj)
+                             if number == value), '')
+            return value
+        data = obj._data
+        try:
+            return data[self.name]
+        except KeyError:
+            pass
+        kind = self.pdef.kind
+        if kind == 'collection':
+            value = _Collection(self.pdef.kwargs['type'], obj, self.name)
+        elif kind == 'pointer':
+            value = _instantiate(self.pdef.kwargs['type'], obj, self.name)
+        else:
+            value = self.pdef.default()
+        data[self.name] = value
+        return value
+
+    def __set__(self, obj, value):
+        pdef = self.pdef
+        if pdef.kind in ('collection', 'pointer'):
+            raise AttributeError(f"bpy_struct: attribute \"{self.name}\" is read-only")
+        if pdef.kind == 'enum':
+            numbers = {item[0]: number for number, item in _enum_numbers(pdef, obj)}
+            if value not in numbers:
+                raise TypeError(f"enum \"{value}\" not found in {list(numbers)}")
+        else:
+            value = pdef.coerce(value)
+        setter = pdef.kwargs.get('set')
+        if setter is not None:
+            setter(obj, numbers[value] if pdef.kind == 'enum' else value)
+        else:
+            obj._data[self.name] = value
+        update = pdef.kwargs.get('update')
+        if update is not None:
+            update(obj, context)
+
+
+def _enum_numbers(pdef, obj):
+    """(value, item) pairs; items without an explicit value are numbered by position"""
+    items = pdef.kwargs.get('items')
+    if callable(items):
+        items = items(obj, context)
+    return [(item[3] if len(item) > 3 else i, item) for i, item in enumerate(items)]
+
+
+def _instantiate(cls, owner, path):
+    obj = cls.__new__(cls)
+    obj._data = {}
+    obj._owner = owner
+    obj._path = path
+    obj._index = None
+    return obj
+
+
+class _Collection:
+    def __init__(self, item_type, owner, name):
+        self._type = item_type
+        self._owner = owner
+        self._name = name
+        self._items = []
+
+    def add(self):
+        item = _instantiate(self._type, self, None)
+        item._index = len(self._items)
+        self._items.append(item)
+        return item
+
+    def remove(self, index):
+        del self._items[index]
+        for i in range(index, len(self._items)):
+            self._items[i]._index = i
+
+    def clear(self):
+        self._items.clear()
+
+    def move(self, src, dst):
+        item = self._items.pop(src)
+        self._items.insert(dst, item)
+        for i in range(min(src, dst), max(src, dst) + 1):
+            self._items[i]._index = i
+
+    def __len__(self):
+        return len(self._items)
+
+    def __bool__(self):
+        return bool(self._items)
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            for item in self._items:
+                if getattr(item, 'name', None) == key:
+                    return item
+            raise KeyError(key)
+        return self._items[key]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def find(self, key):
+        for i, item in enumerate(self._items):
+            if getattr(item, 'name', None) == key:
+                return i
+        return -1
+
+    def values(self):
+        return list(self._items)
+
+    def foreach_get(self, attr, seq):
+        for i, item in enumerate(self._items):
+            seq[i] = getattr(item, attr)
+
+    def foreach_set(self, attr, seq):
+        for item, value in zip(self._items, seq):
+            item._data[attr] = value
+
+    def path_from_id(self):
+        owner_path = self._owner.path_from_id() if isinstance(self._owner, bpy_struct) else ""
+        return f"{owner_path}.{self._name}" if owner_path else self._name
+
+
+class bpy_struct:
+    _data = None
+    _owner = None
+    _path = None
+    _index = None
+
+    def __init__(self, *args, **kwargs):
+        self._data = {}
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __setitem__(self, key, value):
+        # Raw writes skip updates, but RNA still reads floats back as float32
+        desc = getattr(type(self), key, None)
+        if isinstance(desc, _PropDescriptor) and desc.pdef.kind == 'float':
+            value = _f32(value)
+        self._data[key] = value
+
+    def __delitem__(self, key):
+        del self._data[key]
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def keys(self):
+        return self._data.keys()
+
+    def as_pointer(self):
+        return id(self)
+
+    def path_from_id(self, prop=None):
+        owner = self._owner
+        if isinstance(owner, _Collection):
+            path = f"{owner.path_from_id()}[{self._index}]"
+        elif isinstance(owner, _ID) or owner is None:
+            path = self._path or ""
+        else:
+            parent = owner.path_from_id()
+            path = f"{parent}.{self._path}" if parent else self._path
+        if prop:
+            return f"{path}.{prop}" if path else prop
+        return path
+
+    @property
+    def id_data(self):
+        obj = self
+        while obj is not None and not isinstance(obj, _ID):
+            obj = obj._owner
+        return obj
+
+
+class _ID(bpy_struct):
+    def path_from_id(self, prop=None):
+        return prop or ""
+
+
+# ---------------------------------------------------------------------------
+# Types
+
+class PropertyGroup(bpy_struct):
+    pass
+
+
+class AddonPreferences(bpy_struct):
+    pass
+
+
+class OperatorFileListElement(PropertyGroup):
+    name: StringProperty()
+
+
+class Operator(bpy_struct):
+    def __init__(self):
+        super().__init__()
+        self.reports = []
+        self.layout = UILayout()
+
+    def report(self, level, message):
+        self.reports.append((set(level), message))
+
+
+class Panel(bpy_struct):
+    def __init__(self):
+        super().__init__()
+        self.layout = UILayout()
+
+
+class Menu(Panel):
+    pass
+
+
+class UIList(bpy_struct):
+    bitflag_filter_item = 1 << 30
+    layout_type = 'DEFAULT'
+
+    def __init__(self):
+        super().__init__()
+        self.filter_name = ""
+        self.use_filter_invert = False
+        self.use_filter_sort_alpha = False
+        self.use_filter_sort_reverse = False
+
+
+class UI_UL_list(UIList):
+    @staticmethod
+    def filter_items_by_name(pattern, bitflag, items, propname="name", flags=None, reverse=False):
+        import fnmatch
+        if not pattern or not items:
+            return []
+        if flags is None:
+            flags = [0] * len(items)
+        pattern = f"*{pattern}*" if '*' not in pattern else pattern
+        for i, item in enumerate(items):
+            name = getattr(item, propname, None)
+            if name is not None and fnmatch.fnmatch(name.lower(), pattern.lower()) != reverse:
+                flags[i] |= bitflag
+        return flags
+
+    @staticmethod
+    def sort_items_by_name(items, propname="name"):
+        keyed = sorted(range(len(items)), key=lambda i: getattr(items[i], propname, ""))
+        order = [0] * len(items)
+        for new_pos, old_idx in enumerate(keyed):
+            order[old_idx] = new_pos
+        return order
+
+
+class _Marker:
+    def __init__(self, name, frame):
+        self.name = name
+        self.frame = frame
+        self.select = False
+        self.camera = None
+
+    def as_pointer(self):
+        return id(self)
+
+
+class _TimelineMarkers:
+    def __init__(self):
+        self._items = []
+
+    def new(self, name, frame=0):
+        marker = _Marker(name, frame)
+        self._items.append(marker)
+        return marker
+
+    def remove(self, marker):
+        self._items.remove(marker)
+
+    def clear(self):
+        self._items.clear()
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            for marker in self._items:
+                if marker.name == key:
+                    return marker
+            raise KeyError(key)
+        return self._items[key]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+class _Render:
+    def __init__(self):
+        self.fps = 24
+        self.fps_base = 1.0
+
+
+class _SceneMeta(type):
+    def __setattr__(cls, name, value):
+        if isinstance(value, _PropDef):
+            value = _PropDescriptor(name, value)
+        super().__setattr__(name, value)
+
+    def __delattr__(cls, name):
+        super().__delattr__(name)
+
+
+class Scene(_ID, metaclass=_SceneMeta):
+    def __init__(self, name="Scene"):
+        super().__init__()
+        self.name = name
+        self.frame_current = 1
+        self.frame_start = 1
+        self.frame_end = 250
+        self.frame_preview_start = 1
+        self.frame_preview_end = 250
+        self.use_preview_range = False
+        self.timeline_markers = _TimelineMarkers()
+        self.render = _Render()
+        self.objects = []
+
+    def frame_set(self, frame, subframe=0.0):
+        self.frame_current = frame
+        for handler in list(app.handlers.frame_change_pre):
+            handler(self)
+        for handler in list(app.handlers.frame_change_post):
+            handler(self)
+
+
+# ---------------------------------------------------------------------------
+# UI
+
+class UILayout:
+    def __init__(self):
+        self.calls = 0
+        self.use_property_split = False
+        self.use_property_decorate = True
+        self.scale_y = 1.0
+        self.alignment = 'EXPAND'
+        self.enabled = True
+        self.active = True
+
+    def _child(self, *args, **kwargs):
+        self.calls += 1
+        return UILayout()
+
+    row = column = box = split = column_flow = _child
+
+    def prop(self, data, prop, **kwargs):
+        self.calls += 1
+        getattr(data, prop)
+
+    def label(self, **kwargs):
+        self.calls += 1
+
+    def separator(self, **kwargs):
+        self.calls += 1
+
+    def operator(self, idname, **kwargs):
+        self.calls += 1
+        return types.SimpleNamespace()
+
+    def template_list(self, *args, **kwargs):
+        self.calls += 1
+
+    def menu(self, *args, **kwargs):
+        self.calls += 1
+
+    def prop_search(self, *args, **kwargs):
+        self.calls += 1
+
+
+# ---------------------------------------------------------------------------
+# Registration / ops
+
+_registered = {}
+
+
+def register_class(cls):
+    for klass in reversed(cls.__mro__):
+        for name, pdef in list(klass.__dict__.get('__annotations__', {}).items()):
+            if isinstance(pdef, _PropDef):
+                setattr(cls, name, _PropDescriptor(name, pdef))
+    idname = getattr(cls, 'bl_idname', None) or cls.__name__
+    _registered[idname] = cls
+    if issubclass(cls, AddonPreferences):
+        prefs = _instantiate(cls, None, None)
+        context.preferences.addons[cls.bl_idname] = types.SimpleNamespace(preferences=prefs)
+
+
+def unregister_class(cls):
+    idname = getattr(cls, 'bl_idname', None) or cls.__name__
+    _registered.pop(idname, None)
+    if issubclass(cls, AddonPreferences):
+        context.preferences.addons.pop(cls.bl_idname, None)
+
+
+class _OpCaller:
+    def __init__(self, idname):
+        self.idname = idname
+
+    def __call__(self, *args, **kwargs):
+        cls = _registered[self.idname]
+        op = _instantiate(cls, None, None)
+        op.reports = []
+        op.layout = UILayout()
+        for name, value in kwargs.items():
+            setattr(op, name, value)
+        result = op.execute(context)
+        ops.last_operator = op
+        return result
+
+
+class _OpModule:
+    def __init__(self, prefix):
+        self._prefix = prefix
+
+    def __getattr__(self, name):
+        return _OpCaller(f"{self._prefix}.{name}")
+
+
+class _Ops:
+    last_operator = None
+
+    def __getattr__(self, name):
+        return _OpModule(name)
+
+
+ops = _Ops()
+
+
+# ---------------------------------------------------------------------------
+# app / context
+
+class _WindowManager:
+    windows = []
+
+    def progress_begin(self, lo, hi): pass
+    def progress_update(self, value): pass
+    def progress_end(self): pass
+    def fileselect_add(self, op): return {'RUNNING_MODAL'}
+    def invoke_confirm(self, op, event): return op.execute(context)
+    def invoke_props_dialog(self, op, **kwargs): return op.execute(context)
+    def modal_handler_add(self, op): return True
+    def event_timer_add(self, step, window=None): return types.SimpleNamespace(time_step=step)
+    def event_timer_remove(self, timer): pass
+
+
+class _Timers:
+    def __init__(self):
+        self._funcs = {}
+
+    def register(self, func, first_interval=0.0, persistent=False):
+        self._funcs[func] = first_interval
+
+    def unregister(self, func):
+        self._funcs.pop(func, None)
+
+    def is_registered(self, func):
+        return func in self._funcs
+
+    def run_pending(self, max_rounds=1000000):
+        """Shim-only: drive registered timers until they all finish."""
+        rounds = 0
+        while self._funcs and rounds < max_rounds:
+            for func in list(self._funcs):
+                interval = func()
+                if interval is None:
+                    self._funcs.pop(func, None)
+                else:
+                    self._funcs[func] = interval
+            rounds += 1
+        return rounds
+
+
+def persistent(func):
+    func._bpy_persistent = True
+    return func
+
+
+_handler_names = (
+    'frame_change_pre', 'frame_change_post', 'load_pre', 'load_post',
+    'save_pre', 'save_post', 'undo_post', 'redo_post', 'depsgraph_update_post',
+)
+
+handlers = types.ModuleType('bpy.app.handlers')
+for _name in _handler_names:
+    setattr(handlers, _name, [])
+handlers.persistent = persistent
+
+app = types.ModuleType('bpy.app')
+app.handlers = handlers
+app.timers = _Timers()
+app.version = (3, 6, 0)
+app.background = True
+
+context = types.SimpleNamespace(
+    scene=None,
+    window_manager=_WindowManager(),
+    preferences=types.SimpleNamespace(addons={}),
+    area=types.SimpleNamespace(tag_redraw=lambda: None),
+    region=None,
+    active_object=None,
+    window=None,
+)
+
+data = types.SimpleNamespace(scenes=[], filepath="")
+
+
+def new_scene(name="Scene"):
+    """Shim-only: create a scene and make it the context scene."""
+    scene = Scene(name)
+    data.scenes.append(scene)
+    context.scene = scene
+    return scene
+
+
+def load_file(scene=None):
+    """Shim-only: emulate a file load by firing ``load_post``."""
+    for handler in list(handlers.load_post):
+        handler(scene)
+
+
+def save_file(filepath=""):
+    """Shim-only: emulate a save by firing ``save_pre``/``save_post``."""
+    data.filepath = filepath or data.filepath
+    for handler in list(handlers.save_pre):
+        handler(data.filepath)
+    for handler in list(handlers.save_post):
+        handler(data.filepath)
+
+
+def write_blend(filepath):
+    """Shim-only: pickle the scenes, a stand-in for writing a .blend."""
+    with open(filepath, 'wb') as f:
+        pickle.dump(data.scenes, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def read_blend(filepath):
+    """Shim-only: replace the scenes with a pickled set and fire ``load_post``."""
+    with open(filepath, 'rb') as f:
+        data.scenes = pickle.load(f)
+    context.scene = data.scenes[0]
+    load_file()
+
+
+def user_resource(resource_type, path="", create=False):
+    """Shim-only: Blender's user directories live under the temp directory."""
+    target = os.path.join(tempfile.gettempdir(), "bpy_shim_user", resource_type.lower(), path)
+    if create:
+        os.makedirs(target, exist_ok=True)
+    return target
+
+
+def install():
+    """Register the shim as ``bpy`` in ``sys.modules``."""
+    bpy = types.ModuleType('bpy')
+    props = types.ModuleType('bpy.props')
+    for name in ('BoolProperty', 'IntProperty', 'FloatProperty', 'StringProperty',
+                 'EnumProperty', 'FloatVectorProperty', 'IntVectorProperty',
+                 'CollectionProperty', 'PointerProperty'):
+        setattr(props, name, globals()[name])
+    btypes = types.ModuleType('bpy.types')
+    for name in ('PropertyGroup', 'AddonPreferences', 'Operator', 'Panel', 'Menu',
+                 'UIList', 'UI_UL_list', 'Scene', 'UILayout', 'bpy_struct',
+                 'OperatorFileListElement'):
+        setattr(btypes, name, globals()[name])
+    utils = types.ModuleType('bpy.utils')
+    utils.register_class = register_class
+    utils.unregister_class = unregister_class
+    utils.user_resource = user_resource
+    register_class(OperatorFileListElement)
+    path = types.ModuleType('bpy.path')
+    path.abspath = lambda p, **kw: os.path.join(os.path.dirname(data.filepath), p[2:]) if p.startswith('//') else p
+
+    bpy.props = props
+    bpy.types = btypes
+    bpy.utils = utils
+    bpy.app = app
+    bpy.ops = ops
+    bpy.context = context
+    bpy.data = data
+    bpy.path = path
+    bpy.shim = sys.modules[__name__]
+
+    sys.modules['bpy'] = bpy
+    sys.modules['bpy.props'] = props
+    sys.modules['bpy.types'] = btypes
+    sys.modules['bpy.utils'] = utils
+    sys.modules['bpy.app'] = app
+    sys.modules['bpy.app.handlers'] = handlers
+    sys.modules['bpy.path'] = path
+    return bpy
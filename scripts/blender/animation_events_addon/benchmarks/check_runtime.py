@@ -0,0 +1,107 @@
+"""Regression check for runtime event playback against exact arithmetic.
+
+Plain Python, no Blender needed:
+
+    python benchmarks/check_runtime.py 5000
+
+Events sit on integer frames and ticks on a grid that often lands right on
+them (60 Hz ticks over 24/30/60 fps clips, speeds like 0.5 and 1.5), the
+cases where float positions round to either side of an event. Every tick
+of a float Playback must fire exactly the events an exact Fraction model
+of the same playback fires, in the same order. Prints the failing cases
+and exits with status 1 if any tick differs.
+"""
+import os
+import random
+import sys
+from fractions import Fraction
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, os.pardir))
+
+import animation_events_runtime as runtime
+
+TICKS = 240
+SPEEDS = (Fraction(1), Fraction(2), Fraction(1, 2), Fraction(3, 2), Fraction(-1), Fraction(-1, 2))
+TICK_RATES = (60, 120, 30)
+
+
+def exact_tick(frames, fps, start, end, mode, p0, p1, first):
+    """Indices fired moving from p0 to p1, the Playback rules in Fractions"""
+    length = Fraction(end - start, fps)
+    times = [Fraction(frame, fps) - Fraction(start, fps) for frame in frames]  # clip offsets
+    forward = p1 >= p0
+    fired = []
+    if mode == runtime.ONCE or length == 0:
+        p0, p1 = min(max(p0, 0), length), min(max(p1, 0), length)
+        occurrences = [(offset, i, True) for i, offset in enumerate(times) if 0 <= offset <= length]
+        cycles = None
+    else:
+        occurrences = []
+        lo, hi = min(p0, p1), max(p0, p1)
+        for cycle in range(int(lo // length) - 1, int(hi // length) + 2):
+            mirrored = mode == runtime.PING_PONG and cycle % 2
+            for i, offset in enumerate(times):
+                if not 0 <= offset < length or (mirrored and offset == 0):
+                    continue
+                u = cycle * length + (length - offset if mirrored else offset)
+                occurrences.append((u, i, not mirrored))
+        cycles = True
+    for u, i, clip_ascending in occurrences:
+        if (forward and p0 < u <= p1) or (not forward and p1 <= u < p0):
+            fired.append((u if forward else -u, i if clip_ascending == forward else -i, i))
+    fired = [i for _, _, i in sorted(fired)]
+
+    if first:
+        # Events right under the starting position, in file order
+        if cycles is None:
+            here = min(max(p0, 0), length)
+        else:
+            cycle, x = divmod(p0, length)
+            here = length - x if mode == runtime.PING_PONG and cycle % 2 else x
+        under = [i for i, offset in enumerate(times) if offset == here and (cycles is None or offset < length)]
+        fired = under + fired
+    return fired
+
+
+def check(rng):
+    fps = rng.choice((24, 30, 60))
+    frames = sorted(rng.randint(0, 2 * fps) for _ in range(rng.randint(1, 12)))
+    start = rng.randint(0, frames[0])
+    end = rng.randint(frames[-1], frames[-1] + fps // 2)
+    events = [{"template_name": "T", "frame": frame, "time": frame / fps, "field_values": {}} for frame in frames]
+    track = runtime.EventTrack(events, fps, start / fps, end / fps)
+    index_of = {id(event): i for i, event in enumerate(events)}
+
+    mode = rng.choice(runtime.PLAY_MODES)
+    speed = rng.choice(SPEEDS)
+    tick = Fraction(1, rng.choice(TICK_RATES))
+    position = Fraction(rng.randint(0, end - start), fps)
+    playback = runtime.Playback(track, mode, float(speed), float(position))
+    first = True
+    for step in range(TICKS):
+        target = position + tick * speed
+        expected = exact_tick(frames, fps, start, end, mode, position, target, first)
+        got = [index_of[id(event)] for event in playback.advance(float(tick))]
+        if got != expected:
+            return (f"fps {fps} frames {frames} clip {start}-{end} {mode} speed {speed} tick {tick} "
+                    f"step {step} from {position} to {target}: expected {expected} got {got}")
+        first = False
+        position = target
+        if mode == runtime.ONCE:
+            position = min(max(position, 0), Fraction(end - start, fps))
+    return None
+
+
+def main(argv):
+    cases = int(argv[0]) if argv else 5000
+    rng = random.Random(0)
+    failures = [failure for failure in (check(rng) for _ in range(cases)) if failure]
+    for failure in failures[:10]:
+        print(failure)
+    print(f"{cases - len(failures)} of {cases} playbacks match exact arithmetic")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
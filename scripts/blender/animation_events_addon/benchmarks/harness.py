@@ -0,0 +1,84 @@
+"""Shared setup for the benchmarks that need bpy.
+
+Inside Blender (blender --background --python ...) the real bpy is used.
+In a plain interpreter bpy_shim stands in for it, so the same scripts run
+on machines without Blender. Absolute numbers differ between the two, the
+shape of the curves is what to compare.
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ADDON_DIR = os.path.normpath(os.path.join(BENCH_DIR, os.pardir))
+for path in (BENCH_DIR, ADDON_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+try:
+    import bpy
+    BACKEND = "blender"
+except ImportError:
+    import bpy_shim
+    bpy = bpy_shim.install()
+    bpy_shim.new_scene()
+    BACKEND = "shim"
+
+
+def script_args():
+    """Arguments after '--' under Blender, sys.argv[1:] otherwise"""
+    if "--" in sys.argv:
+        return sys.argv[sys.argv.index("--") + 1:]
+    return [] if BACKEND == "blender" else sys.argv[1:]
+
+
+def register_addon():
+    import animation_events_addon as addon
+    try:
+        addon.register()
+    except ValueError:
+        pass  # already registered in this session
+    return addon
+
+
+def save_blend(filepath):
+    if BACKEND == "blender":
+        bpy.ops.wm.save_as_mainfile(filepath=filepath, compress=False, copy=True)
+    else:
+        bpy_shim.write_blend(filepath)
+
+
+def open_blend(filepath):
+    """Load a file saved by save_blend, load_post handlers run"""
+    if BACKEND == "blender":
+        bpy.ops.wm.open_mainfile(filepath=filepath)
+    else:
+        bpy_shim.read_blend(filepath)
+
+
+def measure(func, setup=None, memory=True):
+    """Run func, return (seconds, peak MiB allocated by Python or None)
+
+    Peak memory comes from tracemalloc, which slows Python code down, so
+    time and memory are taken in separate runs, each after setup().
+    Blender's own C allocations (RNA data) are not seen by tracemalloc.
+    """
+    if setup:
+        setup()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    if not memory:
+        return elapsed, None
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return elapsed, (peak - base) / (1 << 20)
@@ -0,0 +1,73 @@
+"""Synthetic palettes and timelines for the benchmarks.
+
+Palettes clone the templates of event_palette_example.json and events are
+modelled on timeline_export.json: templates cycle in palette order, each
+frame holds at most one event per template and field values are random but
+valid for the field type.
+"""
+import json
+import os
+import random
+
+ADDON_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+EXAMPLE_PALETTE = os.path.join(ADDON_DIR, "event_palette_example.json")
+
+
+def load_palette(filepath=EXAMPLE_PALETTE):
+    with open(filepath, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def generate_palette(template_count, base=None):
+    """Palette with `template_count` templates cloned from the example palette
+
+    Clones past the first round get a numbered suffix, so names stay unique.
+    """
+    base = base or load_palette()
+    templates = []
+    for i in range(template_count):
+        template = json.loads(json.dumps(base["templates"][i % len(base["templates"])]))
+        if i >= len(base["templates"]):
+            template["name"] = f"{template['name']}_{i // len(base['templates'])}"
+        templates.append(template)
+    return {"templates": templates}
+
+
+def write_palette_file(filepath, palette):
+    with open(filepath, "w") as f:
+        json.dump(palette, f, indent=2)
+
+
+def random_value(field, rng):
+    field_type = field["type"]
+    if field_type == 'ENUM':
+        return rng.choice(field["enum_options"])
+    if field_type == 'BOOL':
+        return rng.random() < 0.5
+    if field_type == 'INT':
+        return rng.randint(0, 100)
+    if field_type == 'FLOAT':
+        return rng.random()
+    if field_type == 'ARRAY':
+        return rng.sample(["fx_a", "fx_b", "fx_c", "fx_d"], 2)
+    return f"value_{rng.randint(0, 9)}"
+
+
+def generate_events(palette, count, fps=24, seed=0):
+    """Yield `count` exported-style event dicts"""
+    rng = random.Random(seed)
+    templates = palette["templates"]
+    for i in range(count):
+        template = templates[i % len(templates)]
+        frame = i // len(templates)
+        yield {
+            "template_name": template["name"],
+            "frame": frame,
+            "time": frame / fps,
+            "field_values": {field["name"]: random_value(field, rng) for field in template["custom_fields"]},
+        }
+
+
+def write_events_file(filepath, palette, count, fps=24, seed=0):
+    with open(filepath, "w") as f:
+        json.dump({"events": list(generate_events(palette, count, fps, seed))}, f)